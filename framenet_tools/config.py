@@ -5,12 +5,20 @@ import re
 
 from typing import List
 
+from framenet_tools.data_handler import shared_embeddings
 from framenet_tools.data_handler.frame_embedding_manager import FrameEmbeddingManager
 from framenet_tools.data_handler.word_embedding_manager import WordEmbeddingManager
-from framenet_tools.utils.static_utils import download_resources, get_spacy_en_model
+from framenet_tools.utils.resource_registry import registry
+from framenet_tools.utils.static_utils import ensure_resources
 
 
 class ConfigManager(object):
+    """
+    Holds the configuration of the pipeline
+
+    NOTE: Loading a config has no side effects, the embedding managers are created on first access.
+          Missing resources are installed by ensure_resources once a stage needs them.
+    """
 
     saved_model: str
 
@@ -25,6 +33,23 @@ class ConfigManager(object):
     use_cuda: bool
     use_spacy: bool
     syntax_only_mode: bool
+    restrict_word_embeddings: bool
+    embedding_storage: str
+    word_embeddings_path: str
+    frame_embeddings_path: str
+    loader_workers: int
+    share_embeddings: bool
+    use_reader_cache: bool
+    reader_cache_size: int
+    columnar_readers: bool
+    raw_chunk_size: int
+    predict_batch_size: int
+    prediction_top_k: int
+    pos_batch_size: int
+    pos_workers: int
+    spacy_profile_pos: str
+    spacy_profile_sentences: str
+    spacy_profile_syntax: str
 
     hidden_sizes: List[int]
     activation_functions: List[str]
@@ -53,6 +78,40 @@ class ConfigManager(object):
         self.use_cuda = True
         self.use_spacy = True
         self.syntax_only_mode = True
+        self.restrict_word_embeddings = False
+        self.embedding_storage = "float32"
+        self.word_embeddings_path = "data/word_embeddings/levy_deps_300.w2vt"
+        self.frame_embeddings_path = (
+            "data/frame_embeddings/dict_frame_to_emb_100dim_wsb_npArray.pkl"
+        )
+
+        # The amount of processes used for loading datasets, 0 for one per cpu core
+        self.loader_workers = 0
+        # Publish the embeddings in shared memory for worker processes, requires python 3.8
+        self.share_embeddings = False
+        self.use_reader_cache = True
+        # The maximum size of the reader cache in MB, least recently used entries are removed first
+        self.reader_cache_size = 4096
+
+        # Cached datasets are memory-mapped and accessed through views, see ColumnarStore
+        self.columnar_readers = False
+
+        # Raw texts are segmented in chunks of paragraphs of at least this many characters
+        self.raw_chunk_size = 100000
+        # The amount of sentences predicted at once
+        self.predict_batch_size = 1000
+        # The amount of predicted frames per annotation kept by the binary export, see ColumnarExporter
+        self.prediction_top_k = 5
+
+        # The amount of sentences POS-tagged at once and the amount of processes, 0 for one per cpu core
+        self.pos_batch_size = 256
+        self.pos_workers = 1
+
+        # The spacy pipelines used for POS-tagging, sentence splitting and span identification
+        # NOTE: Profiles exclude the unused components of the model, see static_utils.spacy_profiles
+        self.spacy_profile_pos = "pos"
+        self.spacy_profile_sentences = "sentences"
+        self.spacy_profile_syntax = "syntax"
 
         self.hidden_sizes = [512, 0.2, 256, 0.1]
         self.activation_functions = ["ReLU", "Dropout", "ReLU", "Dropout"]
@@ -70,13 +129,87 @@ class ConfigManager(object):
         self.autostopper = True
         self.autostopper_threshold = 5
 
-        if not self.load_config(path):
-            download_resources()
-            get_spacy_en_model()
-            self.create_config("config.file")
+        self._wEM = None
+        self._fEM = None
+
+        self.config_loaded = self.load_config(path)
+
+    @property
+    def wEM(self):
+        """
+        The WordEmbeddingManager, created on first access
+
+        :return: The WordEmbeddingManager
+        """
+
+        if self._wEM is None:
+            self.create_embedding_managers()
+
+        return self._wEM
+
+    @wEM.setter
+    def wEM(self, wEM: WordEmbeddingManager):
+        self._wEM = wEM
+
+    @property
+    def fEM(self):
+        """
+        The FrameEmbeddingManager, created on first access
+
+        :return: The FrameEmbeddingManager
+        """
 
-        self.wEM = WordEmbeddingManager()
-        self.fEM = FrameEmbeddingManager()
+        if self._fEM is None:
+            self.create_embedding_managers()
+
+        return self._fEM
+
+    @fEM.setter
+    def fEM(self, fEM: FrameEmbeddingManager):
+        self._fEM = fEM
+
+    def create_embedding_managers(self):
+        """
+        Creates the embedding managers not yet set
+
+        NOTE: Embedding managers are shared by all ConfigManagers of this process
+
+        :return:
+        """
+
+        # Inside of worker processes, use the embeddings published by the parent process
+        if shared_embeddings.worker_handle is not None:
+            shared_embeddings.attach_embeddings(shared_embeddings.worker_handle, self)
+            return
+
+        if self._wEM is None:
+            self._wEM = registry.get(
+                "word_embeddings",
+                (self.word_embeddings_path, self.embedding_storage),
+                lambda: WordEmbeddingManager(self.word_embeddings_path, self.embedding_storage),
+            )
+
+        if self._fEM is None:
+            self._fEM = registry.get(
+                "frame_embeddings",
+                self.frame_embeddings_path,
+                lambda: FrameEmbeddingManager(self.frame_embeddings_path),
+            )
+
+    def ensure_resources(self):
+        """
+        Installs missing resources and writes the default config, if no config file was found
+
+        NOTE: Only the first call per process does any work, see static_utils.ensure_resources
+
+        :return:
+        """
+
+        ensure_resources()
+
+        if not self.config_loaded:
+            self.create_config("config.file")
+            self.config_loaded = True
 
     def load_defaults(self):
         """
@@ -125,7 +258,7 @@ class ConfigManager(object):
         """
 
         if not os.path.isfile(path):
-            logging.info(f"Config not found, creating Config file!")
+            logging.info("Config not found, using defaults!")
             self.load_defaults()
             return False
 
@@ -171,6 +304,57 @@ class ConfigManager(object):
                     if key == "syntax_only_mode":
                         self.syntax_only_mode = config[section][key] == "True"
 
+                    if key == "restrict_word_embeddings":
+                        self.restrict_word_embeddings = config[section][key] == "True"
+
+                    if key == "embedding_storage":
+                        self.embedding_storage = config[section][key]
+
+                    if key == "word_embeddings_path":
+                        self.word_embeddings_path = config[section][key]
+
+                    if key == "frame_embeddings_path":
+                        self.frame_embeddings_path = config[section][key]
+
+                    if key == "loader_workers":
+                        self.loader_workers = int(config[section][key])
+
+                    if key == "share_embeddings":
+                        self.share_embeddings = config[section][key] == "True"
+
+                    if key == "use_reader_cache":
+                        self.use_reader_cache = config[section][key] == "True"
+
+                    if key == "reader_cache_size":
+                        self.reader_cache_size = int(config[section][key])
+
+                    if key == "columnar_readers":
+                        self.columnar_readers = config[section][key] == "True"
+
+                    if key == "raw_chunk_size":
+                        self.raw_chunk_size = int(config[section][key])
+
+                    if key == "predict_batch_size":
+                        self.predict_batch_size = int(config[section][key])
+
+                    if key == "prediction_top_k":
+                        self.prediction_top_k = int(config[section][key])
+
+                    if key == "pos_batch_size":
+                        self.pos_batch_size = int(config[section][key])
+
+                    if key == "pos_workers":
+                        self.pos_workers = int(config[section][key])
+
+                    if key == "spacy_profile_pos":
+                        self.spacy_profile_pos = config[section][key]
+
+                    if key == "spacy_profile_sentences":
+                        self.spacy_profile_sentences = config[section][key]
+
+                    if key == "spacy_profile_syntax":
+                        self.spacy_profile_syntax = config[section][key]
+
                     if key == "autostopper":
                         self.autostopper = config[section][key] == "True"
 
@@ -268,6 +452,23 @@ class ConfigManager(object):
         config_string += "use_cuda: " + str(self.use_cuda) + "\n"
         config_string += "use_spacy: " + str(self.use_spacy) + "\n"
         config_string += "syntax_only_mode: " + str(self.syntax_only_mode) + "\n"
+        config_string += "restrict_word_embeddings: " + str(self.restrict_word_embeddings) + "\n"
+        config_string += "embedding_storage: " + self.embedding_storage + "\n"
+        config_string += "word_embeddings_path: " + self.word_embeddings_path + "\n"
+        config_string += "frame_embeddings_path: " + self.frame_embeddings_path + "\n"
+        config_string += "loader_workers: " + str(self.loader_workers) + "\n"
+        config_string += "share_embeddings: " + str(self.share_embeddings) + "\n"
+        config_string += "use_reader_cache: " + str(self.use_reader_cache) + "\n"
+        config_string += "reader_cache_size: " + str(self.reader_cache_size) + "\n"
+        config_string += "columnar_readers: " + str(self.columnar_readers) + "\n"
+        config_string += "raw_chunk_size: " + str(self.raw_chunk_size) + "\n"
+        config_string += "predict_batch_size: " + str(self.predict_batch_size) + "\n"
+        config_string += "prediction_top_k: " + str(self.prediction_top_k) + "\n"
+        config_string += "pos_batch_size: " + str(self.pos_batch_size) + "\n"
+        config_string += "pos_workers: " + str(self.pos_workers) + "\n"
+        config_string += "spacy_profile_pos: " + self.spacy_profile_pos + "\n"
+        config_string += "spacy_profile_sentences: " + self.spacy_profile_sentences + "\n"
+        config_string += "spacy_profile_syntax: " + self.spacy_profile_syntax + "\n"
         config_string += "autostopper: " + str(self.autostopper) + "\n"
         config_string += "autostopper_threshold: " + str(self.autostopper_threshold) + "\n"
 
@@ -1,24 +1,59 @@
+from sys import intern
 from typing import List, Tuple
 
 
+def intern_string(string: str):
+    """
+    Helper function
+    Interns a string, so equal names share one object
+
+    :param string: The string to intern (can be None)
+    :return: The interned string
+    """
+
+    if string is None:
+        return None
+
+    return intern(string)
+
+
 class Annotation(object):
     """
     Annotation class
 
     Saves and manages all data of one frame for a given sentence.
+
+    NOTE: Frame and role names are interned, roles and their spans are kept as tuples.
+          The sentence is shared with the reader, not copied.
     """
 
+    __slots__ = [
+        "_frame",
+        "fee",
+        "position",
+        "fee_raw",
+        "sentence",
+        "_roles",
+        "_role_positions",
+        "embedded_frame",
+        "_frame_confidence",
+    ]
+
     def __init__(
         self,
         frame: str = "Default",
         fee: str = None,
-        position: int = None,
+        position: Tuple[int, int] = None,
         fee_raw: str = None,
-        sentence: List[str] = [],
-        roles: List[str] = [],
-        role_positions: List[Tuple[int, int]] = [],
+        sentence: List[str] = None,
+        roles: List[str] = None,
+        role_positions: List[Tuple[int, int]] = None,
     ):
-        self.frame = frame
+        if sentence is None:
+            sentence = []
+
+        self._frame = intern_string(frame)
+        self._frame_confidence = None
         self.fee = fee
         self.position = position
         self.fee_raw = fee_raw
@@ -26,7 +61,6 @@ class Annotation(object):
         self.roles = roles
         self.role_positions = role_positions
         self.embedded_frame = None
-        self.frame_confidence = [[frame, 1.0]]
 
         if position is None:
             self.position = (-1, -1)
@@ -34,6 +68,74 @@ class Annotation(object):
                 t = sentence.index(fee_raw)
                 self.position = (t, t)
 
+    def __setstate__(self, state: Tuple[dict, dict]):
+        """
+        Restores a pickled annotation, e.g. one parsed by a worker process
+
+        NOTE: The names are interned again, as interning does not survive pickling
+
+        :param state: The pair of the instance dict (always None) and the slots of the annotation
+        :return:
+        """
+
+        for slot, value in state[1].items():
+            setattr(self, slot, value)
+
+        self.frame = self._frame
+        self.roles = self._roles
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame: str):
+        # The default confidence refers to the frame the annotation was created with
+        if self._frame_confidence is None and frame != self._frame:
+            self._frame_confidence = [[self._frame, 1.0]]
+
+        self._frame = intern_string(frame)
+
+    @property
+    def roles(self):
+        return self._roles
+
+    @roles.setter
+    def roles(self, roles: List[str]):
+        self._roles = tuple(intern_string(role) for role in roles) if roles else ()
+
+    @property
+    def role_positions(self):
+        return self._role_positions
+
+    @role_positions.setter
+    def role_positions(self, role_positions: List[Tuple[int, int]]):
+        if not role_positions:
+            self._role_positions = ()
+            return
+
+        self._role_positions = tuple(tuple(span) for span in role_positions)
+
+    @property
+    def frame_confidence(self):
+        """
+        The predicted frames and their confidences
+
+        NOTE: Unless set explicitly, the frame the annotation was created with and a confidence of 1.0.
+              This default is only created on first access (or once the frame changes), saving memory.
+
+        :return: A list of [frame, confidence] pairs
+        """
+
+        if self._frame_confidence is None:
+            self._frame_confidence = [[self._frame, 1.0]]
+
+        return self._frame_confidence
+
+    @frame_confidence.setter
+    def frame_confidence(self, frame_confidence: List[List[object]]):
+        self._frame_confidence = frame_confidence
+
     def create_handle(self):
         """
         Helper function for ease of programmatic comparison
@@ -42,25 +144,51 @@ class Annotation(object):
 
         :return: A handle consisting of all data saved in this object
         """
-        return [
-            self.frame,
+        return (
+            self._frame,
             self.position,
             self.fee_raw,
             self.sentence,
-            self.roles,
-            self.role_positions,
-        ]
+            self._roles,
+            self._role_positions,
+        )
+
+    def get_key(self):
+        """
+        Creates a hashable key of the compared data
+
+        NOTE: As annotations are mutable, they are not hashable themselves
+
+        :return: A tuple of the compared data
+        """
+
+        return (
+            self._frame,
+            self.position,
+            self.fee_raw,
+            tuple(self.sentence),
+            self._roles,
+            self._role_positions,
+        )
 
     def __eq__(self, x):
         """
         The overwriting of the comparison function
 
+        NOTE: Compares field by field and stops at the first difference
+
         :param x: Another instance of this class
         :return: True if equal, otherwise false
         """
-        equal = True
 
-        for h1, h2 in zip(self.create_handle(), x.create_handle()):
-            equal &= h1 == h2
+        return self is x or (
+            self._frame == x._frame
+            and self.position == x.position
+            and self.fee_raw == x.fee_raw
+            and self._roles == x._roles
+            and self._role_positions == x._role_positions
+            and self.sentence == x.sentence
+        )
 
-        return equal
+    # Annotations are mutable, see get_key
+    __hash__ = None
@@ -0,0 +1,599 @@
+import numpy as np
+import os
+
+from abc import ABC, abstractmethod
+from typing import List
+
+from framenet_tools.data_handler.annotation import Annotation
+from framenet_tools.data_handler.shared_embeddings import array_to_strings, strings_to_array
+
+# The numeric columns of a ColumnarStore
+columns = [
+    "tokens",
+    "sentence_offsets",
+    "annotation_offsets",
+    "frames",
+    "fees",
+    "fees_raw",
+    "positions",
+    "role_offsets",
+    "role_spans",
+    "roles",
+    "roles_given",
+]
+
+# The string tables of a ColumnarStore
+tables = ["vocab", "frame_names", "role_names"]
+
+# The columns of the top-k predicted frames (ids, padded with -1) and their confidences, if stored
+optional_columns = ["frame_candidates", "frame_confidences"]
+
+
+class Interner(object):
+    """
+    Maps strings to consecutive ids
+
+    NOTE: None is mapped to -1
+    """
+
+    def __init__(self):
+
+        self.ids = dict()
+        self.strings = []
+
+    def __call__(self, string: str):
+
+        if string is None:
+            return -1
+
+        i = self.ids.get(string)
+
+        if i is None:
+            i = len(self.strings)
+            self.ids[string] = i
+            self.strings.append(string)
+
+        return i
+
+
+class ColumnarStore(object):
+    """
+    Stores sentences and annotations as flat numpy arrays
+
+    Tokens, FEEs, frames and roles are interned, their ids index the string tables.
+    Sentence i consists of the tokens sentence_offsets[i] to sentence_offsets[i + 1],
+    its annotations are the rows annotation_offsets[i] to annotation_offsets[i + 1].
+    The role spans of annotation j are the rows role_offsets[j] to role_offsets[j + 1].
+
+    NOTE: Only the gold data of the annotations is stored, i.e. no embeddings or frame confidences.
+    NOTE: As in DataReader, trailing sentences without annotations may lack an entry in annotation_offsets.
+    """
+
+    def __init__(self, arrays: dict, strings: dict):
+
+        for name in columns:
+            setattr(self, name, arrays[name])
+
+        for name in tables:
+            setattr(self, name, strings[name])
+
+        for name in optional_columns:
+            setattr(self, name, arrays.get(name))
+
+        # Matrix of the embedded frames of all annotations, see DataReader.embed_frames
+        self.embedded_frames = None
+
+    @classmethod
+    def from_lists(
+        cls, sentences: List[List[str]], annotations: List[List[Annotation]], top_k: int = 0
+    ):
+        """
+        Creates the columns of the given sentences and annotations
+
+        :param sentences: A list of sentences, given as lists of words
+        :param annotations: A list of the annotations of each sentence
+        :param top_k: The amount of predicted frames and their confidences to store, 0 for none
+        :return: The ColumnarStore
+        """
+
+        builder = ColumnarBuilder(top_k)
+        builder.add(sentences, annotations)
+
+        return builder.build()
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True):
+        """
+        Loads a store saved by save
+
+        :param directory: The directory of the store
+        :param mmap: If true, the columns are memory-mapped instead of being read
+        :return: The ColumnarStore
+        """
+
+        mmap_mode = "r" if mmap else None
+
+        arrays = dict()
+        strings = dict()
+
+        for name in columns:
+            arrays[name] = np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+
+        for name in optional_columns:
+            path = os.path.join(directory, name + ".npy")
+
+            if os.path.isfile(path):
+                arrays[name] = np.load(path, mmap_mode=mmap_mode)
+
+        for name in tables:
+            strings[name] = array_to_strings(np.load(os.path.join(directory, name + ".npy")))
+
+        return cls(arrays, strings)
+
+    def save(self, directory: str):
+        """
+        Saves the columns as .npy files in the given directory
+
+        :param directory: The directory to save to
+        :return:
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        for name in columns:
+            np.save(os.path.join(directory, name + ".npy"), getattr(self, name))
+
+        for name in optional_columns:
+            if getattr(self, name) is not None:
+                np.save(os.path.join(directory, name + ".npy"), getattr(self, name))
+
+        for name in tables:
+            np.save(os.path.join(directory, name + ".npy"), strings_to_array(getattr(self, name)))
+
+    def __len__(self):
+        """
+        :return: The amount of sentences
+        """
+
+        return len(self.sentence_offsets) - 1
+
+    def count_annotated(self):
+        """
+        :return: The amount of sentences having an entry in annotation_offsets
+        """
+
+        return len(self.annotation_offsets) - 1
+
+    def get_string(self, table: List[str], i: int):
+        """
+        Helper function
+        Looks up an interned string
+
+        :param table: The string table
+        :param i: The id of the string
+        :return: The string, or None for -1
+        """
+
+        if i < 0:
+            return None
+
+        return table[i]
+
+    def get_sentence(self, i: int):
+        """
+        Creates the word list of a sentence
+
+        :param i: The index of the sentence
+        :return: The list of words
+        """
+
+        tokens = self.tokens[self.sentence_offsets[i] : self.sentence_offsets[i + 1]]
+
+        return [self.vocab[t] for t in tokens.tolist()]
+
+    def get_annotations(self, i: int, sentence: List[str]):
+        """
+        Creates the Annotation objects of a sentence
+
+        :param i: The index of the sentence
+        :param sentence: The word list of the sentence, shared by its annotations
+        :return: The list of annotations
+        """
+
+        annotations = []
+
+        for j in range(self.annotation_offsets[i], self.annotation_offsets[i + 1]):
+            first, last = self.role_offsets[j], self.role_offsets[j + 1]
+
+            roles = []
+
+            if self.roles_given[j]:
+                roles = [self.role_names[r] for r in self.roles[first:last].tolist()]
+
+            annotation = Annotation(
+                self.get_string(self.frame_names, self.frames[j]),
+                self.get_string(self.vocab, self.fees[j]),
+                tuple(self.positions[j].tolist()),
+                self.get_string(self.vocab, self.fees_raw[j]),
+                sentence,
+                roles,
+                [tuple(span) for span in self.role_spans[first:last].tolist()],
+            )
+
+            if self.embedded_frames is not None:
+                annotation.embedded_frame = self.embedded_frames[j]
+
+            if self.frame_candidates is not None:
+                annotation.frame_confidence = self.get_frame_confidence(j)
+
+            annotations.append(annotation)
+
+        return annotations
+
+    def get_frame_confidence(self, j: int):
+        """
+        Creates the list of predicted frames of an annotation
+
+        :param j: The index of the annotation
+        :return: A list of [frame, confidence] pairs, as in Annotation.frame_confidence
+        """
+
+        candidates = self.frame_candidates[j].tolist()
+        confidences = self.frame_confidences[j].tolist()
+
+        return [
+            [self.frame_names[frame], confidence]
+            for frame, confidence in zip(candidates, confidences)
+            if frame >= 0
+        ]
+
+    def find_frame(self, frame: str):
+        """
+        Finds the sentences annotated with a frame
+
+        NOTE: Only the columns are scanned, no annotation objects are created
+
+        :param frame: The name of the frame
+        :return: An array of the (distinct) indices of the sentences
+        """
+
+        if frame not in self.frame_names:
+            return np.zeros(0, dtype=np.int64)
+
+        frame_id = self.frame_names.index(frame)
+
+        return np.unique(self.get_sentence_indices()[np.asarray(self.frames) == frame_id])
+
+    def get_sentence_indices(self):
+        """
+        Maps the annotations to their sentences
+
+        :return: An array holding the index of the sentence of every annotation
+        """
+
+        return np.repeat(np.arange(self.count_annotated()), np.diff(self.annotation_offsets))
+
+    def get_words(self):
+        """
+        Helper function
+        Splits the tokens into word lists of the sentences
+
+        :return: A list of all sentences, given as lists of words
+        """
+
+        words = np.asarray(self.vocab, dtype=object)[self.tokens].tolist()
+        offsets = self.sentence_offsets.tolist()
+
+        return [words[offsets[i] : offsets[i + 1]] for i in range(len(self))]
+
+    def get_frame_dataset(self):
+        """
+        Creates the dataset of the frame identification directly from the columns
+
+        NOTE: Equals frame_identification.frameidentifier.get_dataset
+
+        :return: xs: A list of sentences prepended with their FEE
+                 ys: A list of frames corresponding to the given sentences
+        """
+
+        sentences = self.get_words()
+        fees_raw = [self.get_string(self.vocab, i) for i in self.fees_raw.tolist()]
+
+        indices = self.get_sentence_indices().tolist()
+
+        xs = [[fee] + sentences[i] for fee, i in zip(fees_raw, indices)]
+        ys = [self.get_string(self.frame_names, i) for i in self.frames.tolist()]
+
+        return xs, ys
+
+    def get_span_labels(self, begin: int = 0, inside: int = 1, outside: int = 2):
+        """
+        Creates the labels of the role spans of every annotation
+
+        NOTE: Later spans overwrite earlier ones, the begin of a span is labeled as begin
+
+        :param begin: The label of the first word of a span
+        :param inside: The label of the following words of a span
+        :param outside: The label of words outside of all spans
+        :return: A list of label lists, one per annotation
+        """
+
+        labels = []
+        lengths = np.diff(self.sentence_offsets)[self.get_sentence_indices()]
+        role_offsets = self.role_offsets.tolist()
+
+        for j, length in enumerate(lengths.tolist()):
+            label = np.full(length, outside, dtype=np.int64)
+
+            for start, end in self.role_spans[role_offsets[j] : role_offsets[j + 1]].tolist():
+                label[start] = begin
+                label[start + 1 : end + 1] = inside
+
+            labels.append(label.tolist())
+
+        return labels
+
+    def to_lists(self):
+        """
+        Creates the complete lists of sentences and annotations
+
+        :return: A pair of the sentences and their annotations
+        """
+
+        sentences = self.get_words()
+        annotations = [self.get_annotations(i, sentences[i]) for i in range(self.count_annotated())]
+
+        return sentences, annotations
+
+
+def get_offsets(lengths: List[int]):
+    """
+    Helper function
+    Converts lengths into offsets
+
+    :param lengths: A list of lengths
+    :return: An array of the offsets, starting with 0
+    """
+
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    return offsets
+
+
+class ColumnarBuilder(object):
+    """
+    Collects sentences and annotations incrementally and creates a ColumnarStore of them
+
+    NOTE: Only the interned ids are kept, not the annotation objects
+    """
+
+    def __init__(self, top_k: int = 0):
+
+        self.top_k = top_k
+
+        self.vocab = Interner()
+        self.frame_names = Interner()
+        self.role_names = Interner()
+
+        self.tokens = []
+        self.sentence_lengths = []
+        self.annotation_counts = []
+        self.frames = []
+        self.fees = []
+        self.fees_raw = []
+        self.positions = []
+        self.role_counts = []
+        self.role_spans = []
+        self.roles = []
+        self.roles_given = []
+        self.frame_candidates = []
+        self.frame_confidences = []
+
+    def add(self, sentences: List[List[str]], annotations: List[List[Annotation]]):
+        """
+        Appends sentences and their annotations
+
+        NOTE: Trailing sentences without annotations can lack an entry in annotations, as in DataReader
+
+        :param sentences: A list of sentences, given as lists of words
+        :param annotations: A list of the annotations of each sentence
+        :return:
+        """
+
+        # Pad the annotations of the previous sentences, as these are followed by further ones now
+        while len(self.annotation_counts) < len(self.sentence_lengths):
+            self.annotation_counts.append(0)
+
+        for sentence in sentences:
+            self.tokens += [self.vocab(word) for word in sentence]
+            self.sentence_lengths.append(len(sentence))
+
+        for sentence in annotations:
+            self.annotation_counts.append(len(sentence))
+
+            for annotation in sentence:
+                self.add_annotation(annotation)
+
+    def add_annotation(self, annotation: Annotation):
+        """
+        Helper function
+        Appends the data of a single annotation
+
+        :param annotation: The annotation
+        :return:
+        """
+
+        given = len(annotation.roles) > 0
+
+        if given and len(annotation.roles) != len(annotation.role_positions):
+            raise Exception("Inconsistency: amount of roles and their spans differ!")
+
+        if given:
+            self.roles += [self.role_names(role) for role in annotation.roles]
+        else:
+            self.roles += [-1] * len(annotation.role_positions)
+
+        self.roles_given.append(given)
+
+        self.frames.append(self.frame_names(annotation.frame))
+        self.fees.append(self.vocab(annotation.fee))
+        self.fees_raw.append(self.vocab(annotation.fee_raw))
+        self.positions.append(annotation.position)
+        self.role_counts.append(len(annotation.role_positions))
+        self.role_spans += annotation.role_positions
+
+        if self.top_k < 1:
+            return
+
+        candidates = annotation.frame_confidence[: self.top_k]
+        padding = self.top_k - len(candidates)
+
+        self.frame_candidates.append(
+            [self.frame_names(frame) for frame, _ in candidates] + [-1] * padding
+        )
+        self.frame_confidences.append(
+            [confidence for _, confidence in candidates] + [0.0] * padding
+        )
+
+    def build(self):
+        """
+        Creates the ColumnarStore of the collected data
+
+        :return: The ColumnarStore
+        """
+
+        arrays = {
+            "tokens": np.asarray(self.tokens, dtype=np.int32),
+            "sentence_offsets": get_offsets(self.sentence_lengths),
+            "annotation_offsets": get_offsets(self.annotation_counts),
+            "frames": np.asarray(self.frames, dtype=np.int32),
+            "fees": np.asarray(self.fees, dtype=np.int32),
+            "fees_raw": np.asarray(self.fees_raw, dtype=np.int32),
+            "positions": np.asarray(self.positions, dtype=np.int64).reshape(-1, 2),
+            "role_offsets": get_offsets(self.role_counts),
+            "role_spans": np.asarray(self.role_spans, dtype=np.int64).reshape(-1, 2),
+            "roles": np.asarray(self.roles, dtype=np.int32),
+            "roles_given": np.asarray(self.roles_given, dtype=np.bool_),
+        }
+
+        if self.top_k > 0:
+            candidates = np.asarray(self.frame_candidates, dtype=np.int32)
+            confidences = np.asarray(self.frame_confidences, dtype=np.float32)
+
+            arrays["frame_candidates"] = candidates.reshape(-1, self.top_k)
+            arrays["frame_confidences"] = confidences.reshape(-1, self.top_k)
+
+        strings = {
+            "vocab": self.vocab.strings,
+            "frame_names": self.frame_names.strings,
+            "role_names": self.role_names.strings,
+        }
+
+        return ColumnarStore(arrays, strings)
+
+
+class ColumnView(ABC):
+    """
+    A lazy, read-only list view on a ColumnarStore
+
+    Elements are created on access, see get.
+    """
+
+    def __init__(self, store: ColumnarStore):
+
+        self.store = store
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, i):
+
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+
+        if not 0 <= i < len(self):
+            raise IndexError("Sentence index out of range!")
+
+        return self.get(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, x):
+        return list(self) == list(x)
+
+    def get(self, i: int):
+        """
+        Returns an element of the view
+
+        NOTE: By default, every access creates a new element
+
+        :param i: The index of the element
+        :return: The element
+        """
+
+        return self.create(i)
+
+    @abstractmethod
+    def create(self, i: int):
+        """
+        Creates an element from the columns of the store
+
+        :param i: The index of the element
+        :return: The element
+        """
+
+
+class SentencesView(ColumnView):
+    """
+    The lazy view of the sentences of a ColumnarStore
+
+    NOTE: The words are decoded on every access and not kept, the returned lists must not be modified
+    """
+
+    def create(self, i: int):
+        return self.store.get_sentence(i)
+
+
+class AnnotationsView(ColumnView):
+    """
+    The lazy view of the annotations of a ColumnarStore
+
+    NOTE: Handed out annotations are kept, so modifications of them (e.g. predictions) persist.
+          The memory usage therefore only grows with the sentences actually accessed.
+    """
+
+    def __init__(self, store: ColumnarStore, sentences: SentencesView):
+        ColumnView.__init__(self, store)
+
+        self.sentences = sentences
+        self.items = dict()
+
+    def __len__(self):
+        return self.store.count_annotated()
+
+    def get(self, i: int):
+        item = self.items.get(i)
+
+        if item is None:
+            item = self.create(i)
+            self.items[i] = item
+
+        return item
+
+    def is_pristine(self):
+        """
+        Checks whether no annotation was handed out, thus none could have been modified
+
+        :return: True if no annotation was created yet
+        """
+
+        return not self.items
+
+    def create(self, i: int):
+        return self.store.get_annotations(i, self.sentences[i])
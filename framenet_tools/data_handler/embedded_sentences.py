@@ -0,0 +1,132 @@
+import numpy as np
+
+from typing import List
+
+
+class EmbeddedSentences(object):
+    """
+    Stores the word embeddings of all sentences in a single float32 buffer
+
+    Sentence i consists of the rows offsets[i] to offsets[i + 1],
+    each sentence is therefore exposed as a zero-copy view of the buffer.
+    """
+
+    def __init__(self, vectors: np.ndarray, offsets: np.ndarray):
+
+        self.vectors = vectors
+        self.offsets = offsets
+
+    @classmethod
+    def allocate(cls, lengths: List[int], dim: int):
+        """
+        Creates an uninitialized buffer for sentences of the given lengths
+
+        :param lengths: The amount of words of each sentence
+        :param dim: The dimension of the word embeddings
+        :return: The EmbeddedSentences object
+        """
+
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        vectors = np.empty((offsets[-1], dim), dtype=np.float32)
+
+        return cls(vectors, offsets)
+
+    def __len__(self):
+        """
+        :return: The amount of sentences
+        """
+
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int):
+        """
+        Returns the embeddings of a sentence
+
+        :param i: The index of the sentence
+        :return: A view of the buffer with one row per word
+        """
+
+        if i < 0:
+            i += len(self)
+
+        if not 0 <= i < len(self):
+            raise IndexError("Sentence index out of range!")
+
+        return self.vectors[self.offsets[i] : self.offsets[i + 1]]
+
+    def __iter__(self):
+        """
+        Iterates over the views of all sentences
+
+        :return:
+        """
+
+        for i in range(len(self)):
+            yield self[i]
+
+    def get_lengths(self, indices: List[int] = None):
+        """
+        Returns the amount of words of the given sentences
+
+        :param indices: The indices of the sentences, if None all sentences are used
+        :return: An array of sentence lengths
+        """
+
+        lengths = np.diff(self.offsets)
+
+        if indices is None:
+            return lengths
+
+        return lengths[np.asarray(indices, dtype=np.int64)]
+
+    def get_tensor(self, i: int):
+        """
+        Returns the embeddings of a sentence as a torch tensor
+
+        NOTE: The tensor shares the memory of the buffer
+
+        :param i: The index of the sentence
+        :return: A tensor with one row per word
+        """
+
+        import torch
+
+        return torch.from_numpy(self[i])
+
+    def batch(self, indices: List[int], padding_value: float = 0.0):
+        """
+        Creates a padded batch of the given sentences
+
+        :param indices: The indices of the sentences
+        :param padding_value: The value used for padding shorter sentences
+        :return: A pair of a (batch, max length, dim) array and an array of the sentence lengths
+        """
+
+        lengths = self.get_lengths(indices)
+        max_length = int(lengths.max()) if len(lengths) > 0 else 0
+
+        padded = np.full(
+            (len(lengths), max_length, self.vectors.shape[1]), padding_value, dtype=np.float32
+        )
+
+        for j, i in enumerate(indices):
+            padded[j, : lengths[j]] = self[i]
+
+        return padded, lengths
+
+    def batch_tensor(self, indices: List[int], padding_value: float = 0.0):
+        """
+        Creates a padded batch of the given sentences as torch tensors
+
+        :param indices: The indices of the sentences
+        :param padding_value: The value used for padding shorter sentences
+        :return: A pair of a (batch, max length, dim) tensor and a tensor of the sentence lengths
+        """
+
+        import torch
+
+        padded, lengths = self.batch(indices, padding_value)
+
+        return torch.from_numpy(padded), torch.from_numpy(lengths)
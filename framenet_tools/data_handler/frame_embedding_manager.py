@@ -1,17 +1,40 @@
 import logging
+import numpy as np
+import os
 
-from tqdm import tqdm
+from typing import List
+
+from framenet_tools.utils.static_utils import load_pkl_from_path
 
 
 class FrameEmbeddingManager(object):
     """
     Loads and provides the specified frame-embeddings
+
+    NOTE: The embeddings are kept as one float32 matrix and a frame name to row index.
+          The matrix is cached as .npy next to the source file.
     """
 
-    def __init__(self, path: str = "data/frame_embeddings/dict_frame_to_emb_100dim_wsb_list.txt"):
+    def __init__(
+        self,
+        path: str = "data/frame_embeddings/dict_frame_to_emb_100dim_wsb_npArray.pkl",
+        dim: int = 100,
+    ):
 
         self.path = path
+
+        # The dimension of the embeddings, only used if the source contains none
+        self.dim = dim
+
+        base_path = os.path.splitext(path)[0]
+        self.matrix_path = base_path + ".npy"
+        self.frames_path = base_path + ".frames"
+
         self.frames = None
+        self.vectors = None
+
+        # Blocks of shared memory backing the vectors, see SharedEmbeddings
+        self.shared_blocks = []
 
     def string_to_array(self, string: str):
         """
@@ -24,42 +47,125 @@ class FrameEmbeddingManager(object):
         :return: The array
         """
 
-        array = []
-
         string = string.replace("[", "")
         string = string.replace("]", "")
-        string = string.rsplit(",")
 
-        for element in string:
-            array.append(float(element))
+        return np.asarray(string.rsplit(","), dtype=np.float32)
+
+    def is_cached(self):
+        """
+        Checks whether an up to date cached matrix of the embedding file exists
+
+        :return: True if the cache can be used, otherwise False
+        """
+
+        if not os.path.isfile(self.matrix_path) or not os.path.isfile(self.frames_path):
+            return False
+
+        if not os.path.isfile(self.path):
+            return True
+
+        return os.path.getmtime(self.matrix_path) >= os.path.getmtime(self.path)
+
+    def load_source(self):
+        """
+        Loads the embeddings from the source file
+
+        NOTE: Either the published numpy pickle or the (legacy) text version of it.
+
+        :return: A list of frames and the concurrent matrix of embeddings
+        """
+
+        if self.path.rsplit(".")[-1] == "pkl":
+            dict_frame_emb = load_pkl_from_path(self.path)
+
+            frames = list(dict_frame_emb.keys())
+            vectors = [np.asarray(dict_frame_emb[frame], dtype=np.float32) for frame in frames]
+        else:
+            frames = []
+            vectors = []
+
+            with open(self.path, "r") as file:
+                for line in file:
+                    line = line.rstrip("\n").rsplit("\t")
+
+                    if len(line) > 1:
+                        frames.append(line[0])
+                        vectors.append(self.string_to_array(line[1]))
 
-        return array
+        if not vectors:
+            logging.warning(f"Found no frame embeddings in {self.path}")
+
+            return frames, np.zeros((0, self.dim), dtype=np.float32)
+
+        return frames, np.stack(vectors)
 
     def read_frame_embeddings(self):
         """
-        Loads the previously specified frame embedding file into a dictionary
+        Loads the previously specified frame embeddings into a matrix
         """
 
         if self.frames is not None:
             return
 
-        self.frames = dict()
-
         logging.info("Loading frame embeddings")
 
-        with open(self.path, "r") as file:
-            raw = file.read()
+        if self.is_cached():
+            self.vectors = np.load(self.matrix_path)
 
-        data = raw.rsplit("\n")
+            with open(self.frames_path, "r", newline="\n") as file:
+                frames = file.read().split("\n") if len(self.vectors) > 0 else []
+        else:
+            frames, self.vectors = self.load_source()
 
-        for line in tqdm(data):
-            line = line.rsplit("\t")
+            np.save(self.matrix_path, self.vectors)
 
-            if len(line) > 1:
-                self.frames[line[0]] = self.string_to_array(line[1])
+            with open(self.frames_path, "w", newline="\n") as file:
+                file.write("\n".join(frames))
+
+        self.frames = dict(zip(frames, range(len(frames))))
 
         logging.info("[Done] loading frame embeddings")
 
+    def get_rows(self, frames: List[str]):
+        """
+        Looks up the rows of the given frames in the embedding matrix
+
+        :param frames: A list of frames
+        :return: An array of row indices, -1 marking unknown frames
+        """
+
+        return np.fromiter((self.frames.get(frame, -1) for frame in frames), np.int64, len(frames))
+
+    def gather(self, frames: List[str]):
+        """
+        Looks up the embeddings of the given frames at once
+
+        :param frames: A list of frames
+        :return: The rows of the frames (-1 marking unknown frames) and a matrix of their embeddings,
+                 unknown frames being left as zeros
+        """
+
+        rows = self.get_rows(frames)
+        known = rows >= 0
+
+        embedded = np.zeros((len(frames), self.vectors.shape[1]), dtype=self.vectors.dtype)
+        embedded[known] = self.vectors[rows[known]]
+
+        return rows, embedded
+
+    def get_dimension(self):
+        """
+        Returns the dimension of the loaded frame embeddings
+
+        :return: The dimension of a single embedding, or the given default if nothing was loaded
+        """
+
+        if self.vectors is None or self.vectors.ndim != 2:
+            return self.dim
+
+        return self.vectors.shape[1]
+
     def embed(self, frame: str):
         """
         Converts a given frame to its embedding
@@ -68,7 +174,9 @@ class FrameEmbeddingManager(object):
         :return: The embedding (n-dimensional vector)
         """
 
-        if frame in self.frames:
-            return self.frames[frame]
+        row = self.frames.get(frame)
+
+        if row is None:
+            return None
 
-        return None
+        return self.vectors[row]
@@ -0,0 +1,80 @@
+from collections import namedtuple
+from typing import List
+
+from framenet_tools.data_handler.annotation import Annotation
+from framenet_tools.data_handler.columnar_store import AnnotationsView, SentencesView
+
+# The immutable gold data of an annotation
+GoldAnnotation = namedtuple(
+    "GoldAnnotation", ["frame", "fee_raw", "position", "sentence", "roles", "role_positions"]
+)
+
+
+def freeze_annotation(annotation: Annotation):
+    """
+    Captures the gold data of an annotation
+
+    NOTE: Roles and their spans are tuples already and therefore shared, not copied
+
+    :param annotation: The annotation
+    :return: The GoldAnnotation
+    """
+
+    return GoldAnnotation(
+        annotation.frame,
+        annotation.fee_raw,
+        tuple(annotation.position),
+        annotation.sentence,
+        annotation.roles,
+        annotation.role_positions,
+    )
+
+
+class GoldSnapshot(object):
+    """
+    A read-only snapshot of the gold data of a reader
+
+    Offers the parts of the DataReader interface used by the evaluation (sentences, annotations and get_columns),
+    at a fraction of the memory of a deep copy.
+
+    NOTE: The sentences are shared with the reader, as the stages never modify them.
+          Readers using an unmodified ColumnarStore are snapshot by a fresh view on the same store.
+    """
+
+    def __init__(self, sentences: List[List[str]], annotations: List[List[object]], columns=None):
+
+        self.sentences = sentences
+        self.annotations = annotations
+        self.columns = columns
+
+    @classmethod
+    def capture(cls, reader: object):
+        """
+        Takes a snapshot of the current annotations of a reader
+
+        :param reader: The reader holding the gold data
+        :return: The GoldSnapshot
+        """
+
+        store = reader.get_columns()
+
+        if store is not None:
+            sentences = SentencesView(store)
+
+            return cls(sentences, AnnotationsView(store, sentences), store)
+
+        annotations = [
+            tuple(freeze_annotation(annotation) for annotation in sentence)
+            for sentence in reader.annotations
+        ]
+
+        return cls(reader.sentences, annotations)
+
+    def get_columns(self):
+        """
+        Returns the ColumnarStore holding the gold data, if any
+
+        :return: The ColumnarStore or None
+        """
+
+        return self.columns
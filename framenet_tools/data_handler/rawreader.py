@@ -1,5 +1,11 @@
 from framenet_tools.data_handler.reader import DataReader
-from framenet_tools.utils.static_utils import get_sentences
+from framenet_tools.utils.static_utils import (
+    ensure_resources,
+    is_columns_directory,
+    is_json_file,
+    read_paragraphs,
+    stream_sentences,
+)
 from framenet_tools.config import ConfigManager
 
 
@@ -10,6 +16,8 @@ class RawReader(DataReader):
     Inherits from DataReader
     """
 
+    cache_settings = ["use_spacy", "spacy_profile_sentences", "raw_chunk_size"]
+
     def __init__(self, cM: ConfigManager, raw_path: str = None):
 
         DataReader.__init__(self, cM)
@@ -26,20 +34,74 @@ class RawReader(DataReader):
         :return:
         """
 
-        if raw_path.rsplit(".")[-1] == "json":
+        if raw_path is not None and is_json_file(raw_path):
             self.import_from_json(raw_path)
             return
 
+        if raw_path is not None and is_columns_directory(raw_path):
+            self.import_from_columns(raw_path)
+            return
+
+        self.sentences += self.stream_raw_text(raw_path)
+
+        self.loaded(False)
+
+    def stream_raw_text(self, raw_path: str = None):
+        """
+        Lazily reads the sentences of a raw text file
+
+        NOTE: The file is segmented in chunks of paragraphs, see read_paragraphs.
+              The sentences are NOT added to the reader, see read_raw_text for that.
+
+        :param raw_path: The path of the file to read
+        :return: A generator of sentences, consisting of tokens
+        """
+
         if raw_path is not None:
             self.raw_path = raw_path
 
         if self.raw_path is None:
             raise Exception("Found no file to read")
 
-        file = open(raw_path, "r")
-        raw = file.read()
-        file.close()
+        ensure_resources(backends=["spacy" if self.cM.use_spacy else "nltk"])
 
-        self.sentences += get_sentences(raw, self.cM.use_spacy)
+        chunks = read_paragraphs(self.raw_path, self.cM.raw_chunk_size)
 
-        self.loaded(False)
+        yield from stream_sentences(chunks, self.cM.use_spacy, self.cM.spacy_profile_sentences)
+
+    def stream_batches(self, raw_path: str = None, batch_size: int = None):
+        """
+        Reads a raw text file in batches of sentences
+
+        NOTE: Every batch is a new RawReader, so the memory usage does not grow with the file size.
+              Json files and exported columns are read with their annotations.
+
+        :param raw_path: The path of the file to read
+        :param batch_size: The amount of sentences per batch, defaults to the config
+        :return: A generator of RawReaders
+        """
+
+        if batch_size is None:
+            batch_size = self.cM.predict_batch_size
+
+        if raw_path is not None and is_json_file(raw_path):
+            sentences = self.stream_from_json(raw_path)
+        elif raw_path is not None and is_columns_directory(raw_path):
+            sentences = self.stream_from_columns(raw_path)
+        else:
+            sentences = ((words, []) for words in self.stream_raw_text(raw_path))
+
+        batch = RawReader(self.cM)
+
+        for words, annotations in sentences:
+            batch.add_sentence(words, annotations)
+
+            if len(batch.sentences) >= batch_size:
+                batch.loaded(False)
+                yield batch
+
+                batch = RawReader(self.cM)
+
+        if batch.sentences:
+            batch.loaded(False)
+            yield batch
@@ -1,14 +1,30 @@
+import hashlib
 import json
 import logging
 import numpy as np
-import random
+import os
 
 from tqdm import tqdm
 from typing import List
 
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.annotation import Annotation
+from framenet_tools.data_handler.columnar_store import (
+    AnnotationsView,
+    ColumnarBuilder,
+    ColumnarStore,
+    SentencesView,
+)
+from framenet_tools.data_handler.embedded_sentences import EmbeddedSentences
+from framenet_tools.data_handler.gold_snapshot import GoldSnapshot
+from framenet_tools.data_handler.reader_cache import ReaderCache, get_pos_tag_key
 from framenet_tools.utils.postagger import PosTagger
+from framenet_tools.utils.static_utils import (
+    get_oov_vector,
+    is_columns_directory,
+    is_json_lines_file,
+    open_compressed,
+)
 
 
 class DataReader(object):
@@ -18,6 +34,9 @@ class DataReader(object):
     Stores all loaded data from every reader.
     """
 
+    # The config options the parsed data depends on, part of the key of the ReaderCache
+    cache_settings = []
+
     def __init__(self, cM: ConfigManager):
 
         self.cM = cM
@@ -25,10 +44,18 @@ class DataReader(object):
         self.sentences = []
         self.annotations = []
 
-        # Embedded
+        # Embedded (an EmbeddedSentences object once embedded)
         self.embedded_sentences = []
         self.pos_tags = []
 
+        # The entry of the ReaderCache holding this data, if any
+        self.cache_path = None
+
+        # Maps the fingerprints of the sentences to their indices, see get_sentence_rows
+        self.sentence_index = dict()
+        self.indexed_sentences = None
+        self.indexed_count = 0
+
         # Flags
         self.is_annotated = None
         self.is_loaded = False
@@ -53,6 +80,44 @@ class DataReader(object):
 
         return equal
 
+    def use_columns(self, store: ColumnarStore):
+        """
+        Switches to the columnar backend
+
+        NOTE: Sentences and annotations become lazy views on the store, see ColumnarStore
+
+        :param store: The ColumnarStore holding the data
+        :return:
+        """
+
+        self.sentences = SentencesView(store)
+        self.annotations = AnnotationsView(store, self.sentences)
+
+    def get_columns(self):
+        """
+        Returns the ColumnarStore backing this reader, if it can be used in place of the annotations
+
+        NOTE: This is only the case as long as no annotation object was handed out, as these might have been modified.
+
+        :return: The ColumnarStore or None
+        """
+
+        if isinstance(self.annotations, AnnotationsView) and self.annotations.is_pristine():
+            return self.annotations.store
+
+        return None
+
+    def snapshot(self):
+        """
+        Captures the current annotations as gold data, e.g. before predicting on this reader
+
+        NOTE: Use this instead of deepcopy, see GoldSnapshot
+
+        :return: The GoldSnapshot
+        """
+
+        return GoldSnapshot.capture(self)
+
     def loaded(self, is_annotated: bool):
         """
         Helper for setting flags
@@ -64,16 +129,99 @@ class DataReader(object):
         self.is_loaded = True
         self.is_annotated = is_annotated
 
+    def add_sentence(self, words: List[str], annotations: List[Annotation]):
+        """
+        Adds a sentence and its annotations to the reader
+
+        :param words: The words of the sentence
+        :param annotations: The annotations of the sentence
+        :return:
+        """
+
+        sent_num = len(self.sentences)
+        self.sentences.append(words)
+
+        if not annotations:
+            return
+
+        while sent_num >= len(self.annotations):
+            self.annotations.append([])
+
+        self.annotations[sent_num] += annotations
+
     def export_to_json(self, path: str):
         """
         Exports the list of annotations to a json file
 
+        NOTE: For paths ending with .jsonl, one sentence is written per line, see JsonExporter
+
         :param path: The path of the json file
         :return:
         """
 
+        with JsonExporter(path) as exporter:
+            exporter.write(self)
+
+    def export_to_columns(self, path: str, top_k: int = None):
+        """
+        Exports the annotations in the binary format of a ColumnarStore
+
+        NOTE: Unlike the json export, sentences without annotations are kept
+
+        :param path: The directory to save the columns to
+        :param top_k: The amount of predicted frames per annotation to keep, defaults to the config
+        :return:
+        """
+
+        with ColumnarExporter(path, top_k or self.cM.prediction_top_k) as exporter:
+            exporter.write(self)
+
+    def import_from_columns(self, path: str, mmap: bool = True):
+        """
+        Reads the data of an exported ColumnarStore
+
+        NOTE: Replaces the previous dataset content. The columns are memory-mapped by default,
+              so sentences are only decoded on access, see use_columns.
+
+        :param path: The directory of the columns
+        :param mmap: If true, the columns are memory-mapped instead of being read
+        :return:
+        """
+
+        self.use_columns(ColumnarStore.load(path, mmap))
+
+    def stream_from_columns(self, path: str):
+        """
+        Reads the sentences of an exported ColumnarStore one by one
+
+        NOTE: The sentences are NOT added to the reader, see import_from_columns for that.
+
+        :param path: The directory of the columns
+        :return: A generator of the words of each sentence and the list of their annotations
+        """
+
+        store = ColumnarStore.load(path)
+
+        for i in range(len(store)):
+            words = store.get_sentence(i)
+
+            if i < store.count_annotated():
+                yield words, store.get_annotations(i, words)
+            else:
+                yield words, []
+
+    def get_json_data(self, first_id: int = 0):
+        """
+        Converts the annotations into the data of the json export
+
+        NOTE: Sentences without annotations are skipped
+
+        :param first_id: The id of the first exported sentence
+        :return: A list of dicts, one per sentence
+        """
+
         out_data = []
-        sent_count = 0
+        sent_count = first_id
 
         for annotations in self.annotations:
             data_dict = dict()
@@ -121,82 +269,93 @@ class DataReader(object):
 
             out_data.append(data_dict)
 
-        if path is None:
-            print(out_data)
-            return
-
-        with open(path, "w") as out:
-            json.dump(out_data, out, indent=4)
+        return out_data
 
     def import_from_json(self, path: str):
         """
         Reads the data from a given json file
 
+        NOTE: Json lines files (.jsonl) are supported as well, optionally compressed, see open_compressed
+
         :param path: The path to the json file
         :return:
         """
 
-        sent_num = 0
+        for words, annotations in self.stream_from_json(path):
+            self.add_sentence(words, annotations)
 
-        with open(path) as file:
-            json_data = json.load(file)
+    def stream_from_json(self, path: str):
+        """
+        Reads the sentences of a json file one by one
 
-        for data_pair in json_data:
+        NOTE: Only json lines files are actually read lazily, the nested format is parsed as a whole.
+              The sentences are NOT added to the reader, see import_from_json for that.
 
-            self.sentences.append(data_pair["sentence"])
+        :param path: The path to the json file
+        :return: A generator of the words of each sentence and the list of their annotations
+        """
+
+        with open_compressed(path) as file:
+            if is_json_lines_file(path):
+                json_data = (json.loads(line) for line in file if line.strip() != "")
+            else:
+                json_data = json.load(file)
+
+            for data_pair in json_data:
+                yield self.digest_json(data_pair)
+
+    def digest_json(self, data_pair: dict):
+        """
+        Converts the json data of a sentence back into annotations
 
-            prediction = data_pair["prediction"]
+        :param data_pair: The data of the sentence, as created by get_json_data
+        :return: The words of the sentence and the list of its annotations
+        """
 
-            for data in prediction:
+        words = data_pair["sentence"]
+        annotations = []
 
-                frame = None
-                fee = None
-                position = None
+        for data in data_pair["prediction"]:
 
-                if not data["frame"] == []:
-                    confidence = [i[1] for i in data["frame"]]
-                    confidence_max = np.asarray(confidence).argmax()
+            frame = None
+            fee = None
+            position = None
 
-                    frame = data["frame"][confidence_max][0]
+            if not data["frame"] == []:
+                confidence = [i[1] for i in data["frame"]]
+                confidence_max = np.asarray(confidence).argmax()
 
-                if not data["fee"] == "":
-                    fee = data["fee"]  # Frame evoking element
+                frame = data["frame"][confidence_max][0]
 
-                if not data["position"] == "":
-                    position = data["position"]
-                    position = (position, position)
+            if not data["fee"] == "":
+                fee = data["fee"]  # Frame evoking element
 
-                role_positions = []
-                roles = []
+            if not data["position"] == "":
+                position = data["position"]
+                position = (position, position)
 
-                for role_data in data["roles"]:
-                    role_positions.append(tuple(role_data["span"]))
-                    roles.append(role_data["role"])
+            role_positions = []
+            roles = []
 
-                # As this original information is lost, simply equal fee and fee_raw
-                fee_raw = fee
+            for role_data in data["roles"]:
+                role_positions.append(tuple(role_data["span"]))
+                roles.append(role_data["role"])
 
-                if sent_num >= len(self.annotations):
-                    self.annotations.append([])
+            # As this original information is lost, simply equal fee and fee_raw
+            fee_raw = fee
 
-                self.annotations[sent_num].append(
-                    Annotation(
-                        frame,
-                        fee,
-                        position,
-                        fee_raw,
-                        self.sentences[sent_num],
-                        roles,
-                        role_positions,
-                    )
-                )
+            annotations.append(
+                Annotation(frame, fee, position, fee_raw, words, roles, role_positions)
+            )
 
-            sent_num = sent_num + 1
+        return words, annotations
 
     def embed_word(self, word: str):
         """
         Embeds a single word
 
+        NOTE: Unknown words are embedded by a deterministic random vector, see get_oov_vector.
+
         :param word: The word to embed
         :return: The vector of the embedding
         """
@@ -204,18 +363,36 @@ class DataReader(object):
         embedded = self.cM.wEM.embed(word)
 
         if embedded is None:
-            embedded = self.cM.wEM.embed(word.lower())
-
-        if embedded is None:
-            embedded = [random.random() / 10 for _ in range(300)]
+            embedded = get_oov_vector(word, self.cM.wEM.get_dimension(), 0.1)
 
         return embedded
 
+    def get_vocabulary(self):
+        """
+        Collects all distinct words of the loaded sentences, including their lowercased versions.
+
+        :return: A set of words
+        """
+
+        vocabulary = set()
+
+        if isinstance(self.sentences, SentencesView):
+            # All words are interned in the vocab of the store
+            vocabulary.update(self.sentences.store.vocab)
+        else:
+            for sentence in self.sentences:
+                vocabulary.update(sentence)
+
+        vocabulary.update([word.lower() for word in vocabulary])
+
+        return vocabulary
+
     def embed_words(self, force: bool = False):
         """
         Embeds all words of all sentences that are currently saved in "sentences".
 
         NOTE: Can erase all previously embedded data!
+        NOTE: The embeddings are stored in one buffer, see EmbeddedSentences
 
         :param force: If true, all previously saved embeddings will be overwritten!
         :return:
@@ -225,27 +402,59 @@ class DataReader(object):
         if not not self.embedded_sentences and not force:
             return
 
-        self.cM.wEM.read_word_embeddings()
-
-        self.embedded_sentences = []
+        if self.cM.restrict_word_embeddings:
+            self.cM.wEM.read_word_embeddings(self.get_vocabulary())
+        else:
+            self.cM.wEM.read_word_embeddings()
 
         logging.info("Embedding sentences")
 
-        for sentence in tqdm(self.sentences):
-            embedded_sentence = []
+        if isinstance(self.sentences, SentencesView):
+            self.embed_words_columns(self.sentences.store)
 
-            for word in sentence:
-                embedded_sentence.append(self.embed_word(word))
+            logging.info("[Done] embedding sentences")
+            return
 
-            self.embedded_sentences.append(embedded_sentence)
+        self.embedded_sentences = EmbeddedSentences.allocate(
+            [len(sentence) for sentence in self.sentences], self.cM.wEM.get_dimension()
+        )
+
+        vectors = self.embedded_sentences.vectors
+        row = 0
+
+        for sentence in tqdm(self.sentences):
+            for word in sentence:
+                vectors[row] = self.embed_word(word)
+                row += 1
 
         logging.info("[Done] embedding sentences")
 
+    def embed_words_columns(self, store: ColumnarStore):
+        """
+        Embeds all words of a ColumnarStore
+
+        NOTE: Every distinct word is embedded only once, the sentences are gathered from these vectors
+
+        :param store: The ColumnarStore
+        :return:
+        """
+
+        vectors = np.empty((len(store.vocab), self.cM.wEM.get_dimension()), dtype=np.float32)
+
+        for i, word in enumerate(store.vocab):
+            vectors[i] = self.embed_word(word)
+
+        self.embedded_sentences = EmbeddedSentences(
+            vectors[store.tokens], np.array(store.sentence_offsets)
+        )
+
     def embed_frame(self, frame: str):
         """
         Embeds a single frame.
 
         NOTE: if the embeddings of the frame can not be found, a random set of values is generated.
+              These values are deterministic, see get_oov_vector,
+              and match the dimension of the loaded frame embeddings.
 
         :param frame: The frame to embed
         :return: The embedding of the frame
@@ -254,7 +463,7 @@ class DataReader(object):
         embedded = self.cM.fEM.embed(frame)
 
         if embedded is None:
-            embedded = [random.random() / 6 for _ in range(100)]
+            embedded = get_oov_vector(frame, self.cM.fEM.get_dimension(), 1 / 6)
 
         return embedded
 
@@ -263,30 +472,71 @@ class DataReader(object):
         Embeds all the sentences that are currently loaded.
 
         NOTE: if forced, overrides embedded data inside of the annotation objects
+        NOTE: All known frames are gathered from the embedding matrix at once
 
         :param force: If true, embeddings are generate even if they already exist
         :return:
         """
 
+        store = self.get_columns()
+
+        if store is not None:
+            self.embed_frames_columns(store, force)
+            return
+
         if (not self.annotations[0][0].embedded_frame is None) and not force:
             return
 
         self.cM.fEM.read_frame_embeddings()
 
-        logging.info("Embedding sentences")
+        logging.info("Embedding frames")
 
-        for annotations in tqdm(self.annotations):
+        annotations = [annotation for annotations in self.annotations for annotation in annotations]
+        frames = [annotation.frame for annotation in annotations]
 
-            for annotation in annotations:
+        rows, embedded = self.cM.fEM.gather(frames)
 
-                annotation.embedded_frame = self.embed_frame(annotation.frame)
+        for i in np.flatnonzero(rows < 0):
+            embedded[i] = self.embed_frame(frames[i])
 
-        logging.info("[Done] embedding sentences")
+        for annotation, embedded_frame in zip(annotations, embedded):
+            annotation.embedded_frame = embedded_frame
+
+        logging.info("[Done] embedding frames")
+
+    def embed_frames_columns(self, store: ColumnarStore, force: bool = False):
+        """
+        Embeds the frames of all annotations of a ColumnarStore
+
+        NOTE: The embeddings are kept as one matrix in the store and attached to annotations once these are created
+
+        :param store: The ColumnarStore
+        :param force: If true, embeddings are generate even if they already exist
+        :return:
+        """
+
+        if store.embedded_frames is not None and not force:
+            return
+
+        self.cM.fEM.read_frame_embeddings()
+
+        logging.info("Embedding frames")
+
+        rows, embedded = self.cM.fEM.gather(store.frame_names)
+
+        for i in np.flatnonzero(rows < 0):
+            embedded[i] = self.embed_frame(store.frame_names[i])
+
+        store.embedded_frames = embedded[store.frames]
+
+        logging.info("[Done] embedding frames")
 
     def generate_pos_tags(self, force: bool = False):
         """
         Generates the POS-tags of all sentences that are currently saved.
 
+        NOTE: The sentences are tagged in batches, see PosTagger.get_tags_batch
+
         :param force: If true, the POS-tags will overwrite previously saved tags.
         :return:
         """
@@ -295,29 +545,363 @@ class DataReader(object):
         if not not self.pos_tags and not force:
             return
 
-        pos_tagger = PosTagger(self.cM.use_spacy)
-        count = 0
+        pos_tagger = PosTagger(self.cM.use_spacy, self.cM.spacy_profile_pos)
 
         self.pos_tags = []
 
-        for sentence in self.sentences:
-            tags = pos_tagger.get_tags(sentence)
-            self.pos_tags.append(tags)
+        tagged = pos_tagger.get_tags_batch(
+            self.sentences, self.cM.pos_batch_size, self.cM.pos_workers
+        )
 
+        for sentence, tags in zip(self.sentences, tagged):
+            # The taggers keep the given tokens, see PosTagger
             if len(sentence) != len(tags):
-                count += 1
+                raise Exception("Inconsistency: POS-tags are not aligned with the sentence!")
+
+            self.pos_tags.append(tags)
+
+        if self.cache_path is not None:
+            ReaderCache(self.cM).update_feature(
+                self.cache_path, get_pos_tag_key(self.cM), self.pos_tags
+            )
+
+    def update_sentence_index(self):
+        """
+        Adds the sentences appended since the last update to the sentence index
+
+        NOTE: If the list of sentences was replaced or shortened, the index is rebuilt
+
+        :return:
+        """
+
+        if self.indexed_sentences is not self.sentences or self.indexed_count > len(self.sentences):
+            self.sentence_index = dict()
+            self.indexed_sentences = self.sentences
+            self.indexed_count = 0
+
+        for i in range(self.indexed_count, len(self.sentences)):
+            fingerprint = get_fingerprint(self.sentences[i])
+            self.sentence_index.setdefault(fingerprint, []).append(i)
+
+        self.indexed_count = len(self.sentences)
+
+    def get_sentence_rows(self, sentence: List[str]):
+        """
+        Looks up the indices of all occurrences of a sentence
+
+        :param sentence: The sentence, given as a list of words
+        :return: A list of indices
+        """
+
+        self.update_sentence_index()
+
+        rows = self.sentence_index.get(get_fingerprint(sentence), [])
+
+        # Guard against collisions of the fingerprints
+        return [i for i in rows if self.sentences[i] == sentence]
+
+    def get_row_annotations(self, i: int):
+        """
+        Returns the annotations of the sentence at the given index
+
+        NOTE: Trailing sentences without annotations might have no entry in annotations
+
+        :param i: The index of the sentence
+        :return: The list of annotations
+        """
+
+        if i < len(self.annotations):
+            return self.annotations[i]
+
+        return []
 
     def get_annotations(self, sentence: List[str] = None):
         """
         Returns the annotation object for a given sentence.
 
+        NOTE: If the sentence occurs multiple times, the annotations of the first occurrence are returned
+
         :param sentence: The sentence to retrieve the annotations for.
-        :return: A annoation object
+        :return: A list of annotation objects, None if the sentence is unknown
         """
 
-        for i in len(self.sentences):
+        rows = self.get_sentence_rows(sentence)
 
-            if self.sentences[i] == sentence:
-                return self.annotations[i]
+        if not rows:
+            return None
 
-        return None
+        return self.get_row_annotations(rows[0])
+
+    def merge(self, reader: "DataReader"):
+        """
+        Merges the sentences and annotations of another reader into this one
+
+        NOTE: Known sentences are not added again, only their new annotations are.
+              Derived data like embeddings and POS-tags of this reader are dropped.
+
+        :param reader: The reader to merge
+        :return:
+        """
+
+        self.materialize()
+
+        for i, sentence in enumerate(reader.sentences):
+            self.add_annotations(sentence, reader.get_row_annotations(i))
+
+        self.embedded_sentences = []
+        self.pos_tags = []
+
+    def deduplicate(self):
+        """
+        Removes repeated sentences, keeping the first occurrence with the distinct annotations of all occurrences
+
+        NOTE: Derived data like embeddings and POS-tags are dropped.
+
+        :return:
+        """
+
+        sentences = list(self.sentences)
+        annotations = [self.get_row_annotations(i) for i in range(len(sentences))]
+
+        self.sentences = []
+        self.annotations = []
+
+        for sentence, sentence_annotations in zip(sentences, annotations):
+            self.add_annotations(sentence, sentence_annotations)
+
+        self.embedded_sentences = []
+        self.pos_tags = []
+
+    def add_annotations(self, sentence: List[str], annotations: List[Annotation]):
+        """
+        Helper function
+        Adds annotations of a sentence, adding the sentence too if it is unknown
+
+        NOTE: Annotations equal to existing ones are skipped
+
+        :param sentence: The sentence, given as a list of words
+        :param annotations: The annotations of the sentence
+        :return:
+        """
+
+        rows = self.get_sentence_rows(sentence)
+
+        if not rows:
+            rows = [len(self.sentences)]
+            self.sentences.append(sentence)
+
+        i = rows[0]
+
+        while i >= len(self.annotations):
+            self.annotations.append([])
+
+        known = set(annotation.get_key() for annotation in self.annotations[i])
+
+        for annotation in annotations:
+            key = annotation.get_key()
+
+            if key in known:
+                continue
+
+            known.add(key)
+
+            # Annotations share the word list of their sentence
+            annotation.sentence = self.sentences[i]
+            self.annotations[i].append(annotation)
+
+    def materialize(self):
+        """
+        Converts the lazy views of the columnar backend into lists, as these can not be modified
+
+        :return:
+        """
+
+        if isinstance(self.sentences, SentencesView):
+            self.annotations = list(self.annotations)
+            self.sentences = list(self.sentences)
+
+
+def get_fingerprint(sentence: List[str]):
+    """
+    Computes a compact fingerprint of a sentence
+
+    :param sentence: The sentence, given as a list of words
+    :return: The fingerprint (16 bytes)
+    """
+
+    return hashlib.blake2b("\x1f".join(sentence).encode("utf-8"), digest_size=16).digest()
+
+
+class JsonExporter(object):
+    """
+    Writes the json export of readers incrementally
+
+    Readers are appended to one json array, e.g. the batches of a large prediction.
+    The output equals the export of a single reader holding all the sentences.
+    Paths ending with .jsonl (optionally followed by .gz or .zst) are written as json lines, one sentence per line.
+
+    NOTE: Without a path, the data is printed instead.
+          The export is written to a temporary file, which replaces the path once it is complete.
+    """
+
+    def __init__(self, path: str = None):
+
+        self.path = path
+        self.file = None
+        self.count = 0
+        self.json_lines = path is not None and is_json_lines_file(path)
+        self.tmp_path = None
+
+        if path is not None:
+            # Prefixed, so the extensions deciding the format and compression are kept
+            directory, name = os.path.split(path)
+            self.tmp_path = os.path.join(directory, f".{os.getpid()}.tmp.{name}")
+
+    def __enter__(self):
+
+        if self.path is not None:
+            self.file = open_compressed(self.tmp_path, "w")
+
+            if not self.json_lines:
+                self.file.write("[")
+
+        return self
+
+    def __exit__(self, type, value, traceback):
+
+        if type is not None:
+            self.discard()
+            return
+
+        self.close()
+
+    def write(self, reader: DataReader):
+        """
+        Appends the annotations of a reader
+
+        :param reader: The reader to export
+        :return:
+        """
+
+        out_data = reader.get_json_data(self.count)
+
+        if self.file is None:
+            print(out_data)
+            self.count += len(out_data)
+            return
+
+        for data_dict in out_data:
+            if self.json_lines:
+                self.file.write(json.dumps(data_dict) + "\n")
+                self.count += 1
+                continue
+
+            if self.count > 0:
+                self.file.write(",")
+
+            # Matches the layout of json.dump with an indent of 4
+            self.file.write("\n    " + json.dumps(data_dict, indent=4).replace("\n", "\n    "))
+            self.count += 1
+
+    def close(self):
+        """
+        Terminates the json array and closes the file
+
+        :return:
+        """
+
+        if self.file is None:
+            return
+
+        if not self.json_lines:
+            self.file.write("\n]" if self.count > 0 else "]")
+
+        self.file.close()
+        self.file = None
+
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        """
+        Closes and deletes the incomplete export, e.g. after an exception
+
+        NOTE: An existing file at the path is left untouched
+
+        :return:
+        """
+
+        if self.file is None:
+            return
+
+        self.file.close()
+        self.file = None
+
+        os.remove(self.tmp_path)
+
+
+class ColumnarExporter(object):
+    """
+    Writes the binary export of readers incrementally
+
+    Readers are appended to one ColumnarStore, which is saved when the exporter is closed.
+    Frames are stored along with the top-k predicted frames and their confidences.
+
+    NOTE: Only the interned ids of the data are held until then, not the annotation objects
+    """
+
+    def __init__(self, path: str, top_k: int = 5):
+
+        self.path = path
+        self.builder = ColumnarBuilder(top_k)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+
+        # An incomplete export is not saved
+        if type is not None:
+            self.builder = None
+            return
+
+        self.close()
+
+    def write(self, reader: DataReader):
+        """
+        Appends the sentences and annotations of a reader
+
+        :param reader: The reader to export
+        :return:
+        """
+
+        self.builder.add(reader.sentences, reader.annotations)
+
+    def close(self):
+        """
+        Saves the collected data
+
+        :return:
+        """
+
+        if self.builder is None:
+            return
+
+        self.builder.build().save(self.path)
+        self.builder = None
+
+
+def get_exporter(path: str, cM: ConfigManager):
+    """
+    Creates the exporter matching the given output path
+
+    NOTE: Paths ending with .columns are exported in the binary format, all others as json
+
+    :param path: The path to export to (can be None)
+    :param cM: The ConfigManager
+    :return: A ColumnarExporter or JsonExporter
+    """
+
+    if path is not None and is_columns_directory(path):
+        return ColumnarExporter(path, cM.prediction_top_k)
+
+    return JsonExporter(path)
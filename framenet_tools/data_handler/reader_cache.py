@@ -0,0 +1,276 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+from typing import List
+
+from framenet_tools.config import ConfigManager
+from framenet_tools.data_handler.columnar_store import ColumnarStore
+
+# Increase whenever the layout of the cached data changes
+CACHE_VERSION = 2
+
+# Temporary entries older than this (in seconds) are considered to be left over by crashed runs
+TMP_MAX_AGE = 24 * 60 * 60
+
+
+def hash_file(path: str, block_size: int = 2 ** 20):
+    """
+    Computes the sha256 hash of a file's content
+
+    :param path: The path of the file
+    :param block_size: The amount of bytes read at once
+    :return: The hex digest of the hash
+    """
+
+    file_hash = hashlib.sha256()
+
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            file_hash.update(block)
+
+    return file_hash.hexdigest()
+
+
+def get_size(path: str):
+    """
+    Computes the size of all files inside of a directory
+
+    :param path: The path of the directory
+    :return: The size in bytes
+    """
+
+    size = 0
+
+    for root, _, files in os.walk(path):
+        size += sum(os.path.getsize(os.path.join(root, file)) for file in files)
+
+    return size
+
+
+def get_pos_tag_key(cM: ConfigManager):
+    """
+    Names the cached POS-tags after the configuration they were created with
+
+    :param cM: The ConfigManager
+    :return: The name of the feature
+    """
+
+    if cM.use_spacy:
+        return "pos_tags:spacy:" + cM.spacy_profile_pos
+
+    return "pos_tags:nltk"
+
+
+class ReaderCache(object):
+    """
+    A content-addressed on-disk cache of parsed readers
+
+    Entries are keyed by the hashes of the source files, the class of the reader and the config options
+    the entry depends on (see DataReader.cache_settings).
+    Each entry is a directory holding the columns of a ColumnarStore.
+    Derived features (currently the POS-tags) are stored alongside, named after the configuration they depend on.
+
+    NOTE: Changed source files result in a new key, stale entries are never read again.
+          These are removed once the cache exceeds its size limit, least recently used first, see clean.
+    """
+
+    def __init__(self, cM: ConfigManager, directory: str = "data/cache/"):
+
+        self.cM = cM
+        self.directory = directory
+
+    def get_path(self, reader: object, files: List[str]):
+        """
+        Computes the path of the cache entry for the given files
+
+        :param reader: The reader to load the files with
+        :param files: The source files
+        :return: The path of the cache entry
+        """
+
+        key = hashlib.sha256()
+        key.update(f"{CACHE_VERSION}:{type(reader).__name__}".encode("utf-8"))
+
+        for setting in sorted(["columnar_readers"] + reader.cache_settings):
+            key.update(f":{setting}={getattr(reader.cM, setting)}".encode("utf-8"))
+
+        for file in files:
+            key.update(hash_file(file).encode("utf-8"))
+
+        return os.path.join(self.directory, key.hexdigest())
+
+    def load(self, reader: object, files: List[str]):
+        """
+        Loads the cached data of the given files into the reader
+
+        NOTE: The path of the cache entry is remembered by the reader, even if no entry exists yet.
+              Like this, the data can later be stored or updated without hashing the files again.
+
+        :param reader: The reader to load the data into
+        :param files: The source files
+        :return: True if the cache was hit, otherwise False
+        """
+
+        reader.cache_path = self.get_path(reader, files)
+
+        if not os.path.isdir(reader.cache_path):
+            return False
+
+        logging.info(f"Loading cached dataset {reader.cache_path}")
+
+        # Mark the entry as recently used, see clean
+        os.utime(reader.cache_path)
+
+        store = ColumnarStore.load(reader.cache_path, self.cM.columnar_readers)
+
+        if self.cM.columnar_readers:
+            reader.use_columns(store)
+        else:
+            reader.sentences, reader.annotations = store.to_lists()
+
+        features = self.read_features(reader.cache_path)
+        reader.pos_tags = features.get(get_pos_tag_key(self.cM), [])
+
+        return True
+
+    def store(self, reader: object):
+        """
+        Stores the data of a reader in its cache entry
+
+        NOTE: The path of the entry has to be set by load beforehand.
+              If a concurrent run stored the entry first, it is kept, as it holds the same data.
+
+        :param reader: The reader
+        :return:
+        """
+
+        features = dict()
+
+        if reader.pos_tags:
+            features[get_pos_tag_key(self.cM)] = reader.pos_tags
+
+        # Write to a unique temporary directory, so concurrent runs never read partially written entries
+        os.makedirs(self.directory, exist_ok=True)
+
+        tmp_path = tempfile.mkdtemp(
+            prefix=os.path.basename(reader.cache_path) + ".", suffix=".tmp", dir=self.directory
+        )
+
+        ColumnarStore.from_lists(reader.sentences, reader.annotations).save(tmp_path)
+        self.write_features(tmp_path, features)
+
+        try:
+            os.replace(tmp_path, reader.cache_path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+            if not os.path.isdir(reader.cache_path):
+                raise
+
+            logging.debug(f"Cached dataset {reader.cache_path} was stored by another run")
+
+        self.clean(keep=[reader.cache_path])
+
+    def clean(self, max_size: int = None, keep: List[str] = None):
+        """
+        Removes the least recently used entries until the cache fits into the size limit
+
+        NOTE: Temporary entries left over by crashed runs are removed as well
+
+        :param max_size: The maximum size of the cache in MB, defaults to the config (0 empties the cache)
+        :param keep: Paths of entries which are never removed
+        :return: The paths of the removed entries
+        """
+
+        if max_size is None:
+            max_size = self.cM.reader_cache_size
+
+        if not os.path.isdir(self.directory):
+            return []
+
+        entries = []
+        removed = []
+
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+
+            if not os.path.isdir(path):
+                continue
+
+            if name.endswith(".tmp"):
+                if os.path.getmtime(path) < time.time() - TMP_MAX_AGE:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed.append(path)
+
+                continue
+
+            entries.append((os.path.getmtime(path), get_size(path), path))
+
+        size = 0
+        keep = [os.path.abspath(path) for path in keep or []]
+
+        # Most recently used first
+        for _, entry_size, path in sorted(entries, reverse=True):
+            size += entry_size
+
+            if size > max_size * 2 ** 20 and os.path.abspath(path) not in keep:
+                logging.info(f"Removing cached dataset {path}")
+
+                shutil.rmtree(path, ignore_errors=True)
+                removed.append(path)
+                size -= entry_size
+
+        return removed
+
+    def update_feature(self, path: str, name: str, value: object):
+        """
+        Adds a derived feature to an existing cache entry
+
+        :param path: The path of the cache entry
+        :param name: The name of the feature
+        :param value: The value of the feature
+        :return:
+        """
+
+        if not os.path.isdir(path):
+            return
+
+        features = self.read_features(path)
+        features[name] = value
+
+        self.write_features(path, features)
+
+    def read_features(self, path: str):
+        """
+        Reads the derived features of a cache entry
+
+        :param path: The path of the cache entry
+        :return: A dict of the features
+        """
+
+        with open(os.path.join(path, "features.pkl"), "rb") as file:
+            return pickle.load(file)
+
+    def write_features(self, path: str, features: dict):
+        """
+        Writes the derived features of a cache entry
+
+        NOTE: The file is replaced atomically
+
+        :param path: The path of the cache entry
+        :param features: A dict of the features
+        :return:
+        """
+
+        features_path = os.path.join(path, "features.pkl")
+        tmp_path = f"{features_path}.{os.getpid()}.tmp"
+
+        with open(tmp_path, "wb") as file:
+            pickle.dump(features, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(tmp_path, features_path)
@@ -1,3 +1,5 @@
+from typing import Iterable, List
+
 from framenet_tools.data_handler.reader import DataReader
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.annotation import Annotation
@@ -18,47 +20,91 @@ class SemaforReader(DataReader):
         self.path_sent = path_sent
         self.path_elements = path_elements
 
-    def digest_raw_data(self, elements: list, sentences: list):
+    def digest_raw_data(self, elements: Iterable[str], sentences: Iterable[str]):
         """
         Converts the raw elements and sentences into a nicely structured dataset
 
         NOTE: This representation is meant to match the one in the "frames-files"
+        NOTE: The elements have to be ordered by their sentence number, see digest_lines
 
         :param elements: the annotation data of the given sentences
         :param sentences: the sentences to digest
         :return:
         """
 
-        # Append sentences
+        for words, annotations in self.digest_lines(elements, sentences):
+            self.add_sentence(words, annotations)
+
+    def digest_lines(self, elements: Iterable[str], sentences: Iterable[str]):
+        """
+        Walks the lines of the elements and their sentences in lockstep
+
+        NOTE: The elements have to be ordered by their sentence number, as in the Semafor files.
+              Otherwise an exception is raised, as out of order elements can not be assigned anymore.
+              Only a single pending element is kept, so the memory usage does not grow with the input.
+
+        :param elements: The lines of the elements
+        :param sentences: The lines of the sentences
+        :return: A generator of the words of each sentence and the list of their annotations
+        """
+
+        elements = (element for element in elements if element.strip("\r\n") != "")
+        element = next(elements, None)
+        sent_num = 0
+
         for sentence in sentences:
-            words = sentence.split(" ")
-            while "" in words:
-                words.remove("")
-            self.sentences.append(words)
+            words = [word for word in sentence.rstrip("\r\n").split(" ") if word != ""]
+            annotations = []
+
+            while element is not None:
+                annotation_num = int(element.split("\t", 8)[7])
+
+                if annotation_num < sent_num:
+                    raise Exception(
+                        f"Inconsistency: element of sentence {annotation_num} found after sentence "
+                        f"{sent_num}, the elements have to be ordered by sentence!"
+                    )
 
-        for element in elements:
-            # Element data
-            element_data = element.split("\t")
+                if annotation_num > sent_num:
+                    break
 
-            frame = element_data[3]  # Frame
-            fee = element_data[4]  # Frame evoking element
-            position = element_data[5].rsplit("_")  # Position of word in sentence
-            position = (int(position[0]), int(position[-1]))
-            fee_raw = element_data[6].rsplit(" ")[0]  # Frame evoking element as it appeared
+                annotations.append(self.digest_element(element, words))
+                element = next(elements, None)
 
-            sent_num = int(element_data[7])  # Sentence number
+            yield words, annotations
 
-            if sent_num >= len(self.annotations):
-                self.annotations.append([])
+            sent_num += 1
 
-            roles, role_positions = self.digest_role_data(element)
+        if element is not None:
+            annotation_num = int(element.split("\t", 8)[7])
 
-            self.annotations[sent_num].append(
-                Annotation(
-                    frame, fee, position, fee_raw, self.sentences[sent_num], roles, role_positions,
-                )
+            raise Exception(
+                f"Inconsistency: element refers to sentence {annotation_num}, "
+                f"but only {sent_num} sentences were found!"
             )
 
+    def digest_element(self, element: str, words: List[str]):
+        """
+        Parses a line of the elements file into an annotation
+
+        :param element: The line of the element
+        :param words: The words of the annotated sentence
+        :return: The Annotation
+        """
+
+        # Element data
+        element_data = element.rstrip("\r\n").split("\t")
+
+        frame = element_data[3]  # Frame
+        fee = element_data[4]  # Frame evoking element
+        position = element_data[5].rsplit("_")  # Position of word in sentence
+        position = (int(position[0]), int(position[-1]))
+        fee_raw = element_data[6].rsplit(" ")[0]  # Frame evoking element as it appeared
+
+        roles, role_positions = self.digest_role_data(element.rstrip("\r\n"))
+
+        return Annotation(frame, fee, position, fee_raw, words, roles, role_positions)
+
     def digest_role_data(self, element: str):
         """
         Parses a string of role information into the desired format
@@ -90,11 +136,9 @@ class SemaforReader(DataReader):
 
         return roles, role_positions
 
-    def read_data(self, path_sent: str = None, path_elements: str = None):
+    def check_paths(self, path_sent: str = None, path_elements: str = None):
         """
-        Reads a the sentence and elements file and saves the content as a dataset
-
-        NOTE: Applying this function removes the previous dataset content
+        Sets and checks the paths of the files to read
 
         :param path_sent: The path to the sentence file
         :param path_elements: The path to the elements
@@ -113,22 +157,35 @@ class SemaforReader(DataReader):
         if self.path_elements is None:
             raise Exception("Found no elements-file to read!")
 
-        with open(self.path_sent, "r") as file:
-            sentences = file.read()
+    def read_data(self, path_sent: str = None, path_elements: str = None):
+        """
+        Reads a the sentence and elements file and saves the content as a dataset
 
-        with open(self.path_elements, "r") as file:
-            elements = file.read()
+        NOTE: Applying this function removes the previous dataset content
 
-        sentences = sentences.split("\n")
-        elements = elements.split("\n")
+        :param path_sent: The path to the sentence file
+        :param path_elements: The path to the elements
+        :return:
+        """
 
-        # Remove empty line at the end
-        if elements[len(elements) - 1] == "":
-            elements = elements[: len(elements) - 1]
+        for words, annotations in self.stream_data(path_sent, path_elements):
+            self.add_sentence(words, annotations)
 
-        if sentences[len(sentences) - 1] == "":
-            sentences = sentences[: len(sentences) - 1]
+        self.loaded(True)
 
-        self.digest_raw_data(elements, sentences)
+    def stream_data(self, path_sent: str = None, path_elements: str = None):
+        """
+        Streams the sentence and elements file sentence by sentence
 
-        self.loaded(True)
+        NOTE: Both files are read line by line in a single pass, see digest_lines.
+              The sentences are NOT added to the reader, see read_data for that.
+
+        :param path_sent: The path to the sentence file
+        :param path_elements: The path to the elements
+        :return: A generator of the words of each sentence and the list of their annotations
+        """
+
+        self.check_paths(path_sent, path_elements)
+
+        with open(self.path_sent, "r") as sentences, open(self.path_elements, "r") as elements:
+            yield from self.digest_lines(elements, sentences)
@@ -1,43 +1,227 @@
+import os
 import xml.etree.ElementTree
 
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from typing import List
 
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.annotation import Annotation
 from framenet_tools.data_handler.reader import DataReader
+from framenet_tools.data_handler.shared_embeddings import WorkerPool
 
 
-def char_pos_to_sentence_pos(start_char: int, end_char: int, words: List[str]):
+def get_word_offsets(words: List[str]):
+    """
+    Computes the character offsets of the words in a sentence
+
+    NOTE: The words are assumed to be separated by single spaces
+
+    :param words: A list of words in a sentence
+    :return: A list of the offsets of each word, followed by the offset after the last word
+    """
+
+    # +1 due to empty spaces between words
+    return [0] + list(accumulate(len(word) + 1 for word in words))
+
+
+def char_pos_to_sentence_pos(
+    start_char: int, end_char: int, words: List[str], offsets: List[int] = None
+):
     """
     Converts positions of char spans in a sentence into word positions.
 
     NOTE: Returned end position is represented inclusive!
+    NOTE: For multiple spans of one sentence, pass the offsets of get_word_offsets to avoid recomputing them.
 
     :param start_char: The first character of the span
     :param end_char: The last character of the span
     :param words: A list of words in a sentence
+    :param offsets: The character offsets of the words, as returned by get_word_offsets
     :return: The start and end position of the WORD in the sentence
     """
 
-    start = -1
-    end = -1
+    if offsets is None:
+        offsets = get_word_offsets(words)
+
+    # The first word beginning at or after the span and the first word beginning after its end
+    start = bisect_left(offsets, start_char)
+    i = bisect_right(offsets, end_char)
+
+    if i > len(words):
+        raise Exception("Inconsistency: position not inside sentence!")
+
+    if start > i:
+        start = -1
+
+    return start, max(i - 1, start)
+
+
+# Files are only split into chunks of at least this size (in bytes)
+MIN_CHUNK_SIZE = 2 ** 20
+
+
+def find_sentence(data: bytes, pos: int = 0):
+    """
+    Finds the beginning of the next sentence element
+
+    NOTE: Searches the raw bytes, a tag inside of a comment or a CDATA section would be found as well
+
+    :param data: The raw content of a xml file
+    :param pos: The position to start searching from
+    :return: The position of the next sentence element, or the length of the data if there is none
+    """
+
+    while True:
+        pos = data.find(b"<sentence", pos)
 
-    chars = 0
+        if pos == -1:
+            return len(data)
+
+        # Skip other tags starting with the same name, e.g. <sentences>
+        if data[pos + 9 : pos + 10] in [b" ", b">", b"/"]:
+            return pos
+
+        pos += 9
+
+
+def find_sentence_in_file(file, pos: int, block_size: int = 2 ** 16):
+    """
+    Finds the beginning of the next sentence element in an opened file
+
+    :param file: The xml file, opened in binary mode
+    :param pos: The position to start searching from
+    :param block_size: The amount of bytes read at once
+    :return: The position of the next sentence element, or the size of the file if there is none
+    """
 
-    for i in range(len(words) + 1):
-        if start == -1 and start_char <= chars:
-            start = i
+    file.seek(pos)
+    data = b""
 
-        if end == -1 and end_char < chars:
-            return start, max(i - 1, start)
+    while True:
+        block = file.read(block_size)
+        data += block
 
-        if i == len(words):
-            break
+        found = find_sentence(data)
 
-        # +1 due to empty spaces between words
-        chars += len(words[i]) + 1
+        # Only accept matches that can not be cut off by the end of the data
+        if found + 10 <= len(data) or not block:
+            return pos + found
 
-    raise Exception("Inconsistency: position not inside sentence!")
+        # Keep the tail, as a tag might be split between two blocks
+        pos += max(len(data) - 10, 0)
+        data = data[max(len(data) - 10, 0) :]
+
+
+def split_file(path_xml: str, num_chunks: int):
+    """
+    Splits a xml file into byte ranges on sentence boundaries
+
+    NOTE: Chunks without any sentence are dropped
+
+    :param path_xml: The path of the xml file
+    :param num_chunks: The maximum amount of chunks
+    :return: A list of byte ranges, given as (start, end)
+    """
+
+    size = os.path.getsize(path_xml)
+
+    with open(path_xml, "rb") as file:
+        boundaries = [
+            find_sentence_in_file(file, size * i // num_chunks) for i in range(num_chunks)
+        ]
+
+    boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if start < end]
+
+
+def read_chunk(path_xml: str, start: int, end: int):
+    """
+    Parses all sentences beginning inside a byte range of a xml file
+
+    NOTE: Used by the worker processes of SemevalReader.read_files
+    NOTE: The sentences are found by searching their tags in the raw bytes, see find_sentence.
+          This assumes that no comment or CDATA section between the sentences contains such a tag,
+          which holds for the SemEval files. Ranges with parts of comments or CDATA sections are refused.
+
+    :param path_xml: The path of the xml file
+    :param start: The first byte of the range
+    :param end: The end of the range (exclusive)
+    :return: A list of the words of each sentence and the list of their annotations
+    """
+
+    with open(path_xml, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    # Also looking for the ends, as the range might start inside of a comment
+    if any(marker in data for marker in [b"<!--", b"-->", b"<![CDATA[", b"]]>"]):
+        raise Exception(
+            f"Can not split {path_xml}, as it contains comments or CDATA sections. "
+            "Read it with a single worker!"
+        )
+
+    sentences = []
+    pos = find_sentence(data)
+
+    while pos < len(data):
+        close = data.index(b"</sentence>", pos) + len(b"</sentence>")
+
+        sentences.append(digest_sentence(xml.etree.ElementTree.fromstring(data[pos:close])))
+
+        pos = find_sentence(data, close)
+
+    return sentences
+
+
+def digest_sentence(sentence_node: xml.etree.ElementTree.Element):
+    """
+    Parses a single sentence node
+
+    :param sentence_node: The node of the sentence
+    :return: The words of the sentence and a list of its annotations
+    """
+
+    raw_sent = sentence_node.find("text").text
+    words = [word for word in raw_sent.split(" ") if word != ""]
+    offsets = get_word_offsets(words)
+
+    annotations = []
+
+    for annotation in sentence_node.findall("annotationSets/annotationSet"):
+
+        frame = annotation.get("frameName")
+
+        data = annotation.findall("./layers/layer")
+        fee_node = data[0].findall(".labels/label")
+
+        start_char = int(fee_node[0].get("start"))
+        end_char = int(fee_node[-1].get("end"))
+        start, end = char_pos_to_sentence_pos(start_char, end_char, words, offsets)
+
+        position = (start, end)
+
+        fee = words[start]
+        fee_raw = words[start]
+
+        roles = []
+        role_positions = []
+
+        for role in data[1:]:
+            for labels in role:
+                for label in labels:
+                    fe = label.get("name")
+                    start_char = int(label.get("start"))
+                    end_char = int(label.get("end"))
+                    start, end = char_pos_to_sentence_pos(start_char, end_char, words, offsets)
+
+                    roles.append(fe)
+                    role_positions.append((start, end))
+
+        annotations.append(Annotation(frame, fee, position, fee_raw, words, roles, role_positions))
+
+    return words, annotations
 
 
 class SemevalReader(DataReader):
@@ -52,11 +236,9 @@ class SemevalReader(DataReader):
 
         self.path_xml = path_xml
 
-    def read_data(self, path_xml: str = None):
+    def check_path(self, path_xml: str = None):
         """
-        Reads a xml file and parses it into the datareader format.
-
-        NOTE: Applying this function removes the previous dataset content
+        Sets and checks the path of the xml file to read
 
         :param path_xml: The path of the xml file
         :return:
@@ -71,77 +253,119 @@ class SemevalReader(DataReader):
         if self.path_xml.rsplit(".")[-1] != "xml":
             raise Exception("File is not a xml-file!")
 
-        tree = xml.etree.ElementTree.parse(self.path_xml)
-        root = tree.getroot()
+    def read_data(self, path_xml: str = None):
+        """
+        Reads a xml file and parses it into the datareader format.
 
-        self.digest_tree(root)
+        NOTE: The file is streamed, so the xml-tree is never kept in memory as a whole
 
-    def digest_tree(self, root: xml.etree.ElementTree):
+        :param path_xml: The path of the xml file
+        :return:
         """
-        Parses the xml-tree into a DataReader object.
 
-        :param root: The root node of the tree
+        for words, annotations in self.stream_data(path_xml):
+            self.add_sentence(words, annotations)
+
+    def read_files(self, paths: List[str], workers: int = None):
+        """
+        Reads multiple xml files in parallel
+
+        NOTE: Large files are split into chunks on sentence boundaries, which are parsed by a pool of processes.
+              The results are added in the order of the files and their sentences.
+              If enabled, the embeddings are shared with the workers, see WorkerPool.
+
+        :param paths: The paths of the xml files
+        :param workers: The amount of processes, defaults to the config (0 for one per cpu core)
         :return:
         """
 
-        sent_num = 0
+        if workers is None:
+            workers = self.cM.loader_workers
 
-        # Structure as define by semeval
-        for sentences in root.findall(
-            ".documents/document/paragraphs/paragraph/sentences/sentence"
-        ):
-            sentence = sentences.find("text").text
+        if workers < 1:
+            workers = os.cpu_count()
+
+        for path in paths:
+            self.check_path(path)
+
+        chunks = self.plan_chunks(paths, workers)
+
+        if workers == 1 or len(chunks) < 2:
+            for path in paths:
+                self.read_data(path)
+
+            return
 
-            raw_sent = sentence
-            words = raw_sent.split(" ")
+        with WorkerPool(self.cM, min(workers, len(chunks))) as executor:
+            results = executor.map(read_chunk, *zip(*chunks))
 
-            while "" in words:
-                words.remove("")
-            self.sentences.append(words)
+            for sentences in results:
+                for words, annotations in sentences:
+                    self.add_sentence(words, annotations)
 
-            for annotation in sentences.findall("annotationSets/annotationSet"):
+    def plan_chunks(self, paths: List[str], workers: int):
+        """
+        Splits the given files into chunks, such that every worker gets a similar share of data
+
+        :param paths: The paths of the xml files
+        :param workers: The amount of processes
+        :return: A list of chunks, given as (path, start, end)
+        """
 
-                frame = annotation.get("frameName")
+        sizes = [os.path.getsize(path) for path in paths]
+        chunk_size = max(sum(sizes) // workers, MIN_CHUNK_SIZE)
 
-                data = annotation.findall("./layers/layer")
-                fee_node = data[0].findall(".labels/label")
+        chunks = []
 
-                start_char = int(fee_node[0].get("start"))
-                end_char = int(fee_node[-1].get("end"))
-                start, end = char_pos_to_sentence_pos(start_char, end_char, words)
+        for path, size in zip(paths, sizes):
+            num_chunks = max(round(size / chunk_size), 1)
 
-                position = (start, end)
+            if num_chunks == 1:
+                chunks.append((path, 0, size))
+                continue
 
-                fee = words[start]
-                fee_raw = words[start]
+            chunks += [(path, start, end) for start, end in split_file(path, num_chunks)]
 
-                roles = []
-                role_positions = []
+        return chunks
 
-                for role in data[1:]:
-                    for labels in role:
-                        for label in labels:
-                            fe = label.get("name")
-                            start_char = int(label.get("start"))
-                            end_char = int(label.get("end"))
-                            start, end = char_pos_to_sentence_pos(start_char, end_char, words)
+    def stream_data(self, path_xml: str = None):
+        """
+        Streams a xml file sentence by sentence
 
-                            roles.append(fe)
-                            role_positions.append((start, end))
+        NOTE: Processed sentences are removed from the tree, so the memory usage does not grow with the file size.
+              The sentences are NOT added to the reader, see read_data for that.
+
+        :param path_xml: The path of the xml file
+        :return: A generator of the words of each sentence and the list of their annotations
+        """
 
-                if sent_num >= len(self.annotations):
-                    self.annotations.append([])
+        self.check_path(path_xml)
 
-                self.annotations[sent_num].append(
-                    Annotation(
-                        frame,
-                        fee,
-                        position,
-                        fee_raw,
-                        self.sentences[sent_num],
-                        roles,
-                        role_positions,
-                    )
-                )
+        # The currently open elements
+        path = []
 
-            sent_num += 1
+        for event, element in xml.etree.ElementTree.iterparse(self.path_xml, ("start", "end")):
+            if event == "start":
+                path.append(element)
+                continue
+
+            path.pop()
+
+            if element.tag == "sentence":
+                yield digest_sentence(element)
+
+                # Drop the processed sentence from its parent
+                if path:
+                    path[-1].remove(element)
+
+    def digest_tree(self, root: xml.etree.ElementTree):
+        """
+        Parses the xml-tree into a DataReader object.
+
+        :param root: The root node of the tree
+        :return:
+        """
+
+        # Structure as define by semeval
+        for sentence in root.findall(".documents/document/paragraphs/paragraph/sentences/sentence"):
+            self.add_sentence(*digest_sentence(sentence))
@@ -0,0 +1,512 @@
+import hashlib
+import logging
+import numpy as np
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from framenet_tools.data_handler.frame_embedding_manager import FrameEmbeddingManager
+from framenet_tools.data_handler.word_embedding_manager import WordEmbeddingManager
+from framenet_tools.utils.quantization import QuantizedMatrix
+from framenet_tools.utils.resource_registry import registry
+
+# The handle attached by attach_embeddings in a worker process, used by every new ConfigManager
+worker_handle = None
+
+
+def import_shared_memory():
+    """
+    Helper function
+    Imports the shared memory module lazily, as it is only available since python 3.8
+
+    :return: The module multiprocessing.shared_memory
+    """
+
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise Exception("Sharing embeddings requires python 3.8 or newer!")
+
+    return shared_memory
+
+
+def get_tracker_pid():
+    """
+    Helper function
+    Returns the process id of the resource tracker used by this process
+
+    NOTE: Processes started through multiprocessing use the tracker of their parent,
+          spawned ones only know the descriptor of it, therefore their pid is None.
+
+    :return: The process id or None
+    """
+
+    if os.name != "posix":
+        return None
+
+    from multiprocessing import resource_tracker
+
+    resource_tracker.ensure_running()
+
+    return resource_tracker._resource_tracker._pid
+
+
+def untrack_block(block, descriptor: dict):
+    """
+    Prevents the resource tracker of this process from unlinking an attached block on exit
+
+    NOTE: Before python 3.13, attaching to a block registers it as if it was created by this process.
+          If the block was created by a process using the same tracker, the registration is the one of the
+          creator and must be kept, otherwise the block would leak if the creator crashes.
+
+    :param block: The attached SharedMemory block
+    :param descriptor: The descriptor of the shared array
+    :return:
+    """
+
+    if os.name != "posix":
+        return
+
+    from multiprocessing import resource_tracker
+
+    tracker_pid = get_tracker_pid()
+
+    if tracker_pid is None or tracker_pid == descriptor["tracker"]:
+        return
+
+    resource_tracker.unregister(block._name, "shared_memory")
+
+
+def share_array(array: np.ndarray):
+    """
+    Copies an array into a new block of shared memory
+
+    :param array: The array to share
+    :return: A pair of the SharedMemory block and a (picklable) descriptor of the array
+    """
+
+    shared_memory = import_shared_memory()
+
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+
+    descriptor = {
+        "name": block.name,
+        "shape": array.shape,
+        "dtype": array.dtype.str,
+        "tracker": get_tracker_pid(),
+    }
+
+    return block, descriptor
+
+
+def attach_array(descriptor: dict):
+    """
+    Attaches to an array previously shared by share_array
+
+    NOTE: The returned array is read-only
+
+    :param descriptor: The descriptor of the shared array
+    :return: A pair of the SharedMemory block and the array
+    """
+
+    shared_memory = import_shared_memory()
+
+    try:
+        # Workers must not unlink the block on exit (supported since python 3.13)
+        block = shared_memory.SharedMemory(name=descriptor["name"], track=False)
+    except TypeError:
+        block = shared_memory.SharedMemory(name=descriptor["name"])
+        untrack_block(block, descriptor)
+
+    array = np.ndarray(descriptor["shape"], dtype=np.dtype(descriptor["dtype"]), buffer=block.buf)
+    array.setflags(write=False)
+
+    return block, array
+
+
+def strings_to_array(strings: List[str]):
+    """
+    Helper function
+    Encodes a list of strings as a byte array
+
+    :param strings: The strings to encode (must not contain new lines)
+    :return: The uint8 array
+    """
+
+    return np.frombuffer("\n".join(strings).encode("utf-8"), dtype=np.uint8)
+
+
+def array_to_strings(array: np.ndarray):
+    """
+    Helper function
+    Decodes an array created by strings_to_array
+
+    :param array: The uint8 array
+    :return: The list of strings
+    """
+
+    if len(array) == 0:
+        return []
+
+    return array.tobytes().decode("utf-8").split("\n")
+
+
+def hash_key(key: str):
+    """
+    Helper function
+    Hashes a key of an index, independent of the process
+
+    :param key: The word or frame
+    :return: The 64 bit hash as an integer
+    """
+
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class SharedIndex(object):
+    """
+    A read-only index of words or frames to rows, which can be kept in shared memory
+
+    The keys are sorted by their hash and looked up by binary search,
+    so unlike a dict the index exists only once for all processes.
+    """
+
+    def __init__(self, hashes: np.ndarray, offsets: np.ndarray, keys: np.ndarray, rows: np.ndarray):
+
+        self.hashes = hashes
+        self.offsets = offsets
+        self.keys = keys
+        self.rows = rows
+
+    @staticmethod
+    def to_arrays(index: dict):
+        """
+        Converts an index into the arrays of a SharedIndex
+
+        :param index: A dict of the keys to their rows
+        :return: A dict of the arrays, named by the parameters of the constructor
+        """
+
+        keys = list(index.keys())
+        hashes = np.fromiter((hash_key(key) for key in keys), np.uint64, len(keys))
+        order = np.argsort(hashes, kind="stable")
+
+        encoded = [keys[i].encode("utf-8") for i in order]
+
+        offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum([len(key) for key in encoded], out=offsets[1:])
+
+        return {
+            "hashes": hashes[order],
+            "offsets": offsets,
+            "keys": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "rows": np.asarray([index[keys[i]] for i in order], dtype=np.int64),
+        }
+
+    def find(self, key: str):
+        """
+        Searches the position of a key
+
+        :param key: The word or frame
+        :return: The position of the key or -1 if it is unknown
+        """
+
+        key_hash = np.uint64(hash_key(key))
+        i = int(np.searchsorted(self.hashes, key_hash))
+        encoded = key.encode("utf-8")
+
+        # Colliding hashes are next to each other
+        while i < len(self.hashes) and self.hashes[i] == key_hash:
+            if self.keys[self.offsets[i] : self.offsets[i + 1]].tobytes() == encoded:
+                return i
+
+            i += 1
+
+        return -1
+
+    def get(self, key: str, default: int = None):
+        """
+        Looks up the row of a key
+
+        :param key: The word or frame
+        :param default: The value to return for unknown keys
+        :return: The row
+        """
+
+        i = self.find(key)
+
+        if i < 0:
+            return default
+
+        return int(self.rows[i])
+
+    def __getitem__(self, key: str):
+        row = self.get(key)
+
+        if row is None:
+            raise KeyError(key)
+
+        return row
+
+    def __contains__(self, key: str):
+        return self.find(key) >= 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def items(self):
+        """
+        Iterates over all keys and their rows
+
+        :return: A generator of pairs of the key and its row
+        """
+
+        for i in range(len(self)):
+            key = self.keys[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+            yield key, int(self.rows[i])
+
+
+class SharedEmbeddings(object):
+    """
+    Publishes the word and frame embeddings of a ConfigManager in shared memory
+
+    Worker processes attach read-only via attach_embeddings, instead of loading their own copies.
+    Usable as a context manager, which releases the shared memory on exit.
+
+    NOTE: Process pools use this if ConfigManager.share_embeddings is set, see WorkerPool
+    """
+
+    def __init__(self, cM):
+
+        self.cM = cM
+        self.blocks = []
+        self.handle = None
+
+    def __enter__(self):
+        return self.publish()
+
+    def __exit__(self, type, value, traceback):
+        self.release()
+
+    def share_manager(self, index, vectors: np.ndarray):
+        """
+        Shares the index and matrix of a single embedding manager
+
+        NOTE: Quantized matrices are shared as they are, along with the scales of their rows (int8 only)
+
+        :param index: The index of the words or frames (a dict or a SharedIndex)
+        :param vectors: The embedding matrix (an array or a QuantizedMatrix)
+        :return: The descriptors of the shared arrays
+        """
+
+        descriptors = dict()
+
+        arrays = SharedIndex.to_arrays(dict(index.items()))
+
+        if isinstance(vectors, QuantizedMatrix):
+            arrays["vectors"] = vectors.data
+
+            if vectors.scales is not None:
+                arrays["scales"] = vectors.scales
+        else:
+            arrays["vectors"] = np.asarray(vectors)
+
+        for name, array in arrays.items():
+            block, descriptors[name] = share_array(array)
+            self.blocks.append(block)
+
+        return descriptors
+
+    def publish(self):
+        """
+        Loads the embeddings (if necessary) and copies them into shared memory
+
+        NOTE: The managers of the publishing ConfigManager switch to the shared copies as well.
+              The registry hands out the shared copies instead of the loaded ones, which are dropped.
+        NOTE: The indices of the words and frames are shared as well, see SharedIndex
+
+        :return: The picklable handle to pass to the worker processes
+        """
+
+        if self.handle is not None:
+            return self.handle
+
+        logging.info("Publishing embeddings in shared memory")
+
+        self.cM.wEM.read_word_embeddings()
+        self.cM.fEM.read_frame_embeddings()
+
+        self.handle = dict()
+
+        for name, manager, index in [
+            ("words", self.cM.wEM, self.cM.wEM.words),
+            ("frames", self.cM.fEM, self.cM.fEM.frames),
+        ]:
+            self.handle[name] = self.share_manager(index, manager.vectors)
+
+        attach_embeddings(self.handle, self.cM)
+
+        # Only the shared copies are kept alive, by this ConfigManager and the registry
+        for kind, key, manager in self.get_registry_entries():
+            registry.release(kind, key)
+            registry.get(kind, key, lambda: manager)
+
+        logging.info("[Done] publishing embeddings in shared memory")
+
+        return self.handle
+
+    def release(self):
+        """
+        Frees the shared memory
+
+        NOTE: Workers still attached keep their mappings until they exit
+
+        :return:
+        """
+
+        if self.handle is not None:
+            registry.release("shared_embeddings", self.handle["words"]["vectors"]["name"])
+
+            for kind, key, _ in self.get_registry_entries():
+                registry.release(kind, key)
+
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+        self.blocks = []
+        self.handle = None
+
+    def get_registry_entries(self):
+        """
+        Helper function
+        Returns the entries of the registry holding the embedding managers of the ConfigManager
+
+        :return: A list of the kind, key and embedding manager of each entry
+        """
+
+        return [
+            (
+                "word_embeddings",
+                (self.cM.word_embeddings_path, self.cM.embedding_storage),
+                self.cM.wEM,
+            ),
+            ("frame_embeddings", self.cM.frame_embeddings_path, self.cM.fEM),
+        ]
+
+
+class WorkerPool(object):
+    """
+    A process pool, whose workers use the embeddings of the given ConfigManager
+
+    If ConfigManager.share_embeddings is set, the embeddings are published in shared memory for the lifetime
+    of the pool, see SharedEmbeddings. Otherwise every worker loads its own copies, once it needs them.
+    Usable as a context manager, which returns the ProcessPoolExecutor.
+    """
+
+    def __init__(self, cM, workers: int):
+
+        self.cM = cM
+        self.workers = workers
+        self.shared = None
+        self.executor = None
+
+    def __enter__(self):
+
+        if not self.cM.share_embeddings:
+            self.executor = ProcessPoolExecutor(self.workers)
+            return self.executor
+
+        self.shared = SharedEmbeddings(self.cM)
+
+        self.executor = ProcessPoolExecutor(
+            self.workers, initializer=attach_embeddings, initargs=(self.shared.publish(),)
+        )
+
+        return self.executor
+
+    def __exit__(self, type, value, traceback):
+
+        self.executor.shutdown()
+
+        if self.shared is not None:
+            self.shared.release()
+
+
+def attach_manager(descriptors: dict):
+    """
+    Attaches to the shared index and matrix of a single embedding manager
+
+    NOTE: Quantized matrices are wrapped without copying them, see QuantizedMatrix.from_data
+
+    :param descriptors: The descriptors created by SharedEmbeddings.share_manager
+    :return: The shared blocks, the index and the matrix
+    """
+
+    blocks = []
+    arrays = dict()
+
+    for name, descriptor in descriptors.items():
+        block, arrays[name] = attach_array(descriptor)
+        blocks.append(block)
+
+    vectors = arrays.pop("vectors")
+    scales = arrays.pop("scales", None)
+
+    if vectors.dtype != np.float32:
+        vectors = QuantizedMatrix.from_data(vectors, scales, vectors.dtype.name)
+
+    return blocks, SharedIndex(**arrays), vectors
+
+
+def attach_managers(handle: dict, word_path: str, frame_path: str):
+    """
+    Creates embedding managers using the shared embeddings
+
+    :param handle: The handle returned by SharedEmbeddings.publish
+    :param word_path: The path of the word embeddings
+    :param frame_path: The path of the frame embeddings
+    :return: A pair of the WordEmbeddingManager and the FrameEmbeddingManager
+    """
+
+    blocks, words, vectors = attach_manager(handle["words"])
+
+    storage = vectors.mode if isinstance(vectors, QuantizedMatrix) else "float32"
+
+    wEM = WordEmbeddingManager(word_path, storage)
+    wEM.shared_blocks, wEM.words, wEM.vectors = blocks, words, vectors
+
+    fEM = FrameEmbeddingManager(frame_path)
+    fEM.shared_blocks, fEM.frames, fEM.vectors = attach_manager(handle["frames"])
+
+    return wEM, fEM
+
+
+def attach_embeddings(handle: dict, cM=None):
+    """
+    Attaches the embedding managers of a ConfigManager to embeddings published by SharedEmbeddings
+
+    NOTE: If no ConfigManager is given, the handle is used by every ConfigManager created in this process.
+          This is meant to be used as an initializer of worker processes.
+
+    :param handle: The handle returned by SharedEmbeddings.publish
+    :param cM: The ConfigManager to attach
+    :return:
+    """
+
+    global worker_handle
+
+    if cM is None:
+        worker_handle = handle
+        return
+
+    cM.wEM, cM.fEM = registry.get(
+        "shared_embeddings",
+        handle["words"]["vectors"]["name"],
+        lambda: attach_managers(handle, cM.word_embeddings_path, cM.frame_embeddings_path),
+    )
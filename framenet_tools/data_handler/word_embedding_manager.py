@@ -1,18 +1,45 @@
 import logging
+import numpy as np
+import os
 
 from tqdm import tqdm
-from typing import List
+from typing import List, Set
+
+from framenet_tools.utils.quantization import QuantizedMatrix, check_storage_mode, save_quantized
 
 
 class WordEmbeddingManager(object):
     """
     Loads and provides the specified word-embeddings
+
+    NOTE: On first use, the text file is converted into a float32 matrix (.npy) and a vocabulary file (.vocab).
+          Afterwards only the binary files are used, the matrix being memory-mapped.
+    NOTE: With a storage mode of float16 or int8 the matrix is quantized once into its own .npy files,
+          which are memory-mapped as well and dequantized on lookup.
+    NOTE: Unknown words fall back to the embedding of their lowercased version, see embed.
     """
 
-    def __init__(self, path: str = "data/word_embeddings/levy_deps_300.w2vt"):
+    def __init__(
+        self, path: str = "data/word_embeddings/levy_deps_300.w2vt", storage: str = "float32"
+    ):
+
+        check_storage_mode(storage)
 
         self.path = path
+        self.storage = storage
+        self.matrix_path = path + ".npy"
+        self.vocab_path = path + ".vocab"
+        self.quantized_path = f"{path}.{storage}.npy"
+        self.scales_path = f"{path}.{storage}.scales.npy"
+
         self.words = None
+        self.vectors = None
+
+        # The set of words the loaded embeddings were restricted to (None if fully loaded)
+        self.restricted_to = None
+
+        # Blocks of shared memory backing the vectors, see SharedEmbeddings
+        self.shared_blocks = []
 
     def string_to_array(self, strings: List[str]):
         """
@@ -25,46 +52,266 @@ class WordEmbeddingManager(object):
         :return: The array
         """
 
-        array = []
+        return np.asarray(strings, dtype=np.float32)
 
-        for element in strings:
-            array.append(float(element))
+    def is_converted(self):
+        """
+        Checks whether an up to date binary version of the embedding file exists
+
+        :return: True if the binary files can be used, otherwise False
+        """
 
-        return array
+        if not os.path.isfile(self.matrix_path) or not os.path.isfile(self.vocab_path):
+            return False
 
-    def read_word_embeddings(self):
+        # Source file might have been deleted after conversion to save space
+        if not os.path.isfile(self.path):
+            return True
+
+        return os.path.getmtime(self.matrix_path) >= os.path.getmtime(self.path)
+
+    def convert_word_embeddings(self):
         """
-        Loads the previously specified frame embedding file into a dictionary
+        Converts the text embedding file into a float32 matrix and a vocabulary file
+
+        NOTE: The matrix is written row by row, therefore the text file is never fully loaded.
+
+        :return:
+        """
+
+        logging.info("Converting word embeddings to binary format")
+
+        tmp_path = self.matrix_path + ".tmp"
+
+        with open(self.path, "r") as file:
+            header = file.readline().split()
+
+            if len(header) != 2 or not all(x.isdigit() for x in header):
+                raise Exception(f"Missing word2vec header in {self.path}!")
+
+            num_words, dim = int(header[0]), int(header[1])
+
+            matrix = np.lib.format.open_memmap(
+                tmp_path, mode="w+", dtype=np.float32, shape=(num_words, dim)
+            )
+            words = []
+
+            for line in tqdm(file, total=num_words):
+                line = line.rstrip().rsplit(" ")
+
+                if len(line) < 2:
+                    continue
+
+                if len(words) == num_words:
+                    del matrix
+                    os.remove(tmp_path)
+
+                    raise Exception(
+                        f"{self.path} contains more than the {num_words} embeddings of its header!"
+                    )
+
+                matrix[len(words)] = self.string_to_array(line[1:])
+                words.append(line[0])
+
+        if len(words) < num_words:
+            np.save(self.matrix_path, matrix[: len(words)])
+            del matrix
+            os.remove(tmp_path)
+        else:
+            matrix.flush()
+            del matrix
+            os.replace(tmp_path, self.matrix_path)
+
+        with open(self.vocab_path, "w", newline="\n") as file:
+            file.write("\n".join(words))
+
+        logging.info("[Done] converting word embeddings")
+
+    def is_quantized(self):
+        """
+        Checks whether an up to date quantized version of the binary matrix exists
+
+        :return: True if the quantized files can be used, otherwise False
+        """
+
+        paths = [self.quantized_path]
+
+        if self.storage == "int8":
+            paths.append(self.scales_path)
+
+        if not all(os.path.isfile(path) for path in paths):
+            return False
+
+        return min(os.path.getmtime(path) for path in paths) >= os.path.getmtime(self.matrix_path)
+
+    def quantize_word_embeddings(self):
+        """
+        Quantizes the binary matrix according to the storage mode
+
+        NOTE: The quantization error is logged, as the word embeddings are not evaluated by any model.
+
+        :return: A pair of the maximal absolute error and the mean cosine similarity of the quantized embeddings
+        """
+
+        logging.info(f"Quantizing word embeddings to {self.storage}")
+
+        max_error, mean_cosine = save_quantized(
+            np.load(self.matrix_path, mmap_mode="r"),
+            self.storage,
+            self.quantized_path,
+            self.scales_path,
+        )
+
+        logging.info(
+            f"Word embeddings {self.storage}: Max error: {max_error}, "
+            f"Mean cosine similarity: {mean_cosine}"
+        )
+
+        return max_error, mean_cosine
+
+    def read_word_embeddings(self, vocabulary: Set[str] = None):
+        """
+        Loads the previously specified word embeddings
+
+        NOTE: The matrix is memory-mapped, therefore multiple processes share the same pages.
+
+        :param vocabulary: If given, only the embeddings of these words are loaded
         """
 
         if self.words is not None:
+            if self.restricted_to is None:
+                return
+
+            if vocabulary is not None:
+                if vocabulary <= self.restricted_to:
+                    return
+
+                vocabulary = vocabulary | self.restricted_to
+
+        if vocabulary is not None:
+            self.read_restricted_word_embeddings(vocabulary)
             return
 
-        self.words = dict()
+        if not self.is_converted():
+            self.convert_word_embeddings()
 
         logging.info("Loading word embeddings")
 
-        with open(self.path, "r") as file:
-            raw = file.read()
+        if self.storage == "float32":
+            self.vectors = np.load(self.matrix_path, mmap_mode="r")
+        else:
+            if not self.is_quantized():
+                self.quantize_word_embeddings()
+
+            self.vectors = QuantizedMatrix.load(self.quantized_path, self.scales_path, self.storage)
+
+        with open(self.vocab_path, "r", newline="\n") as file:
+            words = file.read().split("\n") if os.path.getsize(self.vocab_path) > 0 else []
+
+        self.words = dict(zip(words, range(len(words))))
+        self.restricted_to = None
+
+        logging.info("[Done] loading word embeddings")
+
+    def read_restricted_word_embeddings(self, vocabulary: Set[str]):
+        """
+        Loads only the embeddings of the given words into a dense matrix
+
+        NOTE: The embedding source is streamed line by line,
+              therefore the memory usage scales with the size of the vocabulary only.
+              The lowercased words are loaded as well, as these are the fallback of embed.
+
+        :param vocabulary: The words to load the embeddings for
+        :return:
+        """
+
+        logging.info(f"Loading word embeddings for {len(vocabulary)} words")
+
+        wanted = vocabulary | {word.lower() for word in vocabulary}
+        words = dict()
+        vectors = []
+
+        if self.is_converted():
+            rows = []
+            matrix = np.load(self.matrix_path, mmap_mode="r")
 
-        data = raw.rsplit("\n")[1:]
+            with open(self.vocab_path, "r", newline="\n") as file:
+                for row, word in enumerate(file):
+                    word = word.rstrip("\n")
 
-        for line in tqdm(data):
-            line = line.rsplit(" ")
+                    if word in wanted:
+                        words[word] = len(rows)
+                        rows.append(row)
 
-            self.words[line[0]] = self.string_to_array(line[1:])
+            vectors = matrix[rows]
+        else:
+            with open(self.path, "r") as file:
+                # Skip the word2vec header
+                file.readline()
+
+                for line in tqdm(file):
+                    word = line.split(" ", 1)[0]
+
+                    if word not in wanted:
+                        continue
+
+                    words[word] = len(vectors)
+                    vectors.append(self.string_to_array(line.rstrip().rsplit(" ")[1:]))
+
+            vectors = np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+        self.words = words
+        self.vectors = self.store(vectors)
+        self.restricted_to = vocabulary
 
         logging.info("[Done] loading word embeddings")
 
+    def store(self, vectors: np.ndarray):
+        """
+        Converts a restricted matrix according to the storage mode
+
+        NOTE: Restricted matrices are private copies anyway, so these are quantized in memory.
+
+        :param vectors: The float32 matrix
+        :return: The matrix itself or its quantized version
+        """
+
+        if self.storage == "float32":
+            return vectors
+
+        logging.info(f"Quantizing word embeddings to {self.storage}")
+
+        return QuantizedMatrix(vectors, self.storage)
+
+    def get_dimension(self, default: int = 300):
+        """
+        Returns the dimension of the loaded word embeddings
+
+        :param default: The dimension to fall back to, if nothing was loaded
+        :return: The dimension of a single embedding
+        """
+
+        if self.vectors is None or self.vectors.ndim != 2 or self.vectors.shape[1] == 0:
+            return default
+
+        return self.vectors.shape[1]
+
     def embed(self, word: str):
         """
         Converts a given word to its embedding
 
+        NOTE: If the word itself is unknown, the embedding of its lowercased version is returned instead.
+
         :param word: The word to embed
         :return: The embedding (n-dimensional vector)
         """
 
-        if word in self.words:
-            return self.words[word]
+        row = self.words.get(word)
+
+        if row is None:
+            row = self.words.get(word.lower())
+
+        if row is None:
+            return None
 
-        return None
+        return self.vectors[row]
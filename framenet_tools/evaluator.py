@@ -1,6 +1,5 @@
 import logging
 
-from copy import deepcopy
 from typing import List
 
 from framenet_tools.config import ConfigManager
@@ -42,7 +41,7 @@ def evaluate_span_identification(m_reader: DataReader, original_reader: DataRead
     Evaluates the span identification for its F1 score
 
     :param m_reader: The reader containing the predicted annotations
-    :param original_reader: The original reader containing the gold annotations
+    :param original_reader: The original reader (or its GoldSnapshot) containing the gold annotations
     :return: A Triple of True positives, False positives and False negatives
     """
 
@@ -73,15 +72,15 @@ def evaluate_fee_identification(m_reader: DataReader, original_reader: DataReade
     Evaluates the Frame Evoking Element Identification only
 
     :param m_reader: The reader containing the predicted annotations
-    :param original_reader: The original reader containing the gold annotations
+    :param original_reader: The original reader (or its GoldSnapshot) containing the gold annotations
     :return: A Triple of True positives, False positives and False negatives
     """
 
-    gold_sentences = original_reader.annotations.copy()
-
     tp = fp = fn = 0
 
-    for gold_annotations, predictied_annotations in zip(gold_sentences, m_reader.annotations):
+    for gold_annotations, predictied_annotations in zip(
+        original_reader.annotations, m_reader.annotations
+    ):
         for gold_annotation in gold_annotations:
             if gold_annotation.fee_raw in [x.fee_raw for x in predictied_annotations]:
                 tp += 1
@@ -100,7 +99,7 @@ def evaluate_frame_identification(m_reader: DataReader, original_reader: DataRea
     Evaluates the Frame Identification
 
     :param m_reader: The reader containing the predicted annotations
-    :param original_reader: The original reader containing the gold annotations
+    :param original_reader: The original reader (or its GoldSnapshot) containing the gold annotations
     :return: A Triple of True positives, False positives and False negatives
     """
 
@@ -144,7 +143,7 @@ def evaluate_stages(m_reader: DataReader, original_reader: DataReader, levels: L
     Evaluates the stages specified in levels
 
     :param m_reader: The reader including the predicted data
-    :param original_reader: The reader which holds the gold data
+    :param original_reader: The reader (or its GoldSnapshot) which holds the gold data
     :param levels: The levels to evaluate for
     :return: A triple of Precision, Recall and the F1-Score
     """
@@ -148,7 +148,7 @@ class FeeIdentifier(object):
 
         self.cM = cM
 
-        self.pos_tagger = PosTagger(self.cM.use_spacy)
+        self.pos_tagger = PosTagger(self.cM.use_spacy, self.cM.spacy_profile_pos)
 
     def identify_targets(self, sentence: list):
         """
@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-from copy import deepcopy
 
 import torch
 import torch.nn as nn
@@ -15,6 +14,7 @@ from framenet_tools.data_handler.reader import DataReader
 from framenet_tools.fee_identification.feeidentifier import FeeIdentifier
 from framenet_tools.frame_identification.frameidnetwork import FrameIDNetwork
 from framenet_tools.config import ConfigManager
+from framenet_tools.utils.resource_registry import registry
 from framenet_tools.utils.static_utils import shuffle_concurrent_lists
 
 
@@ -22,11 +22,18 @@ def get_dataset(reader: DataReader):
     """
     Loads the dataset and combines the necessary data
 
+    NOTE: Readers using the columnar backend are converted directly from their columns
+
     :param reader: The reader that contains the dataset
     :return: xs: A list of sentences appended with its FEE
              ys: A list of frames corresponding to the given sentences
     """
 
+    store = reader.get_columns()
+
+    if store is not None:
+        return store.get_frame_dataset()
+
     xs = []
     ys = []
 
@@ -257,26 +264,88 @@ class FrameIdentifier(object):
         Loads a model from a given file
 
         NOTE: This drops the current model!
+        NOTE: The model is only read once per process, see ResourceRegistry.
+              The network is therefore shared, use FrameIDNetwork.copy before modifying it.
 
         :param name: The path of the model to load
         :return:
         """
 
+        # The storage of the embeddings is a property of the current machine, not of the model
+        embedding_storage = self.cM.embedding_storage
+
+        self.cM, self.output_field.vocab, self.input_field.vocab, self.network = registry.get(
+            "frameid_model",
+            (os.path.abspath(name), embedding_storage),
+            lambda: self.read_model(name, embedding_storage),
+            os.path.getmtime(name + ".ph"),
+        )
+
+    def read_model(self, name: str, embedding_storage: str = "float32"):
+        """
+        Reads the config, vocabs and network of a saved model
+
+        :param name: The path of the model to load
+        :param embedding_storage: The storage mode of the embeddings
+        :return: A tuple of the ConfigManager, the output vocab, the input vocab and the network
+        """
+
         # Loading config
-        self.cM = ConfigManager(name + ".cfg")
+        cM = ConfigManager(name + ".cfg")
 
         # Loading Vocabs
-        out_voc = pickle.load(open(name + ".out_voc", "rb"))
-        in_voc = pickle.load(open(name + ".in_voc", "rb"))
+        with open(name + ".out_voc", "rb") as file:
+            out_voc = pickle.load(file)
 
-        self.output_field.vocab = out_voc
-        self.input_field.vocab = in_voc
+        with open(name + ".in_voc", "rb") as file:
+            in_voc = pickle.load(file)
 
-        num_classes = len(self.output_field.vocab)
-        embed = nn.Embedding.from_pretrained(self.input_field.vocab.vectors)
-        self.network = FrameIDNetwork(self.cM, embed, num_classes)
+        num_classes = len(out_voc)
+        embed = nn.Embedding.from_pretrained(in_voc.vectors)
+        network = FrameIDNetwork(cM, embed, num_classes)
+
+        network.load_model(name + ".ph")
+
+        if embedding_storage != "float32":
+            network.quantize_embeddings(embedding_storage)
+
+            # Drop the float32 copy of the embeddings
+            in_voc.vectors = None
+
+        return cM, out_voc, in_voc, network
+
+    def evaluate_embedding_storage(self, reader_dev: DataReader, mode: str = None):
+        """
+        Reports the accuracy on the development set using float32 and quantized embeddings
+
+        NOTE: Requires a network with float32 embeddings, which stays unchanged.
+              The quantized embeddings are evaluated on a copy, as the network might be shared, see load_model.
+
+        :param reader_dev: The DataReader object of the development set
+        :param mode: The storage mode to compare against, defaults to the configured one
+        :return: A pair of the accuracy using float32 and the accuracy using the quantized embeddings
+        """
+
+        if mode is None:
+            mode = self.cM.embedding_storage
+
+        dev_iter = self.get_iter(reader_dev)
+        network = self.network.copy()
+
+        # Disable dropout, so that the only difference are the embeddings
+        network.net.eval()
+
+        float_acc, _ = network.eval_model(dev_iter)
+
+        network.quantize_embeddings(mode)
+        quantized_acc, _ = network.eval_model(dev_iter)
+
+        logging.info(
+            f"Dev Acc float32: {float_acc}, Dev Acc {mode}: {quantized_acc}, "
+            f"Delta: {quantized_acc - float_acc}"
+        )
 
-        self.network.load_model(name + ".ph")
+        return float_acc, quantized_acc
 
     def evaluate_file(self, reader: DataReader, predict_fees: bool = False):
         """
@@ -286,7 +355,7 @@ class FrameIdentifier(object):
         :return: A Triple of True Positives, False Positives and False Negatives
         """
 
-        reader_copy = deepcopy(reader)
+        reader_copy = reader.snapshot()
 
         if predict_fees:
             fee_finder = FeeIdentifier(self.cM)
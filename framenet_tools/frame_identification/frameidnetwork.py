@@ -1,3 +1,4 @@
+import copy
 import logging
 import torch
 import torch.nn as nn
@@ -10,6 +11,48 @@ from tensorboardX import SummaryWriter
 from typing import List
 
 from framenet_tools.config import ConfigManager
+from framenet_tools.utils.quantization import check_storage_mode
+
+
+class QuantizedEmbedding(nn.Module):
+    """
+    A frozen embedding layer, storing its weights as float16 or per-row scaled int8
+
+    NOTE: Only the looked up rows are dequantized (to float32)
+    """
+
+    def __init__(self, weight: torch.Tensor, mode: str):
+        super(QuantizedEmbedding, self).__init__()
+
+        check_storage_mode(mode)
+
+        weight = weight.detach().float()
+        scales = None
+
+        if mode == "int8":
+            scales = weight.abs().max(dim=1).values / 127
+            scales[scales == 0] = 1
+            weight = torch.round(weight / scales.unsqueeze(1)).to(torch.int8)
+        else:
+            weight = weight.to(getattr(torch, mode))
+
+        self.register_buffer("weight", weight)
+        self.register_buffer("scales", scales)
+
+    def forward(self, x: torch.tensor):
+        """
+        Looks up and dequantizes the embeddings
+
+        :param x: The indices to look up
+        :return: The float32 embeddings
+        """
+
+        embedded = self.weight[x].float()
+
+        if self.scales is not None:
+            embedded = embedded * self.scales[x].unsqueeze(-1)
+
+        return embedded
 
 
 class Net(nn.Module):
@@ -145,6 +188,41 @@ class FrameIDNetwork(object):
         self.criterion = nn.CrossEntropyLoss()
         self.optimizer = torch.optim.Adam(self.net.parameters(), lr=self.cM.learning_rate)
 
+    def copy(self):
+        """
+        Creates a copy of the network, which can be modified without affecting this one
+
+        NOTE: The frozen embedding layer and the ConfigManager are shared, only the rest is copied.
+
+        :return: The copied FrameIDNetwork
+        """
+
+        memo = {id(self.cM): self.cM, id(self.embedding_layer): self.embedding_layer}
+
+        return copy.deepcopy(self, memo)
+
+    def quantize_embeddings(self, mode: str):
+        """
+        Replaces the (frozen) embedding layer by a quantized version
+
+        NOTE: Meant for inference only, a quantized model can not be saved in the standard format!
+
+        :param mode: The storage mode, one of float32, float16 or int8
+        :return:
+        """
+
+        check_storage_mode(mode)
+
+        if mode == "float32":
+            return
+
+        if isinstance(self.embedding_layer, QuantizedEmbedding):
+            raise Exception("Embeddings are already quantized!")
+
+        embedding_layer = QuantizedEmbedding(self.embedding_layer.weight, mode).to(self.device)
+        self.net.set_embedding_layer(embedding_layer)
+        self.embedding_layer = embedding_layer
+
     def train_model(
         self,
         dataset_size: int,
@@ -8,9 +8,10 @@ from typing import List
 from subprocess import call
 
 from framenet_tools.config import ConfigManager
-from framenet_tools.pipeline import Pipeline
 from framenet_tools.utils.static_utils import download, get_spacy_en_model
 
+# NOTE: The pipeline (and with it torch, torchtext and spacy) is only imported by the actions using it
+
 dirs = ["/scripts", "/lib", "/resources", "/data"]
 
 required_files = [
@@ -45,7 +46,8 @@ def create_argparser():
     )
 
     parser.add_argument(
-        "action", help=f"Actions to perform, namely: download, convert, train, predict, evaluate",
+        "action",
+        help=f"Actions to perform, namely: download, convert, train, predict, evaluate, clean_cache",
     )
     parser.add_argument(
         "--feeid", help="Use frame evoking element identification.", action="store_true"
@@ -53,7 +55,12 @@ def create_argparser():
     parser.add_argument("--frameid", help="Use frame identification.", action="store_true")
     parser.add_argument("--spanid", help="Use the span identification.", action="store_true")
     parser.add_argument("--path", help="A path specification used by some actions.", type=str)
-    parser.add_argument("--out_path", help="The path used for saving predictions", type=str)
+    parser.add_argument(
+        "--out_path",
+        help="The path used for saving predictions (.jsonl for json lines, optionally .gz or .zst, "
+        ".columns for the binary format)",
+        type=str,
+    )
     parser.add_argument(
         "--use_eval_files",
         help="Specify if eval files should be used for training as well.",
@@ -149,6 +156,7 @@ def eval_args(parser: argparse.ArgumentParser, args: List[str] = None):
             )
 
     if parsed.action == "train":
+        from framenet_tools.pipeline import Pipeline
 
         pipeline = Pipeline(cM, levels)
 
@@ -162,16 +170,24 @@ def eval_args(parser: argparse.ArgumentParser, args: List[str] = None):
         if parsed.path is None:
             raise Exception("No input file for prediction given!")
 
+        from framenet_tools.pipeline import Pipeline
+
         pipeline = Pipeline(cM, levels)
 
         pipeline.predict(parsed.path, parsed.out_path)
 
     if parsed.action == "evaluate":
+        from framenet_tools.pipeline import Pipeline
 
         pipeline = Pipeline(cM, levels)
 
         pipeline.evaluate()
 
+    if parsed.action == "clean_cache":
+        from framenet_tools.data_handler.reader_cache import ReaderCache
+
+        ReaderCache(cM).clean(0)
+
 
 def main():
     """
@@ -185,3 +201,7 @@ def main():
     parser = create_argparser()
 
     eval_args(parser)
+
+
+if __name__ == "__main__":
+    main()
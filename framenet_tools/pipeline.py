@@ -1,34 +1,40 @@
+import importlib
 import logging
-from copy import deepcopy
 from typing import List
 
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.rawreader import RawReader
+from framenet_tools.data_handler.reader import get_exporter
+from framenet_tools.data_handler.reader_cache import ReaderCache
 from framenet_tools.data_handler.semevalreader import SemevalReader
-from framenet_tools.evaluator import evaluate_stages
-from framenet_tools.stages.feeID import FeeID
-from framenet_tools.stages.frameID import FrameID
-from framenet_tools.stages.spanID import SpanID
 
 stage_names = ["feeID", "frameID", "spanID", "roleID"]
 
+# The classes of the stages, given as module and class name
+stage_classes = [
+    ("framenet_tools.stages.feeID", "FeeID"),
+    ("framenet_tools.stages.frameID", "FrameID"),
+    ("framenet_tools.stages.spanID", "SpanID"),
+    # ("framenet_tools.stages.roleID", "RoleID"),
+]
+
 
 def get_stages(i: int, cM: ConfigManager):
     """
-    Creates a list of stages up to the bound specified
+    Creates the stage of the given level
+
+    NOTE: Only the module of the requested stage is imported
 
-    :param i: The upper bound of the pipeline stages
-    :return: A list of stages
+    :param i: The level of the pipeline stage
+    :param cM: The ConfigManager to use
+    :return: The stage
     """
 
-    stages = [
-        FeeID(cM),
-        FrameID(cM),
-        SpanID(cM),
-        # RoleID(cM)
-    ]
+    module_name, class_name = stage_classes[i]
+
+    stage = getattr(importlib.import_module(module_name), class_name)
 
-    return stages[i]
+    return stage(cM)
 
 
 class Pipeline(object):
@@ -41,6 +47,7 @@ class Pipeline(object):
 
     def __init__(self, cM: ConfigManager, levels: List[int]):
         self.cM = cM
+        self.cM.ensure_resources()
 
         self.levels = levels
 
@@ -76,20 +83,21 @@ class Pipeline(object):
         Also only predicts up to the specified level.
 
         NOTE: Prediction is only possible up to the level on which the pipeline was trained!
+        NOTE: The file is predicted in batches of sentences, so its size is not limited by the memory.
 
         :param file: The raw input text file
-        :param out_path: The path to save the outputs to (can be None)
+        :param out_path: The path to save the outputs to (can be None), see get_exporter
         :return:
         """
 
         m_reader = RawReader(self.cM)
 
-        m_reader.read_raw_text(file)
-
-        for stage in self.stages:
-            stage.predict(m_reader)
+        with get_exporter(out_path, self.cM) as exporter:
+            for batch in m_reader.stream_batches(file):
+                for stage in self.stages:
+                    stage.predict(batch)
 
-        m_reader.export_to_json(out_path)
+                exporter.write(batch)
 
         logging.info(f"Prediction successful!")
 
@@ -97,13 +105,23 @@ class Pipeline(object):
         """
         Helper function for loading datasets.
 
+        NOTE: If enabled, the parsed data is taken from the ReaderCache
+
         :param files: A List of files to load the datasets from.
         :return: A reader object containing the loaded data.
         """
 
         m_data_reader = SemevalReader(self.cM)
-        for file in files:
-            m_data_reader.read_data(file)
+
+        if not self.cM.use_reader_cache:
+            m_data_reader.read_files(files)
+            return m_data_reader
+
+        cache = ReaderCache(self.cM)
+
+        if not cache.load(m_data_reader, files):
+            m_data_reader.read_files(files)
+            cache.store(m_data_reader)
 
         return m_data_reader
 
@@ -116,12 +134,14 @@ class Pipeline(object):
         :return:
         """
 
+        from framenet_tools.evaluator import evaluate_stages
+
         for file in self.cM.semeval_dev + self.cM.semeval_test:
 
             logging.info(f"Evaluation on {file}:")
 
             m_reader = self.load_dataset([file])
-            original_reader = deepcopy(m_reader)
+            original_reader = m_reader.snapshot()
 
             for stage in self.stages:
                 stage.predict(m_reader)
@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import os
 import pickle
 
@@ -13,8 +14,13 @@ from typing import List
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.annotation import Annotation
 from framenet_tools.data_handler.reader import DataReader
-from framenet_tools.utils.postagger import PosTagger
-from framenet_tools.utils.static_utils import shuffle_concurrent_lists, pos_to_int
+from framenet_tools.utils.resource_registry import registry
+from framenet_tools.utils.static_utils import (
+    shuffle_concurrent_lists,
+    pos_to_int,
+    get_spacy_model,
+    make_doc,
+)
 from framenet_tools.span_identification.spanidnetwork import SpanIdNetwork
 
 
@@ -22,11 +28,18 @@ def get_dataset(reader: DataReader):
     """
     Loads the dataset and combines the necessary data
 
+    NOTE: Readers using the columnar backend are converted directly from their columns
+
     :param reader: The reader that contains the dataset
     :return: xs: A list of sentences appended with its FEE
              ys: A list of frames corresponding to the given sentences
     """
 
+    store = reader.get_columns()
+
+    if store is not None:
+        return store.get_frame_dataset()
+
     xs = []
     ys = []
 
@@ -54,7 +67,7 @@ class SpanIdentifier(object):
         self.network = None
         self.input_field = data.Field(dtype=torch.long, use_vocab=True, preprocessing=None)
 
-        self.en_nlp = spacy.load("en_core_web_sm")
+        self.en_nlp = get_spacy_model(profile=cM.spacy_profile_syntax)
         self.dep_dict = []
 
     def query(
@@ -97,11 +110,12 @@ class SpanIdentifier(object):
         count = 0
         new_span = -1
 
-        doc = self.en_nlp(" ".join(sentence))
+        doc = self.en_nlp(make_doc(self.en_nlp, sentence))
+        embedded_frame = annotation.embedded_frame.tolist()
 
         combined = [
             [self.input_field.vocab.stoi[word]]
-            + annotation.embedded_frame
+            + embedded_frame
             + [pos_to_int(pos_tag[1])]
             + [self.dep_to_int(token.dep_)]
             + [token.head.idx - token.idx]
@@ -136,18 +150,9 @@ class SpanIdentifier(object):
         :return: A list of possible span tuples
         """
 
-        tokens = annotation.sentence
-
         possible_roles = []
-        sentence = ""
 
-        if len(tokens) > 0:
-            sentence = tokens[0]
-
-        for token in tokens:
-            sentence += " " + token
-
-        doc = self.nlp(sentence)
+        doc = self.en_nlp(make_doc(self.en_nlp, annotation.sentence))
 
         """
         for token in doc:
@@ -333,6 +338,9 @@ class SpanIdentifier(object):
         """
         Generates sentences with their BIO-tags
 
+        NOTE: Readers using the columnar backend take the labels and frames directly from their columns.
+              The POS-tags of the reader are used, they are only generated if missing, see generate_pos_tags
+
         :param m_reader: The DataReader to create the dataset from
         :return: A pair of concurrent lists containing the sequences and their labels
         """
@@ -340,31 +348,36 @@ class SpanIdentifier(object):
         xs = []
         ys = []
 
-        pos_tagger = PosTagger(self.cM.use_spacy)
-
-        for annotations_sentence, sentence in zip(m_reader.annotations, m_reader.sentences):
+        m_reader.generate_pos_tags()
 
-            pos_tags = pos_tagger.get_tags(sentence)
+        store = m_reader.get_columns()
 
-            doc = self.en_nlp(" ".join(sentence))
+        if store is not None:
+            labels = store.get_span_labels()
+            embedded_frames = store.embedded_frames.tolist()
+            counts = np.diff(store.annotation_offsets).tolist()
+        else:
+            annotations = [a for sentence in m_reader.annotations for a in sentence]
 
-            for annotation in annotations_sentence:
+            labels = [self.get_span_labels(annotation) for annotation in annotations]
+            embedded_frames = [annotation.embedded_frame.tolist() for annotation in annotations]
+            counts = [len(sentence) for sentence in m_reader.annotations]
 
-                sent_len = len(sentence)
-                spans = [2] * sent_len
+        j = 0
 
-                for role_pos in annotation.role_positions:
+        for sentence, pos_tags, count in zip(m_reader.sentences, m_reader.pos_tags, counts):
 
-                    spans[role_pos[0]] = 0
+            # Sentences without annotations do not contribute to the dataset
+            if count == 0:
+                continue
 
-                    for i in range(role_pos[0] + 1, role_pos[1] + 1):
-                        spans[i] = 1
+            doc = self.en_nlp(make_doc(self.en_nlp, sentence))
 
-                ys.append(spans)
+            for embedded_frame in embedded_frames[j : j + count]:
 
                 combined = [
                     [self.input_field.vocab.stoi[word]]
-                    + annotation.embedded_frame
+                    + embedded_frame
                     + [pos_to_int(pos_tag[1])]
                     + [self.dep_to_int(token.dep_)]
                     + [token.head.idx - token.idx]
@@ -373,8 +386,30 @@ class SpanIdentifier(object):
                 ]
                 xs.append(combined)
 
+            ys += labels[j : j + count]
+            j += count
+
         return xs, ys
 
+    def get_span_labels(self, annotation: Annotation):
+        """
+        Generates the numeric span labels of an annotation: 0 for begin, 1 for inside and 2 for outside of a span
+
+        :param annotation: The annotation to convert
+        :return: A list of labels, one per word
+        """
+
+        spans = [2] * len(annotation.sentence)
+
+        for role_pos in annotation.role_positions:
+
+            spans[role_pos[0]] = 0
+
+            for i in range(role_pos[0] + 1, role_pos[1] + 1):
+                spans[i] = 1
+
+        return spans
+
     def dep_to_int(self, dep: str):
         """
         Converts a dependency feature into a number
@@ -417,23 +452,43 @@ class SpanIdentifier(object):
         Loads a model from a given file
 
         NOTE: This drops the current model!
+        NOTE: The model is only read once per process, see ResourceRegistry
 
         :param name: The path of the model to load
         :return:
         """
 
+        network_path = "data/models/span_test.m"
+
+        self.cM, self.input_field.vocab, self.network = registry.get(
+            "spanid_model",
+            os.path.abspath(name),
+            lambda: self.read_model(name, network_path),
+            os.path.getmtime(network_path),
+        )
+
+    def read_model(self, name: str, network_path: str):
+        """
+        Reads the config, vocab and network of a saved model
+
+        :param name: The path of the model to load
+        :param network_path: The path of the saved network
+        :return: A triple of the ConfigManager, the input vocab and the network
+        """
+
         # Loading config
-        self.cM = ConfigManager(name + ".span.cfg")
+        cM = ConfigManager(name + ".span.cfg")
 
         # Loading Vocabs
-        in_voc = pickle.load(open(name + ".span.in_voc", "rb"))
+        with open(name + ".span.in_voc", "rb") as file:
+            in_voc = pickle.load(file)
 
-        self.input_field.vocab = in_voc
+        embed = torch.nn.Embedding.from_pretrained(in_voc.vectors)
 
-        embed = torch.nn.Embedding.from_pretrained(self.input_field.vocab.vectors)
+        network = SpanIdNetwork(cM, 3, embed)
+        network.load_model(network_path)
 
-        self.network = SpanIdNetwork(self.cM, 3, embed)
-        self.network.load_model("data/models/span_test.m")
+        return cM, in_voc, network
 
     def gen_embedding_layer(self, reader: DataReader):
         """
@@ -114,9 +114,12 @@ class SpanIdNetwork(object):
 
         self.num_classes = num_classes
 
+        # The input size depends on the configured frame embeddings
+        self.cM.fEM.read_frame_embeddings()
+
         self.net = Net(
             self.cM.embedding_size,
-            100,
+            self.cM.fEM.get_dimension(),
             self.cM.span_hidden_sizes,
             self.cM.span_layers,
             num_classes,
@@ -28,6 +28,9 @@ class FrameID(PipelineStage):
 
         self.f_i.train(m_reader, m_reader_dev)
 
+        if m_reader_dev is not None and self.cM.embedding_storage != "float32":
+            self.f_i.evaluate_embedding_storage(m_reader_dev)
+
         self.f_i.save_model(self.cM.saved_model)
 
     def predict(self, m_reader: DataReader):
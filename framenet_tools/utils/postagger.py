@@ -1,10 +1,12 @@
 import logging
 import nltk
-import spacy
+import os
 
 from nltk.stem import WordNetLemmatizer
 from nltk.tree import Tree
-from typing import List
+from typing import Iterable, List
+
+from framenet_tools.utils.static_utils import ensure_resources, get_spacy_model, make_doc
 
 
 class PosTagger(object):
@@ -12,15 +14,19 @@ class PosTagger(object):
     PosTagger provides options for assigning POS-tags to sentences.
 
     Either by spacy or nltk.
+
+    NOTE: The given tokens are never split again, so there is exactly one tag per token
     """
 
-    def __init__(self, use_spacy: bool):
+    def __init__(self, use_spacy: bool, profile: str = "pos"):
 
         self.use_spacy = use_spacy
 
         if self.use_spacy:
-            self.nlp = spacy.load("en_core_web_sm")
+            ensure_resources(backends=["spacy"])
+            self.nlp = get_spacy_model(profile=profile)
         else:
+            ensure_resources(backends=["nltk"])
             self.lemmatizer = WordNetLemmatizer()
 
     def get_tags(self, sentence: List[str]):
@@ -40,19 +46,52 @@ class PosTagger(object):
         """
         The spacy version of the get_tags method
 
+        NOTE: The given tokens are kept, see make_doc
+
         :param tokens:The sentence, given as a list of words
         :return: A list of POS-tags
         """
 
-        sentence = ""
+        return self.get_token_data(self.nlp(make_doc(self.nlp, tokens)))
+
+    def get_tags_batch(
+        self, sentences: Iterable[List[str]], batch_size: int = 256, workers: int = 1
+    ):
+        """
+        Returns the POS-tags of many sentences, equal to calling get_tags for each of them.
+
+        NOTE: With spacy, the sentences are streamed through nlp.pipe in batches, optionally across processes.
+              Nltk offers no batched tagging, so its sentences are tagged one by one.
+
+        :param sentences: An iterable of sentences, given as lists of words
+        :param batch_size: The amount of sentences processed at once
+        :param workers: The amount of processes, 0 for one per cpu core
+        :return: A generator of the lists of POS-tags
+        """
+
+        if not self.use_spacy:
+            for sentence in sentences:
+                yield self.get_tags_nltk(sentence)
+
+            return
+
+        if workers < 1:
+            workers = os.cpu_count()
+
+        docs = (make_doc(self.nlp, tokens) for tokens in sentences)
 
-        if len(tokens) > 0:
-            sentence = tokens[0]
+        for doc in self.nlp.pipe(docs, batch_size=batch_size, n_process=workers):
+            yield self.get_token_data(doc)
 
-        for token in tokens[1:]:
-            sentence += " " + token
+    def get_token_data(self, doc: object):
+        """
+        Helper function
+        Extracts the text, tag, lemma and NE of each token of a spacy doc
+
+        :param doc: The spacy doc
+        :return: A list of POS-tags
+        """
 
-        doc = self.nlp(sentence)
         pData = []
 
         for token in doc:
@@ -89,8 +128,9 @@ class PosTagger(object):
             lemmas.append(self.lemmatizer.lemmatize(tag[0], pos=get_pos_constants(tag[1])))
         chunks = nltk.ne_chunk(tags)
         for chunk in chunks:
+            # Named entities spanning multiple tokens are labeled on each of them
             if isinstance(chunk, Tree):
-                nes.append(chunk.label())
+                nes += [chunk.label()] * len(chunk)
             else:
                 nes.append("-")
         pData = []
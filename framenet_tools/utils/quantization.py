@@ -0,0 +1,206 @@
+import numpy as np
+import os
+
+# Supported storage modes of frozen embedding tables
+storage_modes = ["float32", "float16", "int8"]
+
+
+def check_storage_mode(mode: str):
+    """
+    Checks whether a storage mode is supported
+
+    :param mode: The storage mode
+    :return:
+    """
+
+    if mode not in storage_modes:
+        raise Exception(f"Unknown embedding storage mode {mode}, use one of {storage_modes}!")
+
+
+def quantize_rows(matrix: np.ndarray):
+    """
+    Quantizes a matrix to int8, using one scale per row
+
+    :param matrix: The float matrix
+    :return: A pair of the int8 matrix and the float32 scales of its rows
+    """
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+
+    if matrix.shape[0] == 0:
+        return np.zeros(matrix.shape, dtype=np.int8), np.zeros(0, dtype=np.float32)
+
+    scales = np.abs(matrix).max(axis=1) / 127
+    scales[scales == 0] = 1
+
+    quantized = np.rint(matrix / scales[:, None]).astype(np.int8)
+
+    return quantized, scales.astype(np.float32)
+
+
+def save_quantized(
+    matrix: np.ndarray, mode: str, data_path: str, scales_path: str, chunk_size: int = 65536
+):
+    """
+    Quantizes a matrix into .npy files, which can be memory-mapped by QuantizedMatrix.load
+
+    NOTE: The matrix is processed in chunks of rows, so it can be a memory-mapped file itself.
+    NOTE: The scales are only written for int8.
+
+    :param matrix: The float matrix
+    :param mode: The storage mode (float16 or int8)
+    :param data_path: The path of the quantized matrix
+    :param scales_path: The path of the scales of its rows
+    :param chunk_size: The amount of rows quantized at once
+    :return: A pair of the maximal absolute error and the mean cosine similarity of the quantized rows
+    """
+
+    check_storage_mode(mode)
+
+    tmp_path = data_path + ".tmp"
+    data = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=mode, shape=matrix.shape)
+    scales = np.ones(matrix.shape[0], dtype=np.float32)
+
+    max_error = 0.0
+    cosine_sum = 0.0
+
+    for start in range(0, matrix.shape[0], chunk_size):
+        chunk = np.asarray(matrix[start : start + chunk_size], dtype=np.float32)
+
+        if mode == "int8":
+            quantized, chunk_scales = quantize_rows(chunk)
+            scales[start : start + chunk_size] = chunk_scales
+            restored = quantized * chunk_scales[:, None]
+        else:
+            quantized = chunk.astype(mode)
+            restored = quantized.astype(np.float32)
+
+        data[start : start + chunk_size] = quantized
+
+        if chunk.size > 0:
+            max_error = max(max_error, float(np.abs(restored - chunk).max()))
+
+        norms = np.linalg.norm(chunk, axis=1) * np.linalg.norm(restored, axis=1)
+        norms[norms == 0] = 1
+        cosine_sum += float(((chunk * restored).sum(axis=1) / norms).sum())
+
+    data.flush()
+    del data
+
+    if mode == "int8":
+        np.save(scales_path, scales)
+
+    os.replace(tmp_path, data_path)
+
+    return max_error, cosine_sum / max(matrix.shape[0], 1)
+
+
+class QuantizedMatrix(object):
+    """
+    A read-only matrix stored as float16 or per-row scaled int8
+
+    Indexing dequantizes only the requested rows and returns float32 values.
+    """
+
+    def __init__(self, matrix: np.ndarray, mode: str):
+
+        check_storage_mode(mode)
+
+        if mode == "int8":
+            self.set_data(*quantize_rows(matrix), mode)
+        else:
+            self.set_data(np.asarray(matrix, dtype=mode), None, mode)
+
+    @classmethod
+    def load(cls, data_path: str, scales_path: str, mode: str):
+        """
+        Memory-maps a matrix saved by save_quantized
+
+        :param data_path: The path of the quantized matrix
+        :param scales_path: The path of the scales of its rows
+        :param mode: The storage mode
+        :return: The QuantizedMatrix
+        """
+
+        check_storage_mode(mode)
+
+        scales = np.load(scales_path, mmap_mode="r") if mode == "int8" else None
+
+        return cls.from_data(np.load(data_path, mmap_mode="r"), scales, mode)
+
+    @classmethod
+    def from_data(cls, data: np.ndarray, scales: np.ndarray, mode: str):
+        """
+        Wraps already quantized data without copying it, e.g. arrays in shared memory
+
+        :param data: The float16 or int8 matrix
+        :param scales: The scales of the rows (int8 only, otherwise None)
+        :param mode: The storage mode
+        :return: The QuantizedMatrix
+        """
+
+        quantized = cls.__new__(cls)
+        quantized.set_data(data, scales, mode)
+
+        return quantized
+
+    def set_data(self, data: np.ndarray, scales: np.ndarray, mode: str):
+        """
+        Setter for the quantized data
+
+        :param data: The float16 or int8 matrix
+        :param scales: The scales of the rows (int8 only, otherwise None)
+        :param mode: The storage mode
+        :return:
+        """
+
+        self.mode = mode
+        self.data = data
+        self.scales = scales
+
+        self.shape = self.data.shape
+        self.ndim = self.data.ndim
+        self.dtype = np.dtype(np.float32)
+
+    @property
+    def nbytes(self):
+        """
+        :return: The amount of bytes used by the stored data
+        """
+
+        if self.scales is None:
+            return self.data.nbytes
+
+        return self.data.nbytes + self.scales.nbytes
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, rows):
+        """
+        Dequantizes the given rows
+
+        :param rows: A row index, a slice or an array of indices
+        :return: The float32 values of the rows
+        """
+
+        values = self.data[rows].astype(np.float32)
+
+        if self.scales is not None:
+            values *= self.scales[rows][..., None]
+
+        return values
+
+    def __array__(self, dtype=None, copy=None):
+        """
+        Dequantizes the whole matrix
+
+        :return: The float32 matrix
+        """
+
+        values = self[:]
+
+        if dtype is not None:
+            values = values.astype(dtype)
+
+        return values
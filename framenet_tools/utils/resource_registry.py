@@ -0,0 +1,171 @@
+import logging
+import threading
+
+from typing import Callable, Hashable
+
+
+def estimate_size(resource: object):
+    """
+    Roughly estimates the memory used by a resource
+
+    NOTE: Only arrays, embedding managers, networks and containers of them are accounted for.
+          Memory-mapped arrays are counted with their full size.
+
+    :param resource: The resource
+    :return: The estimated size in bytes
+    """
+
+    if resource is None:
+        return 0
+
+    if isinstance(resource, (tuple, list)):
+        return sum(estimate_size(x) for x in resource)
+
+    if hasattr(resource, "nbytes"):
+        return int(resource.nbytes)
+
+    if hasattr(resource, "element_size") and hasattr(resource, "numel"):
+        return resource.element_size() * resource.numel()
+
+    if hasattr(resource, "state_dict"):
+        return sum(estimate_size(x) for x in resource.state_dict().values())
+
+    if hasattr(resource, "net"):
+        return estimate_size(resource.net)
+
+    if hasattr(resource, "vectors"):
+        return estimate_size(resource.vectors)
+
+    return 0
+
+
+class Resource(object):
+    """
+    A single entry of the ResourceRegistry
+    """
+
+    def __init__(self, value: object, version: Hashable):
+
+        self.value = value
+        self.version = version
+        self.hits = 0
+
+
+class ResourceRegistry(object):
+    """
+    Process-wide registry of heavy resources
+
+    Hands out shared instances of embedding managers, spaCy pipelines, vocabularies, networks and configs.
+    Each resource is created on first request and kept until it is explicitly released.
+
+    NOTE: Every caller receives the same instance, resources must be copied before being modified.
+    """
+
+    def __init__(self):
+
+        self.resources = dict()
+        self.loads = dict()
+        self.lock = threading.RLock()
+
+    def get(self, kind: str, key: Hashable, factory: Callable, version: Hashable = None):
+        """
+        Returns the shared instance of a resource, creating it if necessary
+
+        NOTE: If the version differs from the one of the stored instance (e.g. a changed file), it is recreated.
+
+        :param kind: The kind of the resource, e.g. "spacy"
+        :param key: The key of the resource, e.g. its path and options
+        :param factory: The function creating the resource
+        :param version: The version of the resource
+        :return: The resource
+        """
+
+        with self.lock:
+            resource = self.resources.get((kind, key))
+
+            if resource is not None and resource.version == version:
+                resource.hits += 1
+                return resource.value
+
+            logging.debug(f"Loading resource {kind}: {key}")
+
+            resource = Resource(factory(), version)
+
+            self.resources[(kind, key)] = resource
+            self.loads[kind] = self.loads.get(kind, 0) + 1
+
+            return resource.value
+
+    def contains(self, kind: str, key: Hashable):
+        """
+        Checks whether a resource is currently loaded
+
+        :param kind: The kind of the resource
+        :param key: The key of the resource
+        :return: True if loaded, otherwise False
+        """
+
+        return (kind, key) in self.resources
+
+    def release(self, kind: str, key: Hashable = None):
+        """
+        Drops resources from the registry
+
+        NOTE: The memory is only freed once no other references to the resource exist
+
+        :param kind: The kind of the resources to release
+        :param key: The key of the resource, if None all resources of the kind are released
+        :return:
+        """
+
+        with self.lock:
+            for entry in list(self.resources):
+                if entry[0] == kind and (key is None or entry[1] == key):
+                    del self.resources[entry]
+
+    def clear(self):
+        """
+        Drops all resources and statistics
+
+        :return:
+        """
+
+        with self.lock:
+            self.resources = dict()
+            self.loads = dict()
+
+    def memory_usage(self):
+        """
+        Estimates the memory used by the loaded resources
+
+        :return: A dict of the kinds and their estimated size in bytes
+        """
+
+        usage = dict()
+
+        with self.lock:
+            for (kind, key), resource in self.resources.items():
+                usage[kind] = usage.get(kind, 0) + estimate_size(resource.value)
+
+        return usage
+
+    def report(self):
+        """
+        Logs the loaded resources, their loading counts and estimated memory usage
+
+        :return:
+        """
+
+        usage = self.memory_usage()
+
+        for kind in sorted(usage):
+            count = sum(1 for entry in self.resources if entry[0] == kind)
+
+            logging.info(
+                f"Resource {kind}: {count} loaded, {self.loads.get(kind, 0)} loads, "
+                f"{usage[kind] / 1024 ** 2:.1f} MB"
+            )
+
+
+# The registry of the current process
+registry = ResourceRegistry()
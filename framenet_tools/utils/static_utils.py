@@ -1,16 +1,40 @@
+import hashlib
+import json
 import logging
 import pickle
 
-import nltk
+import numpy as np
 import random
+import sys
+import time
 import os
-import py7zlib
-import requests
-import spacy
 
-from typing import List
+from functools import lru_cache
+from typing import Iterable, List
 from subprocess import call
 
+from framenet_tools.utils.resource_registry import registry
+
+# NOTE: nltk, spacy, py7zlib and requests are imported by the functions using them,
+#       keeping them out of the startup time of the command line interface
+
+# Maximum amount of out of vocabulary vectors kept in memory
+OOV_CACHE_SIZE = 100000
+
+# The spacy models required by the pipeline
+required_spacy_models = ["en_core_web_sm"]
+
+# The components excluded from the spacy pipeline, by the use case they are loaded for
+spacy_profiles = {
+    # The complete pipeline
+    "full": [],
+    # POS-tagging and FEE identification need tags, lemmas and named entities
+    "pos": ["parser", "senter"],
+    # Sentence splitting only needs the parser
+    "sentences": ["tagger", "attribute_ruler", "lemmatizer", "ner"],
+    # Span identification needs the tags and the dependency parse
+    "syntax": ["lemmatizer", "ner", "senter"],
+}
 
 required_resources = [
     ["taggers/", "averaged_perceptron_tagger"],
@@ -65,16 +89,128 @@ def download_resources():
     """
     Checks if the required resources from nltk are installed, if not they are downloaded.
 
-    :return:
+    :return: A list of the resources that are installed afterwards
     """
 
+    import nltk
+
+    installed = []
+
     logging.debug(f"Checking nltk resources.")
     for resource in required_resources:
         try:
             nltk.data.find(resource[0] + resource[1])
         except LookupError:
             logging.info(f"Did not find {resource[1]}, downloading...")
-            nltk.download(resource[1])
+
+            if not nltk.download(resource[1]):
+                continue
+
+        installed.append(resource[0] + resource[1])
+
+    return installed
+
+
+def get_resource_manifest():
+    """
+    Returns the path of the manifest, which records the resources already found to be installed
+
+    NOTE: The resources are installed per python environment, so is the manifest.
+          It is kept in the cache directory of the user, independent of the working directory.
+
+    :return: The path of the manifest
+    """
+
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    environment = hashlib.blake2b(sys.prefix.encode("utf-8"), digest_size=8).hexdigest()
+
+    return os.path.join(cache_dir, "framenet_tools", f"resources.{environment}.manifest")
+
+
+def check_resources(path: str = None, backends: List[str] = None):
+    """
+    Checks all resources not yet recorded in the manifest, installs missing ones and updates the manifest
+
+    NOTE: Only the resources of the given backends are checked, spacy is only imported if requested.
+
+    :param path: The path of the manifest, defaults to get_resource_manifest
+    :param backends: The backends to check the resources of, "nltk" and/or "spacy" (default: both)
+    :return: The set of installed resources
+    """
+
+    if path is None:
+        path = get_resource_manifest()
+
+    if backends is None:
+        backends = ["nltk", "spacy"]
+
+    installed = set()
+
+    if os.path.isfile(path):
+        with open(path, "r") as file:
+            installed = set(json.load(file))
+
+    nltk_resources = []
+    spacy_models = []
+
+    if "nltk" in backends:
+        nltk_resources = [resource[0] + resource[1] for resource in required_resources]
+
+    if "spacy" in backends:
+        spacy_models = ["spacy/" + model for model in required_spacy_models]
+
+    if set(nltk_resources + spacy_models) <= installed:
+        return installed
+
+    logging.info("Checking required resources.")
+
+    if not set(nltk_resources) <= installed:
+        installed.update(download_resources())
+
+    if spacy_models:
+        import spacy
+
+    for model, entry in zip(required_spacy_models, spacy_models):
+        if entry in installed:
+            continue
+
+        if not spacy.util.is_package(model):
+            get_spacy_en_model()
+
+        # Only record models that were installed successfully
+        if spacy.util.is_package(model):
+            installed.add(entry)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(path, "w") as file:
+        json.dump(sorted(installed), file)
+
+    return installed
+
+
+def ensure_resources(path: str = None, backends: List[str] = None):
+    """
+    Makes sure the required nltk resources and spacy models are installed
+
+    NOTE: Found resources are recorded in a manifest, so the checks only run on the first use.
+          Within a process the manifest is only read once per backend, see ResourceRegistry.
+          Delete the manifest to enforce a new check.
+
+    :param path: The path of the manifest, defaults to get_resource_manifest
+    :param backends: The backends to check the resources of, "nltk" and/or "spacy" (default: both)
+    :return:
+    """
+
+    if path is None:
+        path = get_resource_manifest()
+
+    if backends is None:
+        backends = ["nltk", "spacy"]
+
+    key = (path, tuple(sorted(backends)))
+
+    registry.get("resource_manifest", key, lambda: check_resources(path, backends))
 
 
 def load_pkl_from_path(str_path_file: str):
@@ -96,35 +232,16 @@ def load_pkl_from_path(str_path_file: str):
     return loaded_pkl
 
 
-def print_dict_to_txt(str_path_file: str, dict_to_print: dict):
-    """
-    Taken from: https://public.ukp.informatik.tu-darmstadt.de/repl4nlp17-frameEmbeddings/reader.py
-
-    :param str_path_file: The path of the dict to save to
-    :param dict_to_print: The dict to save
-    :return:
-    """
-
-    logging.debug(f"Printing to: {str_path_file}")
-
-    with open(str_path_file, "w") as file_out:
-        for key, val in dict_to_print.items():
-            file_out.write("{}\t{}\n".format(key, list(val)))
-
-
 def download_frame_embeddings():
     """
     Checks if the needed frame embeddings are already downloaded, if not they are downloaded.
 
+    NOTE: The pickles are loaded directly by the FrameEmbeddingManager, no text version is created.
+
     :return:
     """
 
     path = "data/frame_embeddings/"
-    files = [
-        "dict_frame_to_emb_50dim_TransE_list.txt",
-        "dict_frame_to_emb_100dim_wsb_list.txt",
-        "dict_frame_to_emb_300dim_w2v_list.txt",
-    ]
     pkl_files = [
         "dict_frame_to_emb_50dim_transE_npArray.pkl",
         "dict_frame_to_emb_100dim_wsb_npArray.pkl",
@@ -138,14 +255,11 @@ def download_frame_embeddings():
     if not os.path.isdir(path):
         os.makedirs(path)
 
-    for file, pkl_file in zip(files, pkl_files):
-        if not os.path.isfile(path + file):
-            logging.info(f"Did not find {file}, downloading...")
+    for pkl_file in pkl_files:
+        if not os.path.isfile(path + pkl_file):
+            logging.info(f"Did not find {pkl_file}, downloading...")
             download_file(url + pkl_file, path + pkl_file)
 
-            dict_frame_emb = load_pkl_from_path(path + pkl_file)
-            print_dict_to_txt(path + file, dict_frame_emb)
-
 
 def shuffle_concurrent_lists(l: List[List[object]]):
     """
@@ -170,6 +284,8 @@ def extract7z(path: str):
     :return:
     """
 
+    import py7zlib
+
     with open(path, "rb") as in_file:
         arch = py7zlib.Archive7z(in_file)
         py7zlib.ArchiveFile
@@ -189,6 +305,8 @@ def download_file(url: str, file_path: str):
     :return:
     """
 
+    import requests
+
     r = requests.get(url, stream=True)
     with open(file_path, "wb") as fd:
         logging.info(f"Downloading {r.url} and saving to {file_path}")
@@ -216,6 +334,102 @@ def extract_file(file_path: str):
     os.remove(file_path)
 
 
+def get_spacy_model(name: str = "en_core_web_sm", profile: str = "full"):
+    """
+    Returns the spacy pipeline of the given model
+
+    NOTE: The pipeline is loaded only once per process and profile, see ResourceRegistry
+
+    :param name: The name of the spacy model
+    :param profile: The name of the profile, see spacy_profiles
+    :return: The spacy pipeline
+    """
+
+    return registry.get("spacy", (name, profile), lambda: load_spacy_model(name, profile))
+
+
+def make_doc(nlp: object, tokens: List[str]):
+    """
+    Creates a spacy doc of already tokenized words, bypassing the tokenizer of the pipeline
+
+    NOTE: Pass the doc to nlp or nlp.pipe to run the components, its tokens equal the given words.
+          The words are separated by single spaces, as in a doc of " ".join(tokens).
+          Passing a doc to nlp requires spacy 3.2 or newer.
+
+    :param nlp: The spacy pipeline
+    :param tokens: The sentence, given as a list of words
+    :return: The spacy doc
+    """
+
+    from spacy.tokens import Doc
+
+    return Doc(nlp.vocab, words=tokens)
+
+
+def load_spacy_model(name: str, profile: str = "full"):
+    """
+    Loads a spacy model without the components excluded by the given profile
+
+    NOTE: The sentences profile splits sentences, if its model has no component setting the sentence boundaries
+          a rule-based sentencizer is added. The other profiles do not read sentence boundaries.
+
+    :param name: The name of the spacy model
+    :param profile: The name of the profile, see spacy_profiles
+    :return: The spacy pipeline
+    """
+
+    import spacy
+
+    if profile not in spacy_profiles:
+        raise Exception(f"Unknown spacy profile {profile}, choose one of {list(spacy_profiles)}!")
+
+    nlp = spacy.load(name, exclude=spacy_profiles[profile])
+
+    if profile == "sentences" and not {"parser", "senter", "sentencizer"} & set(nlp.pipe_names):
+        nlp.add_pipe("sentencizer")
+
+    return nlp
+
+
+def measure_spacy_profiles(
+    sentences: List[List[str]], profiles: List[str] = None, name: str = "en_core_web_sm"
+):
+    """
+    Measures the latency of the spacy profiles
+
+    NOTE: The savings are reported in relation to the full pipeline
+
+    :param sentences: The sentences to process, given as lists of words
+    :param profiles: The names of the profiles to measure, defaults to all
+    :param name: The name of the spacy model
+    :return: A dict of the seconds per sentence of each profile
+    """
+
+    if profiles is None:
+        profiles = list(spacy_profiles)
+
+    latencies = dict()
+
+    for profile in ["full"] + [profile for profile in profiles if profile != "full"]:
+        nlp = get_spacy_model(name, profile)
+
+        start = time.perf_counter()
+
+        for sentence in sentences:
+            nlp(make_doc(nlp, sentence))
+
+        latencies[profile] = (time.perf_counter() - start) / max(len(sentences), 1)
+
+    for profile, latency in latencies.items():
+        saving = 1 - latency / latencies["full"] if latencies["full"] > 0 else 0
+
+        logging.info(
+            f"spacy profile {profile}: {latency * 1000:.2f} ms per sentence ({saving:.0%} saved)"
+        )
+
+    return latencies
+
+
 def get_spacy_en_model():
     """
     Installs the required en_core_web_sm model
@@ -263,28 +477,16 @@ def get_sentences(raw: str, use_spacy: bool = False):
     return get_sentences_nltk(raw)
 
 
-def get_sentences_spacy(raw: str):
+def get_sentences_spacy(raw: str, profile: str = "sentences"):
     """
     The spacy version of the get_sentences method.
 
     :param raw: A raw string of text
+    :param profile: The spacy profile to use, see spacy_profiles
     :return: A list of sentences, consisting of tokens
     """
 
-    nlp = spacy.load("en_core_web_sm")
-    doc = nlp(raw)
-    sents = [sent.string.strip() for sent in doc.sents]
-
-    tokenizer = spacy.tokenizer.Tokenizer(nlp.vocab)
-
-    sentences = []
-
-    for sent in sents:
-        tokens = nlp(sent)
-        words = [token.text for token in tokens]
-        sentences.append(words)
-
-    return sentences
+    return list(stream_sentences_spacy([raw], profile))
 
 
 def get_sentences_nltk(raw: str):
@@ -295,15 +497,225 @@ def get_sentences_nltk(raw: str):
     :return: A list of sentences, consisting of tokens
     """
 
-    sents = nltk.sent_tokenize(raw)
+    return list(stream_sentences_nltk([raw]))
+
+
+def stream_sentences(chunks: Iterable[str], use_spacy: bool = False, profile: str = "sentences"):
+    """
+    Lazily parses chunks of raw text into structured sentences.
+
+    NOTE: Sentences never span two chunks, so chunks should end at paragraph boundaries, see read_paragraphs
+
+    :param chunks: An iterable of raw strings of text
+    :param use_spacy: True to use spacy, otherwise nltk
+    :param profile: The spacy profile to use, see spacy_profiles
+    :return: A generator of sentences, consisting of tokens
+    """
+
+    if use_spacy:
+        return stream_sentences_spacy(chunks, profile)
+
+    return stream_sentences_nltk(chunks)
+
+
+def stream_sentences_spacy(chunks: Iterable[str], profile: str = "sentences"):
+    """
+    The spacy version of the stream_sentences method.
+
+    NOTE: The chunks are processed by nlp.pipe, so only one Doc is kept at a time.
+
+    :param chunks: An iterable of raw strings of text
+    :param profile: The spacy profile to use, see spacy_profiles
+    :return: A generator of sentences, consisting of tokens
+    """
+
+    nlp = get_spacy_model(profile=profile)
+
+    for doc in nlp.pipe(chunks):
+        for sent in doc.sents:
+            words = [token.text for token in sent if not token.is_space]
+
+            if words:
+                yield words
+
+
+def stream_sentences_nltk(chunks: Iterable[str]):
+    """
+    The nltk version of the stream_sentences method.
+
+    :param chunks: An iterable of raw strings of text
+    :return: A generator of sentences, consisting of tokens
+    """
+
+    import nltk
+
+    for chunk in chunks:
+        for sent in nltk.sent_tokenize(chunk):
+            yield nltk.word_tokenize(sent)
+
+
+def split_line(line: str, max_length: int):
+    """
+    Splits a line into pieces of at most max_length characters
+
+    NOTE: The line is split after the last whitespace of a piece, or hard if the piece has none.
+          Joining the pieces restores the line.
+
+    :param line: The line to split
+    :param max_length: The maximal amount of characters of a piece
+    :return: A generator of the pieces
+    """
+
+    while len(line) > max_length:
+        pos = max(line.rfind(c, 0, max_length) for c in " \t") + 1
+
+        if pos == 0:
+            pos = max_length
+
+        yield line[:pos]
+
+        line = line[pos:]
+
+    if line:
+        yield line
+
+
+def read_paragraphs(path: str, chunk_size: int = 100000):
+    """
+    Reads a text file in chunks of whole paragraphs
+
+    NOTE: A chunk ends at the first empty line after chunk_size characters.
+          Paragraphs are split at a line break before a chunk exceeds ten times the chunk size,
+          lines longer than the chunk size are split at whitespace, see split_line.
+          With the default chunk size, no chunk exceeds the max_length of spacy.
+
+    :param path: The path of the text file
+    :param chunk_size: The minimum amount of characters of a chunk
+    :return: A generator of the chunks
+    """
+
+    lines = []
+    size = 0
+
+    with open(path, "r") as file:
+        for line in file:
+            for piece in split_line(line, chunk_size):
+                if lines and size + len(piece) > 10 * chunk_size:
+                    yield "".join(lines)
+
+                    lines = []
+                    size = 0
+
+                lines.append(piece)
+                size += len(piece)
+
+                if size >= chunk_size and piece.strip() == "":
+                    yield "".join(lines)
+
+                    lines = []
+                    size = 0
+
+    if lines:
+        yield "".join(lines)
+
+
+def open_compressed(path: str, mode: str = "r"):
+    """
+    Opens a text file, which is compressed according to its extension (.gz or .zst)
+
+    NOTE: zstd compression requires the zstandard package
+
+    :param path: The path of the file
+    :param mode: The mode, either "r" or "w"
+    :return: The opened text file
+    """
+
+    if path.endswith(".gz"):
+        import gzip
+
+        return gzip.open(path, mode + "t", encoding="utf-8")
+
+    if path.endswith(".zst"):
+        try:
+            import zstandard
+        except ImportError:
+            raise Exception("Reading or writing .zst files requires the zstandard package!")
+
+        return zstandard.open(path, mode + "t", encoding="utf-8")
+
+    return open(path, mode, encoding="utf-8")
+
+
+def strip_compression(path: str):
+    """
+    Removes the extension of the compression from a path, see open_compressed
+
+    :param path: The path of the file
+    :return: The path without .gz or .zst
+    """
+
+    for extension in [".gz", ".zst"]:
+        if path.endswith(extension):
+            return path[: -len(extension)]
+
+    return path
+
+
+def is_json_file(path: str):
+    """
+    Checks if a path names a (possibly compressed) json or json lines file
+
+    :param path: The path of the file
+    :return: True for json and json lines files
+    """
+
+    return strip_compression(path).endswith((".json", ".jsonl"))
+
+
+def is_columns_directory(path: str):
+    """
+    Checks if a path names a directory of columns, see ColumnarStore
+
+    :param path: The path of the directory
+    :return: True for paths ending with .columns
+    """
+
+    return path.rstrip("/").endswith(".columns")
+
+
+def is_json_lines_file(path: str):
+    """
+    Checks if a path names a (possibly compressed) json lines file
+
+    :param path: The path of the file
+    :return: True for json lines files
+    """
+
+    return strip_compression(path).endswith(".jsonl")
+
+
+@lru_cache(maxsize=OOV_CACHE_SIZE)
+def get_oov_vector(token: str, dim: int, scale: float):
+    """
+    Generates a random vector for an out of vocabulary token.
+
+    NOTE: The vector is seeded by a hash of the token, therefore it is the same across processes and runs.
+    NOTE: The vectors are cached, the returned array is read-only!
+
+    :param token: The unknown word or frame
+    :param dim: The dimension of the vector
+    :param scale: The upper bound of the (uniformly distributed) values
+    :return: The vector as a float32 array
+    """
 
-    sentences = []
+    # RandomState (unlike default_rng) is available in all supported numpy versions, seeds are 32 bit
+    digest = hashlib.blake2b(str(token).encode("utf-8"), digest_size=4).digest()
+    rng = np.random.RandomState(int.from_bytes(digest, "little"))
 
-    for sent in sents:
-        words = nltk.word_tokenize(sent)
-        sentences.append(words)
+    vector = rng.random_sample(dim).astype(np.float32) * np.float32(scale)
+    vector.setflags(write=False)
 
-    return sentences
+    return vector
 
 
 def pos_to_int(pos: str):
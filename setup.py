@@ -34,7 +34,7 @@ setuptools.setup(
                       "nltk",
                       "requests",
                       "scipy",
-                      "spacy",
+                      "spacy>=3.2",
                       "tensorboardX",
                       "tqdm",
                       "numpy",
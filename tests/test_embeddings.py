@@ -0,0 +1,476 @@
+import numpy as np
+import os
+import pickle
+import pytest
+import random
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from framenet_tools.config import ConfigManager
+from framenet_tools.data_handler.frame_embedding_manager import FrameEmbeddingManager
+from framenet_tools.data_handler.semaforreader import SemaforReader
+from framenet_tools.data_handler.shared_embeddings import SharedIndex, WorkerPool
+from framenet_tools.data_handler.word_embedding_manager import WordEmbeddingManager
+from framenet_tools.utils.quantization import QuantizedMatrix
+from tests.test_reader import create_random_string, create_frames_file, create_sentences_file
+
+
+def create_embedding_file(words: int, dim: int, known_words: List[str] = []):
+    """
+    Helper function for generating a random word2vec text file
+
+    NOTE: Randomized!
+
+    :param words: The amount of words to generate
+    :param dim: The dimension of the embeddings
+    :param known_words: Words that have to be included
+    :return: The name of the generated file and a dict of the generated embeddings
+    """
+
+    file_name = create_random_string() + ".w2vt"
+    embeddings = dict()
+
+    for word in known_words:
+        embeddings[word] = [round(random.random(), 4) for _ in range(dim)]
+
+    while len(embeddings) < words:
+        embeddings[create_random_string()] = [round(random.random(), 4) for _ in range(dim)]
+
+    with open(file_name, "w") as file:
+        file.write(f"{words} {dim}\n")
+
+        for word, vector in embeddings.items():
+            file.write(word + " " + " ".join(str(x) for x in vector) + "\n")
+
+    return file_name, embeddings
+
+
+def clean_up(path: str):
+    """
+    Helper function for deleting an embedding file and its binary versions
+
+    :param path: The path of the text file
+    :return:
+    """
+
+    files = [path, path + ".npy", path + ".vocab"]
+
+    for mode in ["float16", "int8"]:
+        files += [f"{path}.{mode}.npy", f"{path}.{mode}.scales.npy"]
+
+    for file in files:
+        if os.path.isfile(file):
+            os.remove(file)
+
+
+@pytest.mark.parametrize("run", range(3))
+def test_word_embedding_conversion(run: int):
+    """
+    Tests whether the binary word embeddings equal the ones in the text file.
+
+    NOTE: randomized
+
+    :param run: Number of random repeats
+    :return:
+    """
+
+    path, embeddings = create_embedding_file(50, 10)
+
+    try:
+        wEM = WordEmbeddingManager(path)
+        wEM.read_word_embeddings()
+
+        assert wEM.is_converted()
+
+        for word, vector in embeddings.items():
+            assert wEM.embed(word).tolist() == pytest.approx(vector, abs=1e-6)
+
+        # Second manager uses the existing binary files
+        os.remove(path)
+        wEM = WordEmbeddingManager(path)
+        wEM.read_word_embeddings()
+
+        assert len(wEM.vectors) == len(embeddings)
+    finally:
+        clean_up(path)
+
+
+@pytest.mark.parametrize("mode, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_word_embedding_storage(mode: str, tolerance: float):
+    """
+    Tests that quantized word embeddings are saved once and memory-mapped.
+
+    :param mode: The storage mode
+    :param tolerance: The maximal absolute error of the quantized values
+    :return:
+    """
+
+    path, embeddings = create_embedding_file(40, 10)
+
+    try:
+        wEM = WordEmbeddingManager(path, mode)
+        wEM.read_word_embeddings()
+
+        assert wEM.is_quantized()
+        assert isinstance(wEM.vectors.data, np.memmap)
+
+        for word, vector in embeddings.items():
+            assert wEM.embed(word).tolist() == pytest.approx(vector, abs=tolerance)
+
+        # Second manager uses the existing quantized files
+        modified = os.path.getmtime(wEM.quantized_path)
+
+        wEM = WordEmbeddingManager(path, mode)
+        wEM.read_word_embeddings()
+
+        assert os.path.getmtime(wEM.quantized_path) == modified
+        assert wEM.vectors.shape == (40, 10)
+    finally:
+        clean_up(path)
+
+
+def test_word_embedding_lowercase():
+    """
+    Tests the fallback to lowercased words and unknown words.
+
+    :return:
+    """
+
+    path, embeddings = create_embedding_file(20, 5, ["mcdonald"])
+
+    try:
+        wEM = WordEmbeddingManager(path)
+        wEM.read_word_embeddings()
+
+        word = next(iter(embeddings))
+
+        for variant in [word.upper(), word.capitalize(), "McDonald", "mcDONALD"]:
+            assert wEM.embed(variant).tolist() == wEM.embed(variant.lower()).tolist()
+
+        assert wEM.embed(word + "_unknown") is None
+
+        # The fallback is not part of the index
+        assert len(wEM.words) == len(embeddings)
+
+        # Restricted loading embeds the same as full loading
+        vocabulary = {word, "McDonald", "mIxEd" + word}
+        restricted = WordEmbeddingManager(path)
+        restricted.read_word_embeddings(vocabulary)
+
+        for variant in vocabulary:
+            if wEM.embed(variant) is None:
+                assert restricted.embed(variant) is None
+            else:
+                assert restricted.embed(variant).tolist() == wEM.embed(variant).tolist()
+    finally:
+        clean_up(path)
+
+
+def test_word_embedding_header():
+    """
+    Tests that a text file with more embeddings than stated by its header is refused.
+
+    :return:
+    """
+
+    path, _ = create_embedding_file(10, 5)
+
+    with open(path) as file:
+        lines = file.readlines()
+
+    with open(path, "w") as file:
+        file.writelines(["9 5\n"] + lines[1:])
+
+    try:
+        with pytest.raises(Exception, match="more than the 9 embeddings"):
+            WordEmbeddingManager(path).convert_word_embeddings()
+
+        assert not os.path.isfile(path + ".npy.tmp")
+    finally:
+        clean_up(path)
+
+
+@pytest.mark.parametrize("converted", [True, False])
+def test_word_embedding_restricted(converted: bool):
+    """
+    Tests whether restricted loading only keeps the requested words.
+
+    :param converted: Whether the binary files exist before loading
+    :return:
+    """
+
+    path, embeddings = create_embedding_file(30, 5)
+
+    try:
+        if converted:
+            WordEmbeddingManager(path).convert_word_embeddings()
+
+        vocabulary = set(list(embeddings)[:10])
+        vocabulary.add("unknown_word")
+
+        wEM = WordEmbeddingManager(path)
+        wEM.read_word_embeddings(vocabulary)
+
+        assert len(wEM.words) == 10
+        assert wEM.vectors.shape == (10, 5)
+
+        for word in list(embeddings)[:10]:
+            assert wEM.embed(word).tolist() == pytest.approx(embeddings[word], abs=1e-6)
+
+        # Requesting new words extends the loaded embeddings
+        wEM.read_word_embeddings({list(embeddings)[-1]})
+
+        assert len(wEM.words) == 11
+    finally:
+        clean_up(path)
+
+
+@pytest.mark.parametrize("dim", [100, 50])
+def test_frame_embeddings(dim: int):
+    """
+    Tests loading frame embeddings from a pickle and embedding all frames of a reader.
+
+    NOTE: Unknown frames are embedded with the dimension of the loaded embeddings
+
+    :param dim: The dimension of the frame embeddings
+    :return:
+    """
+
+    cM = ConfigManager("config.file")
+    m_reader = SemaforReader(cM)
+    m_reader.read_data("semafor_dummy.sentences", "semafor_dummy.frame.elements")
+
+    frames = [
+        annotation.frame for annotations in m_reader.annotations for annotation in annotations
+    ]
+    dict_frame_emb = {frame: np.random.rand(dim) for frame in set(frames) - {frames[0]}}
+
+    path = create_random_string() + ".pkl"
+
+    with open(path, "wb") as file:
+        pickle.dump(dict_frame_emb, file)
+
+    try:
+        for _ in range(2):
+            # Second run loads from the cached matrix
+            cM.fEM = FrameEmbeddingManager(path)
+            m_reader.embed_frames(force=True)
+
+            assert cM.fEM.is_cached()
+            assert cM.fEM.get_dimension() == dim
+
+            for annotations in m_reader.annotations:
+                for annotation in annotations:
+                    assert annotation.embedded_frame.shape == (dim,)
+
+                    if annotation.frame in dict_frame_emb:
+                        assert np.allclose(
+                            annotation.embedded_frame, dict_frame_emb[annotation.frame]
+                        )
+    finally:
+        for file in [path, cM.fEM.matrix_path, cM.fEM.frames_path]:
+            if os.path.isfile(file):
+                os.remove(file)
+
+
+def test_empty_frame_embeddings():
+    """
+    Tests that frame embedding files without any embeddings fall back to random vectors.
+
+    :return:
+    """
+
+    cM = ConfigManager("config.file")
+    m_reader = SemaforReader(cM)
+    m_reader.read_data("semafor_dummy.sentences", "semafor_dummy.frame.elements")
+
+    path = create_random_string() + ".pkl"
+
+    with open(path, "wb") as file:
+        pickle.dump(dict(), file)
+
+    try:
+        for _ in range(2):
+            # Second run loads from the cached matrix
+            cM.fEM = FrameEmbeddingManager(path)
+            m_reader.embed_frames(force=True)
+
+            assert cM.fEM.vectors.shape == (0, 100)
+            assert not cM.fEM.frames
+
+            for annotations in m_reader.annotations:
+                for annotation in annotations:
+                    assert annotation.embedded_frame.shape == (100,)
+    finally:
+        for file in [path, cM.fEM.matrix_path, cM.fEM.frames_path]:
+            if os.path.isfile(file):
+                os.remove(file)
+
+
+def test_embedded_sentences():
+    """
+    Tests the sentence views and padded batches of the embedded sentences.
+
+    NOTE: randomized
+
+    :return:
+    """
+
+    files = [create_sentences_file(5, 10), create_frames_file(5, 3)]
+
+    cM = ConfigManager("config.file")
+    m_reader = SemaforReader(cM)
+    m_reader.read_data(files[0], files[1])
+
+    known_words = m_reader.sentences[0][:1] + m_reader.sentences[1][:1]
+    path, embeddings = create_embedding_file(20, 8, known_words)
+    files.append(path)
+
+    try:
+        cM.wEM = WordEmbeddingManager(path)
+        m_reader.embed_words()
+
+        embedded = m_reader.embedded_sentences
+
+        assert len(embedded) == len(m_reader.sentences)
+
+        for sentence, embedded_sentence in zip(m_reader.sentences, embedded):
+            assert embedded_sentence.shape == (len(sentence), 8)
+            assert np.shares_memory(embedded_sentence, embedded.vectors)
+
+        for i, word in enumerate(known_words):
+            assert embedded[i][0].tolist() == pytest.approx(embeddings[word], abs=1e-6)
+
+        padded, lengths = embedded.batch_tensor([1, 0])
+
+        assert padded.shape == (2, max(lengths), 8)
+        assert lengths.tolist() == [len(m_reader.sentences[1]), len(m_reader.sentences[0])]
+        assert padded[1, : lengths[1]].tolist() == embedded[0].tolist()
+        assert not padded[0, lengths[0] :].any()
+        assert embedded.get_tensor(1).tolist() == embedded[1].tolist()
+        assert embedded.get_lengths().sum() == len(embedded.vectors)
+    finally:
+        for file in files:
+            clean_up(file)
+
+
+def test_shared_embedding_managers():
+    """
+    Tests that all ConfigManagers of a process share the same embedding managers
+
+    :return:
+    """
+
+    first = ConfigManager("config.file")
+    second = ConfigManager("config.file")
+
+    assert first.wEM is second.wEM
+    assert first.fEM is second.fEM
+
+
+def embed_in_worker(words: List[str]):
+    """
+    Helper function executed inside of a worker process
+
+    :param words: The words to embed
+    :return: The embeddings, the storage mode and whether the stored vectors are writable
+    """
+
+    cM = ConfigManager("config.file")
+    vectors = cM.wEM.vectors
+
+    if isinstance(vectors, QuantizedMatrix):
+        vectors = vectors.data
+
+    return [cM.wEM.embed(word).tolist() for word in words], cM.wEM.storage, vectors.flags.writeable
+
+
+def test_shared_index():
+    """
+    Tests that the shared index equals the dict it was built from.
+
+    NOTE: randomized
+
+    :return:
+    """
+
+    index = {create_random_string(): row for row in range(100)}
+    index["Übung"] = 100
+
+    shared = SharedIndex(**SharedIndex.to_arrays(index))
+
+    assert len(shared) == len(index)
+    assert dict(shared.items()) == index
+
+    for key, row in index.items():
+        assert key in shared
+        assert shared[key] == shared.get(key) == row
+
+    assert "unknown_word" not in shared
+    assert shared.get("unknown_word") is None
+    assert SharedIndex(**SharedIndex.to_arrays(dict())).get("word") is None
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="shared memory requires python 3.8")
+@pytest.mark.parametrize("storage", ["float32", "int8"])
+def test_shared_embeddings(storage: str):
+    """
+    Tests that the workers of a WorkerPool use the embeddings published in shared memory.
+
+    :param storage: The storage mode of the word embeddings
+    :return:
+    """
+
+    path, embeddings = create_embedding_file(30, 6)
+    frame_path = create_random_string() + ".pkl"
+
+    with open(frame_path, "wb") as file:
+        pickle.dump({"Frame": np.random.rand(100)}, file)
+
+    cM = ConfigManager("config.file")
+    cM.share_embeddings = True
+    cM.word_embeddings_path = path
+    cM.frame_embeddings_path = frame_path
+    cM.embedding_storage = storage
+    cM.wEM = WordEmbeddingManager(path, storage)
+    cM.fEM = FrameEmbeddingManager(frame_path)
+
+    words = list(embeddings)[:5]
+
+    try:
+        with WorkerPool(cM, 2) as pool:
+            assert isinstance(cM.wEM.words, SharedIndex)
+            assert cM.fEM.embed("Frame").shape == (100,)
+
+            # Quantized matrices are shared without dequantizing them
+            if storage == "float32":
+                assert not cM.wEM.vectors.flags.writeable
+            else:
+                assert isinstance(cM.wEM.vectors, QuantizedMatrix)
+                assert cM.wEM.vectors.data.dtype == np.int8
+
+            # The registry only keeps the shared copies
+            other = ConfigManager("config.file")
+            other.word_embeddings_path = path
+            other.frame_embeddings_path = frame_path
+            other.embedding_storage = storage
+
+            assert other.wEM is cM.wEM
+            assert other.fEM is cM.fEM
+
+            expected = sorted(cM.wEM.embed(word).tolist() for word in words)
+
+            for vectors, worker_storage, writeable in pool.map(
+                embed_in_worker, [words, words[::-1]]
+            ):
+                assert not writeable
+                assert worker_storage == storage
+                assert sorted(vectors) == expected
+    finally:
+        for file in [frame_path, cM.fEM.matrix_path, cM.fEM.frames_path]:
+            if os.path.isfile(file):
+                os.remove(file)
+
+        clean_up(path)
@@ -7,7 +7,11 @@ from typing import List
 
 from framenet_tools.config import ConfigManager
 from framenet_tools.frame_identification.frameidentifier import FrameIdentifier
-from framenet_tools.frame_identification.frameidnetwork import Net, FrameIDNetwork
+from framenet_tools.frame_identification.frameidnetwork import (
+    Net,
+    FrameIDNetwork,
+    QuantizedEmbedding,
+)
 from tests.test_reader import create_random_string, RandomFiles
 
 ACTIVATION_FUNCTIONS = [
@@ -262,3 +266,64 @@ def test_prediction_with_network(embedding_dim: int, num_classes: int):
             f_i.write_predictions(m_rndfiles.files[0], out_file, fee_only=False)
 
         m_rndfiles.files.append(out_file)
+
+
+@pytest.mark.parametrize("mode, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_embedding(mode: str, tolerance: float):
+    """
+    Tests that the quantized embeddings stay close to the original ones and can be used by the network.
+
+    :param mode: The storage mode
+    :param tolerance: The maximum tolerated absolute error (relative to values in [-1, 1])
+    :return:
+    """
+
+    weight = torch.rand(50, 20) * 2 - 1
+    embedding_layer = QuantizedEmbedding(weight, mode)
+
+    indices = torch.tensor([[0, 3], [49, 3]], dtype=torch.long)
+    embedded = embedding_layer(indices)
+
+    assert embedded.dtype == torch.float32
+    assert embedded.shape == (2, 2, 20)
+    assert torch.allclose(embedded, weight[indices], atol=tolerance)
+
+    cM = ConfigManager("config.file")
+    weight = torch.rand(50, cM.embedding_size)
+    network = FrameIDNetwork(cM, nn.Embedding.from_pretrained(weight), 5)
+    network.quantize_embeddings(mode)
+
+    assert network.net.embedding_layer is network.embedding_layer
+    network.query([[0], [1], [2]])
+
+    with pytest.raises(Exception):
+        network.quantize_embeddings(mode)
+
+
+def test_network_copy():
+    """
+    Tests that quantizing a copied network leaves the original network unchanged.
+
+    :return:
+    """
+
+    cM = ConfigManager("config.file")
+    weight = torch.rand(50, cM.embedding_size)
+    network = FrameIDNetwork(cM, nn.Embedding.from_pretrained(weight), 5)
+
+    copied = network.copy()
+
+    assert copied.embedding_layer is network.embedding_layer
+    assert copied.cM is network.cM
+
+    copied.quantize_embeddings("int8")
+
+    assert isinstance(copied.net.embedding_layer, QuantizedEmbedding)
+    assert network.net.embedding_layer is network.embedding_layer
+    assert not isinstance(network.embedding_layer, QuantizedEmbedding)
+
+    parameters = zip(network.net.out_layer.parameters(), copied.net.out_layer.parameters())
+
+    for original, other in parameters:
+        assert original is not other
+        assert torch.equal(original, other)
@@ -1,14 +1,29 @@
+import logging
+import numpy as np
 import os
 import pytest
 import random
+import shutil
 import string
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree
 from typing import List
 
 from framenet_tools.config import ConfigManager
 from framenet_tools.data_handler.annotation import Annotation
+from framenet_tools.data_handler.columnar_store import ColumnarStore, ColumnView
+from framenet_tools.data_handler.reader import ColumnarExporter, JsonExporter
+from framenet_tools.data_handler import reader_cache
+from framenet_tools.data_handler.reader_cache import ReaderCache, get_pos_tag_key
 from framenet_tools.data_handler.semaforreader import SemaforReader
+from framenet_tools.data_handler import semevalreader
 from framenet_tools.data_handler.semevalreader import SemevalReader
+from framenet_tools.data_handler import rawreader
 from framenet_tools.data_handler.rawreader import RawReader
+from framenet_tools.evaluator import evaluate_fee_identification, evaluate_span_identification
+from framenet_tools.frame_identification.frameidentifier import get_dataset
 
 cM = ConfigManager("config.file")
 
@@ -444,3 +459,769 @@ def test_json_import(use_semafor: bool):
     reader.import_from_json(path)
 
     assert reader == reader_original
+
+
+def test_semeval_streaming():
+    """
+    Tests that streaming a semeval file yields the same data as parsing the whole tree.
+
+    :return:
+    """
+
+    path = "semeval_dummy.xml"
+
+    reader_tree = SemevalReader(cM)
+    reader_tree.digest_tree(xml.etree.ElementTree.parse(path).getroot())
+
+    reader = SemevalReader(cM)
+    reader.read_data(path)
+
+    assert reader.sentences == reader_tree.sentences
+    assert reader == reader_tree
+
+    stream = SemevalReader(cM).stream_data(path)
+    words, annotations = next(stream)
+
+    assert words == reader_tree.sentences[0]
+    assert annotations == reader_tree.annotations[0]
+    assert len(list(stream)) == len(reader_tree.sentences) - 1
+
+
+@pytest.mark.parametrize("num_chunks", [1, 2, 7])
+def test_semeval_parallel(monkeypatch, num_chunks: int):
+    """
+    Tests that loading semeval files in chunks by multiple processes yields the same data in the same order.
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param num_chunks: The amount of chunks to split each file into
+    :return:
+    """
+
+    paths = [create_random_string() + ".xml" for _ in range(2)]
+
+    for path, copies in zip(paths, [3, 5]):
+        with open("semeval_dummy.xml", "r") as file:
+            content = file.read()
+
+        # Repeat the sentences, using different words for telling them apart
+        begin = content.index("<sentence ")
+        end = content.rindex("</sentence>") + len("</sentence>")
+        sentences = "".join(
+            content[begin:end].replace("I think", f"I{i} think") for i in range(copies)
+        )
+
+        with open(path, "w") as file:
+            file.write(content[:begin] + sentences + content[end:])
+
+    reader_sequential = SemevalReader(cM)
+
+    for path in paths:
+        reader_sequential.read_data(path)
+
+    chunks = semevalreader.split_file(paths[0], num_chunks)
+
+    with open(paths[0], "rb") as file:
+        for start, end in chunks:
+            file.seek(start)
+            assert file.read(10) == b"<sentence "
+
+    monkeypatch.setattr(semevalreader, "MIN_CHUNK_SIZE", 1)
+
+    # The chunks together contain exactly the streamed sentences
+    chunked = []
+
+    for start, end in chunks:
+        chunked += semevalreader.read_chunk(paths[0], start, end)
+
+    streamed = list(SemevalReader(cM).stream_data(paths[0]))
+
+    assert [words for words, _ in chunked] == [words for words, _ in streamed]
+    assert [annos for _, annos in chunked] == [annos for _, annos in streamed]
+
+    reader = SemevalReader(cM)
+    reader.read_files(paths, num_chunks)
+
+    for path in paths:
+        os.remove(path)
+
+    assert reader.sentences == reader_sequential.sentences
+    assert reader == reader_sequential
+
+    # Names parsed by worker processes are interned again
+    for annotations in reader.annotations:
+        for annotation in annotations:
+            assert annotation.frame is sys.intern(annotation.frame)
+            assert all(role is sys.intern(role) for role in annotation.roles)
+
+
+def test_semeval_chunk_comments():
+    """
+    Tests that chunks containing comments are refused instead of being split wrongly.
+
+    :return:
+    """
+
+    path = create_random_string() + ".xml"
+
+    with open("semeval_dummy.xml", "r") as file:
+        content = file.read()
+
+    begin = content.index("<sentence ")
+
+    with open(path, "w") as file:
+        file.write(content[:begin] + '<!-- <sentence ID="0"> -->' + content[begin:])
+
+    try:
+        with pytest.raises(Exception):
+            semevalreader.read_chunk(path, 0, os.path.getsize(path))
+    finally:
+        os.remove(path)
+
+
+def char_pos_to_sentence_pos_reference(start_char: int, end_char: int, words: List[str]):
+    """
+    The original linear scan of char_pos_to_sentence_pos, used as reference
+
+    :param start_char: The first character of the span
+    :param end_char: The last character of the span
+    :param words: A list of words in a sentence
+    :return: The start and end position of the WORD in the sentence
+    """
+
+    start = -1
+    end = -1
+
+    chars = 0
+
+    for i in range(len(words) + 1):
+        if start == -1 and start_char <= chars:
+            start = i
+
+        if end == -1 and end_char < chars:
+            return start, max(i - 1, start)
+
+        if i == len(words):
+            break
+
+        chars += len(words[i]) + 1
+
+    raise Exception("Inconsistency: position not inside sentence!")
+
+
+def test_char_pos_to_sentence_pos():
+    """
+    Benchmarks the mapping of character spans to words on long, heavily annotated sentences.
+    Also checks that the results match the original linear scan.
+
+    :return:
+    """
+
+    words = [create_random_string(seq_length=random.randint(1, 12)) for _ in range(500)]
+    length = len(" ".join(words))
+
+    spans = [
+        sorted([random.randint(0, length - 1), random.randint(0, length - 1)]) for _ in range(500)
+    ]
+    spans += [[length - 1, length - 1], [0, 0], [5, 3]]
+
+    start = time.perf_counter()
+    expected = [char_pos_to_sentence_pos_reference(a, b, words) for a, b in spans]
+    time_reference = time.perf_counter() - start
+
+    start = time.perf_counter()
+    offsets = semevalreader.get_word_offsets(words)
+    positions = [semevalreader.char_pos_to_sentence_pos(a, b, words, offsets) for a, b in spans]
+    time_bisect = time.perf_counter() - start
+
+    logging.info(f"Linear scan: {time_reference:.4f}s, bisect: {time_bisect:.4f}s")
+
+    # Only logged, as timings depend on the machine
+    assert positions == expected
+
+    with pytest.raises(Exception):
+        semevalreader.char_pos_to_sentence_pos(length + 1, length + 1, words)
+
+
+def test_reader_cache():
+    """
+    Tests that cached readers equal freshly parsed ones and that changed sources invalidate the cache.
+
+    :return:
+    """
+
+    directory = create_random_string() + "/"
+    path = create_random_string() + ".xml"
+
+    shutil.copy("semeval_dummy.xml", path)
+
+    cache = ReaderCache(cM, directory)
+
+    reader = SemevalReader(cM)
+    assert not cache.load(reader, [path])
+
+    reader.read_data(path)
+    cache.store(reader)
+
+    pos_tags = [["NN"] * len(sentence) for sentence in reader.sentences]
+    cache.update_feature(reader.cache_path, get_pos_tag_key(cM), pos_tags)
+
+    cached_reader = SemevalReader(cM)
+    assert cache.load(cached_reader, [path])
+
+    assert cached_reader.sentences == reader.sentences
+    assert cached_reader == reader
+    assert cached_reader.pos_tags == pos_tags
+
+    # An entry stored by a concurrent run is kept, no temporary entry is left behind
+    cache.store(cached_reader)
+
+    assert sorted(os.listdir(directory)) == [os.path.basename(reader.cache_path)]
+    assert cache.read_features(reader.cache_path)[get_pos_tag_key(cM)] == pos_tags
+
+    # Changing the source must result in a different entry
+    with open(path, "a") as file:
+        file.write("\n")
+
+    assert not cache.load(SemevalReader(cM), [path])
+
+    # Settings the data depends on must result in a different entry as well
+    other_cM = ConfigManager("config.file")
+    other_cM.raw_chunk_size += 1
+
+    assert cache.get_path(RawReader(other_cM), [path]) != cache.get_path(RawReader(cM), [path])
+    assert cache.get_path(SemevalReader(other_cM), [path]) == cache.get_path(reader, [path])
+
+    os.remove(path)
+    shutil.rmtree(directory)
+
+
+def test_reader_cache_clean():
+    """
+    Tests that the least recently used entries are removed once the cache exceeds its size.
+
+    :return:
+    """
+
+    directory = create_random_string() + "/"
+    paths = [create_random_string() + ".xml" for _ in range(3)]
+
+    cache = ReaderCache(cM, directory)
+    entries = []
+
+    for i, path in enumerate(paths):
+        shutil.copy("semeval_dummy.xml", path)
+
+        with open(path, "a") as file:
+            file.write("\n" * i)
+
+        reader = SemevalReader(cM)
+        cache.load(reader, [path])
+        reader.read_data(path)
+        cache.store(reader)
+
+        # Entries are ordered by the time of their last use
+        os.utime(reader.cache_path, (i, i))
+        entries.append(reader.cache_path)
+
+    os.makedirs(entries[0] + ".123.tmp")
+    os.utime(entries[0] + ".123.tmp", (0, 0))
+
+    # Loading an entry marks it as recently used
+    assert cache.load(SemevalReader(cM), [paths[0]])
+
+    entry_size = reader_cache.get_size(entries[0]) / 2 ** 20
+
+    removed = cache.clean(2.5 * entry_size)
+
+    assert sorted(removed) == sorted([entries[1], entries[0] + ".123.tmp"])
+    assert os.path.isdir(entries[0]) and os.path.isdir(entries[2])
+
+    assert cache.clean(0, keep=[entries[2]]) == [entries[0]]
+    assert cache.clean(0) == [entries[2]]
+
+    for path in paths:
+        os.remove(path)
+
+    shutil.rmtree(directory)
+
+
+def test_columnar_store():
+    """
+    Tests that the columnar backend holds the same data as the annotation objects.
+
+    :return:
+    """
+
+    directory = create_random_string()
+
+    with RandomFiles(10) as m_rndfiles:
+        reader = m_rndfiles.m_reader
+
+        # Predicted spans come without roles
+        reader.annotations[0][0].roles = []
+
+        ColumnarStore.from_lists(reader.sentences, reader.annotations).save(directory)
+        store = ColumnarStore.load(directory)
+
+        assert store.to_lists() == (reader.sentences, reader.annotations)
+
+        columnar_reader = SemaforReader(cM)
+        columnar_reader.use_columns(store)
+
+        assert columnar_reader.get_columns() is store
+        assert store.get_frame_dataset() == get_dataset(reader)
+
+        labels = []
+
+        for annotation in [a for annotations in reader.annotations for a in annotations]:
+            label = [2] * len(annotation.sentence)
+
+            for start, end in annotation.role_positions:
+                label[start : end + 1] = [0] + [1] * (end - start)
+
+            labels.append(label)
+
+        assert store.get_span_labels() == labels
+
+        # Handing out annotations disables the direct use of the columns
+        assert columnar_reader.annotations[0] == reader.annotations[0]
+        assert columnar_reader.annotations[0][0].sentence == columnar_reader.sentences[0]
+        assert columnar_reader.annotations[0] is columnar_reader.annotations[0]
+        assert columnar_reader.get_columns() is None
+
+        # Sentences are decoded on demand and not kept
+        assert columnar_reader.sentences[0] is not columnar_reader.sentences[0]
+        assert not hasattr(columnar_reader.sentences, "items")
+
+        with pytest.raises(TypeError):
+            ColumnView(store)
+        assert columnar_reader == reader
+
+    shutil.rmtree(directory)
+
+
+class LegacyAnnotation(object):
+    """
+    The original Annotation class without slots and interning, used as reference
+    """
+
+    def __init__(self, frame, fee, position, fee_raw, sentence, roles, role_positions):
+        self.frame = frame
+        self.fee = fee
+        self.position = position
+        self.fee_raw = fee_raw
+        self.sentence = sentence
+        self.roles = roles
+        self.role_positions = role_positions
+        self.embedded_frame = None
+        self.frame_confidence = [[frame, 1.0]]
+
+
+def measure_annotations(annotation_class: type, count: int):
+    """
+    Measures the memory allocated per annotation
+
+    NOTE: Frame and role names are created per annotation, as done by the readers
+
+    :param annotation_class: The class of the annotations
+    :param count: The amount of annotations to create
+    :return: The allocated bytes per annotation
+    """
+
+    sentence = [create_random_string() for _ in range(20)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    annotations = [
+        annotation_class(
+            "".join(["Frame_", "name"]),
+            sentence[3],
+            (3, 3),
+            sentence[3],
+            sentence,
+            ["".join(["Role_", str(r)]) for r in range(3)],
+            [(r, r + 1) for r in range(3)],
+        )
+        for _ in range(count)
+    ]
+
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    del annotations
+
+    return size / count
+
+
+def test_annotation_memory():
+    """
+    Benchmarks the memory footprint of annotations, compared to the original class.
+
+    :return:
+    """
+
+    legacy = measure_annotations(LegacyAnnotation, 10000)
+    compact = measure_annotations(Annotation, 10000)
+
+    logging.info(f"Bytes per annotation: {legacy:.0f} before, {compact:.0f} after")
+
+    assert compact < legacy
+
+
+def test_annotation_frame_confidence():
+    """
+    Tests that the default frame confidence behaves as in the original class.
+
+    :return:
+    """
+
+    args = ["Frame", "fee", (0, 0), "fee", ["fee"], [], []]
+
+    for change in [lambda a: None, lambda a: setattr(a, "frame", "Other")]:
+        annotation = Annotation(*args)
+        legacy = LegacyAnnotation(*args)
+
+        change(annotation)
+        change(legacy)
+
+        # The default refers to the frame the annotation was created with
+        assert annotation.frame_confidence == legacy.frame_confidence == [["Frame", 1.0]]
+
+    # The default is a stored list, so modifications persist
+    annotation = Annotation(*args)
+    annotation.frame_confidence.append(["Other", 0.5])
+
+    assert annotation.frame_confidence == [["Frame", 1.0], ["Other", 0.5]]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_gold_snapshot(columnar: bool):
+    """
+    Tests that snapshots keep the gold data while the reader is modified by predictions.
+
+    :param columnar: Whether the reader uses the columnar backend
+    :return:
+    """
+
+    with RandomFiles(10) as m_rndfiles:
+        reader = m_rndfiles.m_reader
+
+        if columnar:
+            reader.use_columns(ColumnarStore.from_lists(reader.sentences, reader.annotations))
+
+        gold_dataset = get_dataset(reader)
+        gold_spans = [[a.role_positions for a in annotations] for annotations in reader.annotations]
+
+        snapshot = reader.snapshot()
+
+        # Simulate the predictions of the stages
+        for annotations in reader.annotations:
+            for annotation in annotations:
+                annotation.frame = "Predicted"
+                annotation.role_positions = []
+
+        assert get_dataset(snapshot) == gold_dataset
+        spans = [[a.role_positions for a in annotations] for annotations in snapshot.annotations]
+
+        assert spans == gold_spans
+
+        tp, fp, fn = evaluate_span_identification(reader, snapshot)
+
+        assert tp == fp == 0
+        assert fn == sum(len(spans) for annotations in gold_spans for spans in annotations)
+
+        # The FEEs are not changed by the predictions above
+        tp, fp, fn = evaluate_fee_identification(reader, snapshot)
+
+        assert tp == sum(len(annotations) for annotations in gold_spans)
+        assert fp == fn == 0
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_sentence_index(columnar: bool):
+    """
+    Tests the lookup, merging and deduplication of sentences using the sentence index.
+
+    :param columnar: Whether the reader uses the columnar backend
+    :return:
+    """
+
+    with RandomFiles(10) as m_rndfiles:
+        reader = m_rndfiles.m_reader
+
+        if columnar:
+            reader.use_columns(ColumnarStore.from_lists(reader.sentences, reader.annotations))
+
+        for i, sentence in enumerate(reader.sentences):
+            assert reader.get_sentence_rows(list(sentence))[0] <= i
+            assert reader.get_annotations(list(sentence)) is not None
+
+        assert reader.get_annotations(["not", "a", "known", "sentence", "\x1f"]) is None
+
+        # Appended sentences are indexed incrementally
+        reader.materialize()
+        reader.sentences.append(["a", "new", "sentence"])
+
+        assert reader.get_sentence_rows(["a", "new", "sentence"]) == [len(reader.sentences) - 1]
+        assert reader.get_annotations(["a", "new", "sentence"]) == []
+
+        # Merging a reader into itself adds nothing
+        count = len(reader.sentences)
+        annotations = sum(len(annotations) for annotations in reader.annotations)
+
+        reader.merge(m_rndfiles.m_reader)
+
+        assert len(reader.sentences) == count
+        assert sum(len(annotations) for annotations in reader.annotations) == annotations
+
+        # Duplicated sentences are collapsed
+        reader.sentences += reader.sentences[:3]
+        reader.annotations += reader.annotations[:3]
+        reader.deduplicate()
+
+        assert len(reader.sentences) == count
+        assert sum(len(annotations) for annotations in reader.annotations) == annotations
+
+        for sentence, annotations in zip(reader.sentences, reader.annotations):
+            for annotation in annotations:
+                assert annotation.sentence is sentence
+
+
+def test_semafor_streaming():
+    """
+    Tests that streaming semafor files walks sentences and elements in lockstep.
+
+    :return:
+    """
+
+    with RandomFiles(10) as m_rndfiles:
+        reader = m_rndfiles.m_reader
+
+        with open(m_rndfiles.files[0]) as file:
+            sentences = file.read().split("\n")[:-1]
+
+        with open(m_rndfiles.files[1]) as file:
+            elements = file.read().split("\n")[:-1]
+
+        stream = SemaforReader(cM).stream_data(*m_rndfiles.files)
+
+        assert list(stream) == list(zip(reader.sentences, reader.annotations))
+
+        # Sentences without elements in between
+        sentence_count = len(sentences)
+        sentences = sentences + ["an unannotated sentence"] + sentences
+        shifted = []
+
+        for element in elements:
+            data = element.split("\t")
+            data[7] = str(int(data[7]) + sentence_count + 1)
+            shifted.append("\t".join(data))
+
+        elements = elements + shifted
+
+        m_reader = SemaforReader(cM)
+        m_reader.digest_raw_data(elements, sentences)
+
+        assert len(m_reader.sentences) == 2 * sentence_count + 1
+        assert m_reader.annotations[sentence_count] == []
+        assert m_reader.annotations[sentence_count + 1 :] == reader.annotations
+
+        # Elements have to be ordered by their sentences
+        with pytest.raises(Exception, match="ordered by sentence"):
+            SemaforReader(cM).digest_raw_data(elements[::-1], sentences)
+
+        with pytest.raises(Exception, match=f"only {sentence_count} sentences"):
+            SemaforReader(cM).digest_raw_data(elements, sentences[:sentence_count])
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_raw_batches(monkeypatch, batch_size: int):
+    """
+    Tests that raw texts are read in batches and their json export equals the one of a single reader.
+
+    :param batch_size: The amount of sentences per batch
+    :return:
+    """
+
+    # Tokenize by whitespace, as the tokenizer models are not required here
+    def split_sentences(chunks, use_spacy, profile):
+        for chunk in chunks:
+            for sentence in chunk.split("."):
+                if sentence.split():
+                    yield sentence.split()
+
+    monkeypatch.setattr(rawreader, "ensure_resources", lambda backends: None)
+    monkeypatch.setattr(rawreader, "stream_sentences", split_sentences)
+
+    with RandomFiles(10) as m_rndfiles:
+        m_reader = m_rndfiles.m_reader
+
+        raw_file = create_raw_file(random.randint(1, 20), 10)
+        m_rndfiles.files.append(raw_file)
+
+        batches = list(RawReader(cM).stream_batches(raw_file, batch_size))
+
+        raw_reader = RawReader(cM)
+        raw_reader.read_raw_text(raw_file)
+
+        assert [s for batch in batches for s in batch.sentences] == raw_reader.sentences
+        assert all(len(batch.sentences) <= batch_size for batch in batches)
+
+        # Export the annotated reader in pieces
+        m_rndfiles.files += ["single.json", "batches.json"]
+        m_reader.export_to_json("single.json")
+
+        with JsonExporter("batches.json") as exporter:
+            for i in range(0, len(m_reader.sentences), batch_size):
+                batch = SemaforReader(cM)
+                batch.sentences = m_reader.sentences[i : i + batch_size]
+                batch.annotations = m_reader.annotations[i : i + batch_size]
+
+                exporter.write(batch)
+
+        with open("single.json") as single, open("batches.json") as batches:
+            assert single.read() == batches.read()
+
+
+@pytest.mark.parametrize("path", ["failed.json", "failed.jsonl.gz"])
+def test_json_export_failure(path: str):
+    """
+    Tests that an export interrupted by an exception leaves no partial file behind.
+
+    :param path: The path of the export
+    :return:
+    """
+
+    with RandomFiles(3) as m_rndfiles:
+        m_reader = m_rndfiles.m_reader
+
+        with pytest.raises(KeyboardInterrupt):
+            with JsonExporter(path) as exporter:
+                exporter.write(m_reader)
+
+                assert not os.path.exists(path)
+
+                raise KeyboardInterrupt()
+
+        assert not os.path.exists(path)
+        assert not os.path.exists(exporter.tmp_path)
+
+        # A previous export is kept
+        m_rndfiles.files.append(path)
+        m_reader.export_to_json(path)
+
+        with open(path, "rb") as file:
+            content = file.read()
+
+        with pytest.raises(KeyboardInterrupt):
+            with JsonExporter(path) as exporter:
+                raise KeyboardInterrupt()
+
+        with open(path, "rb") as file:
+            assert file.read() == content
+
+
+@pytest.mark.parametrize("path", ["test.jsonl", "test.jsonl.gz", "test.jsonl.zst"])
+def test_json_lines(path: str):
+    """
+    Tests the export and lazy import of json lines files.
+
+    :param path: The path of the (compressed) json lines file
+    :return:
+    """
+
+    if path.endswith(".zst"):
+        pytest.importorskip("zstandard")
+
+    reader_original = read_and_export(path)
+    read_and_export("test.json")
+
+    stream = RawReader(cM).stream_from_json(path)
+    words, annotations = next(stream)
+
+    assert words == reader_original.sentences[0]
+    assert annotations == reader_original.annotations[0]
+
+    reader = RawReader(cM)
+    reader.import_from_json(path)
+
+    assert reader == reader_original
+
+    reader_json = RawReader(cM)
+    reader_json.import_from_json("test.json")
+
+    assert reader == reader_json
+    assert reader.sentences == reader_json.sentences
+
+    os.remove(path)
+
+
+def test_binary_export():
+    """
+    Tests the export and memory-mapped import of the binary prediction format.
+
+    :return:
+    """
+
+    path = "test.columns"
+
+    with RandomFiles(10) as m_rndfiles:
+        m_reader = m_rndfiles.m_reader
+
+        for annotations in m_reader.annotations:
+            for annotation in annotations:
+                annotation.frame_confidence = [
+                    (create_random_string(), random.random()) for _ in range(random.randint(1, 5))
+                ]
+
+        m_reader.export_to_columns(path, top_k=3)
+
+        reader = RawReader(cM)
+        reader.import_from_columns(path)
+        store = reader.get_columns()
+
+        assert isinstance(store.frame_candidates, np.memmap)
+
+        # Random access decodes only the requested sentence
+        i = random.randrange(len(m_reader.annotations))
+
+        assert reader.annotations[i] == m_reader.annotations[i]
+        assert len(reader.annotations.items) == 1
+
+        for annotation, original in zip(reader.annotations[i], m_reader.annotations[i]):
+            frames = [[frame, confidence] for frame, confidence in original.frame_confidence[:3]]
+
+            assert [frame for frame, _ in annotation.frame_confidence] == [f for f, _ in frames]
+            assert np.allclose([c for _, c in annotation.frame_confidence], [c for _, c in frames])
+
+        assert reader == m_reader
+        assert list(reader.sentences) == m_reader.sentences
+
+        frame = m_reader.annotations[i][0].frame
+
+        assert i in store.find_frame(frame).tolist()
+        assert store.find_frame("not a frame").tolist() == []
+
+        # Exporting in batches yields the same data
+        with ColumnarExporter("batches.columns", 3) as exporter:
+            for j in range(0, len(m_reader.sentences), 2):
+                batch = SemaforReader(cM)
+                batch.sentences = m_reader.sentences[j : j + 2]
+                batch.annotations = m_reader.annotations[j : j + 2]
+
+                exporter.write(batch)
+
+        batches = ColumnarStore.load("batches.columns")
+
+        assert batches.to_lists() == store.to_lists()
+
+        for j in range(len(store.frames)):
+            assert batches.get_frame_confidence(j) == store.get_frame_confidence(j)
+
+        assert list(RawReader(cM).stream_from_columns(path)) == list(
+            zip(m_reader.sentences, m_reader.annotations)
+        )
+
+    shutil.rmtree(path)
+    shutil.rmtree("batches.columns")
@@ -86,7 +86,9 @@ def adjust_config(simple_mode: bool):
     cM.create_config("config.file")
 
 
-os.remove("config.file")
+# Start from the defaults, adjust_config writes the config file
+if os.path.isfile("config.file"):
+    os.remove("config.file")
 
 cM = ConfigManager("config.file")
 
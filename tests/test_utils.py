@@ -1,15 +1,37 @@
+import json
 import logging
+import numpy as np
 import os
 import pytest
+import subprocess
+import sys
+import time
+
+import framenet_tools
 
 from typing import List
 
+from framenet_tools.config import ConfigManager
 from framenet_tools.evaluator import calc_f
+from framenet_tools.utils import static_utils
+from framenet_tools.utils.quantization import QuantizedMatrix
+from framenet_tools.utils.resource_registry import ResourceRegistry
+from tests.test_reader import create_random_string
 from framenet_tools.utils.static_utils import (
     shuffle_concurrent_lists,
     extract7z,
     download_file,
     get_sentences,
+    read_paragraphs,
+    split_line,
+    get_oov_vector,
+    check_resources,
+    get_resource_manifest,
+    required_resources,
+    required_spacy_models,
+    load_spacy_model,
+    measure_spacy_profiles,
+    spacy_profiles,
 )
 
 
@@ -64,6 +86,191 @@ def test_shuffle(testdata: List[object], expected: List[object]):
         assert (x, y) in [(s, t) for s, t in zip(testdata2, expected2)]
 
 
+@pytest.mark.parametrize("dim, scale", [(300, 0.1), (100, 1 / 6)])
+def test_oov_vector(dim: int, scale: float):
+    """
+    Tests that out of vocabulary vectors are deterministic and differ between tokens.
+
+    :param dim: The dimension of the vectors
+    :param scale: The upper bound of the values
+    :return:
+    """
+
+    vector = get_oov_vector("unknown", dim, scale)
+
+    assert vector.shape == (dim,)
+    assert vector.min() >= 0 and vector.max() < scale
+    assert get_oov_vector("unknown", dim, scale) is vector
+    assert get_oov_vector("unknown", dim, scale).tolist() == vector.tolist()
+    assert not get_oov_vector("Unknown", dim, scale).tolist() == vector.tolist()
+
+    # Independent of the cache (and of the hash seed of the process)
+    get_oov_vector.cache_clear()
+
+    assert get_oov_vector("unknown", dim, scale).tolist() == vector.tolist()
+
+
+@pytest.mark.parametrize("mode, tolerance", [("float32", 0), ("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_matrix(mode: str, tolerance: float):
+    """
+    Tests the dequantized rows of a quantized matrix.
+
+    :param mode: The storage mode
+    :param tolerance: The maximum tolerated absolute error (relative to values in [-1, 1])
+    :return:
+    """
+
+    matrix = np.random.rand(30, 12).astype(np.float32) * 2 - 1
+    matrix[5] = 0
+
+    quantized = QuantizedMatrix(matrix, mode)
+
+    assert quantized.shape == matrix.shape
+    assert quantized.nbytes <= matrix.nbytes
+    assert quantized[3].dtype == np.float32
+    assert np.allclose(quantized[3], matrix[3], atol=tolerance)
+    assert np.allclose(quantized[[1, 5, 7]], matrix[[1, 5, 7]], atol=tolerance)
+    assert np.allclose(np.asarray(quantized), matrix, atol=tolerance)
+
+
+def test_resource_registry():
+    """
+    Tests that resources are only created once per key and version and can be released
+
+    :return:
+    """
+
+    registry = ResourceRegistry()
+    created = []
+
+    def factory():
+        created.append(np.zeros(256, dtype=np.float32))
+        return created[-1]
+
+    first = registry.get("array", "a", factory, 1)
+
+    assert registry.get("array", "a", factory, 1) is first
+    assert len(created) == 1
+
+    # A different key or version creates a new instance
+    assert registry.get("array", "b", factory, 1) is not first
+    assert registry.get("array", "a", factory, 2) is not first
+    assert len(created) == 3
+    assert registry.loads["array"] == 3
+
+    assert registry.memory_usage() == {"array": 2 * 256 * 4}
+
+    registry.release("array", "a")
+
+    assert not registry.contains("array", "a")
+    assert registry.contains("array", "b")
+
+    registry.clear()
+
+    assert registry.memory_usage() == {}
+
+
+def test_config_without_side_effects():
+    """
+    Tests that creating a ConfigManager neither writes files nor creates embedding managers
+
+    :return:
+    """
+
+    path = create_random_string() + ".file"
+
+    cM = ConfigManager(path)
+
+    assert not cM.config_loaded
+    assert not os.path.isfile(path)
+    assert cM._wEM is None and cM._fEM is None
+
+    # The managers are created on first access
+    assert cM.wEM.path == cM.word_embeddings_path
+
+
+def test_resource_manifest(monkeypatch, tmp_path):
+    """
+    Tests that resources recorded in the manifest are not checked again
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param tmp_path: The pytest tmp_path fixture
+    :return:
+    """
+
+    path = str(tmp_path / "resources.manifest")
+
+    def fail():
+        raise Exception("Recorded resources must not be checked!")
+
+    monkeypatch.setattr(static_utils, "download_resources", fail)
+    monkeypatch.setattr(static_utils, "get_spacy_en_model", fail)
+
+    recorded = [resource[0] + resource[1] for resource in required_resources]
+    recorded += ["spacy/" + model for model in required_spacy_models]
+
+    with open(path, "w") as file:
+        json.dump(recorded, file)
+
+    assert check_resources(path) == set(recorded)
+
+    # Only the resources of the requested backends are checked
+    recorded = [resource[0] + resource[1] for resource in required_resources]
+
+    with open(path, "w") as file:
+        json.dump(recorded, file)
+
+    assert check_resources(path, backends=["nltk"]) == set(recorded)
+
+    # The default manifest does not depend on the working directory
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    default_path = get_resource_manifest()
+
+    monkeypatch.chdir(tmp_path)
+
+    assert get_resource_manifest() == default_path
+    assert os.path.isabs(default_path)
+    assert default_path.startswith(str(tmp_path))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason="-X importtime requires python 3.7")
+@pytest.mark.parametrize("args", [["--help"], ["convert", "--help"]])
+def test_startup_time(args: List[str]):
+    """
+    Tests that the command line interface starts without importing the heavy libraries
+
+    :param args: The arguments passed to the command line interface
+    :return:
+    """
+
+    root = os.path.dirname(os.path.dirname(framenet_tools.__file__))
+    env = dict(os.environ, PYTHONPATH=root)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from framenet_tools.main import main; main()"]
+        + args,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    assert result.returncode == 0
+
+    # Lines of the form "import time: self [us] | cumulative | module"
+    imports = dict()
+
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            times = line.split("|")
+            imports[times[2].strip()] = times[1].strip()
+
+    for module in ["torch", "torchtext", "spacy", "nltk", "tensorboardX"]:
+        assert module not in imports
+
+    assert int(imports["framenet_tools.main"]) < 1000000
+
+
 # NOTE: After lots of testing, it turns out that the extraction actually DOES work!
 #       For some (to me) unknown reasons the 7z-files used by pyfn are NOT working...
 """
@@ -121,3 +328,202 @@ def test_tokenization(use_spacy: bool):
     tokenized = get_sentences(text, use_spacy)
 
     assert tokenized == sentences
+
+
+@pytest.mark.parametrize("chunk_size", [30, 200, 10 ** 6])
+def test_read_paragraphs(chunk_size: int):
+    """
+    Tests that raw texts are split into chunks of whole paragraphs
+
+    :param chunk_size: The minimum amount of characters of a chunk
+    :return:
+    """
+
+    paragraphs = [
+        " ".join(create_random_string(seq_length=10) for _ in range(20)) + "\n" for _ in range(30)
+    ]
+    content = "\n".join(paragraphs)
+
+    path = "paragraphs.txt"
+
+    with open(path, "w") as file:
+        file.write(content)
+
+    chunks = list(read_paragraphs(path, chunk_size))
+    os.remove(path)
+
+    assert "".join(chunks) == content
+
+    for chunk in chunks[:-1]:
+        assert len(chunk) >= chunk_size
+        assert chunk.endswith("\n\n")
+
+    if chunk_size > len(content):
+        assert len(chunks) == 1
+
+
+def test_read_paragraphs_long_lines():
+    """
+    Tests that overlong lines are split at whitespace and chunks stay bounded
+
+    :return:
+    """
+
+    chunk_size = 100
+    words = [create_random_string(seq_length=9) for _ in range(500)]
+    content = " ".join(words) + "\n\n" + "x" * 250 + "\n"
+
+    path = "long_lines.txt"
+
+    with open(path, "w") as file:
+        file.write(content)
+
+    chunks = list(read_paragraphs(path, chunk_size))
+    os.remove(path)
+
+    assert "".join(chunks) == content
+
+    for chunk in chunks:
+        assert len(chunk) <= 10 * chunk_size
+
+    pieces = list(split_line(" ".join(words), chunk_size))
+
+    assert "".join(pieces) == " ".join(words)
+
+    for piece in pieces[:-1]:
+        assert len(piece) <= chunk_size
+        assert piece.endswith(" ")
+
+    assert list(split_line("x" * 250, chunk_size)) == ["x" * 100, "x" * 100, "x" * 50]
+
+
+def test_pos_tagging_batch(monkeypatch):
+    """
+    Tests that batched POS-tagging equals tagging sentence by sentence and benchmarks both
+
+    NOTE: Uses a blank spacy pipeline, as the models are not required here
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :return:
+    """
+
+    import spacy
+
+    from framenet_tools.utils import postagger
+
+    nlp = spacy.blank("en")
+
+    monkeypatch.setattr(postagger, "ensure_resources", lambda backends: None)
+    monkeypatch.setattr(postagger, "get_spacy_model", lambda profile: nlp)
+
+    sentences = [[create_random_string(seq_length=10) for _ in range(20)] for _ in range(2000)]
+
+    pos_tagger = postagger.PosTagger(True)
+
+    start = time.perf_counter()
+    expected = [pos_tagger.get_tags(sentence) for sentence in sentences]
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tags = list(pos_tagger.get_tags_batch(sentences, batch_size=256, workers=1))
+    batch_time = time.perf_counter() - start
+
+    logging.info(
+        f"POS-tagging: {len(sentences) / loop_time:.0f} sentences/s one by one, "
+        f"{len(sentences) / batch_time:.0f} sentences/s batched"
+    )
+
+    # Only logged, as timings depend on the machine
+    assert tags == expected
+
+
+def test_spacy_profiles(monkeypatch, tmp_path):
+    """
+    Tests that the spacy profiles exclude their components and measures their latency
+
+    NOTE: Uses a stand-in model with the component names of en_core_web_sm, as the models are not required here
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :param tmp_path: The pytest tmp_path fixture
+    :return:
+    """
+
+    import spacy
+
+    nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer", name="parser")
+
+    for name in ["tagger", "attribute_ruler", "lemmatizer"]:
+        nlp.add_pipe("attribute_ruler", name=name).add([[{"ORTH": "a"}]], {"TAG": "DT"})
+
+    nlp.add_pipe("entity_ruler", name="ner").add_patterns([{"label": "ORG", "pattern": "a"}])
+
+    path = str(tmp_path / "model")
+    nlp.to_disk(path)
+
+    full = ["parser", "tagger", "attribute_ruler", "lemmatizer", "ner"]
+
+    for profile, excluded in spacy_profiles.items():
+        pipe_names = load_spacy_model(path, profile).pipe_names
+
+        assert [name for name in pipe_names if name in full] == [
+            name for name in full if name not in excluded
+        ]
+
+        # Only the sentences profile needs a sentencizer, if the parser is excluded
+        assert ("sentencizer" in pipe_names) == (profile == "sentences" and "parser" in excluded)
+
+    with pytest.raises(Exception):
+        load_spacy_model(path, "unknown")
+
+    sentences = [[create_random_string() for _ in range(20)] for _ in range(100)]
+    latencies = measure_spacy_profiles(sentences, name=path)
+
+    assert set(latencies) == set(spacy_profiles)
+    assert all(latency > 0 for latency in latencies.values())
+
+    # Sentences can be split without the parser
+    monkeypatch.setitem(spacy_profiles, "sentences", spacy_profiles["pos"])
+
+    assert "sentencizer" in load_spacy_model(path, "sentences").pipe_names
+
+
+def test_pretokenized_docs(monkeypatch):
+    """
+    Tests that spacy keeps the given tokens instead of tokenizing their joined text again
+
+    :param monkeypatch: The pytest monkeypatch fixture
+    :return:
+    """
+
+    import spacy
+
+    from framenet_tools.utils import postagger
+    from framenet_tools.utils.static_utils import make_doc
+
+    nlp = spacy.blank("en")
+
+    monkeypatch.setattr(postagger, "ensure_resources", lambda backends: None)
+    monkeypatch.setattr(postagger, "get_spacy_model", lambda profile: nlp)
+
+    tokens = ["I", "don't", "like", "e-mails", "(from", "the", "U.S.)", "!"]
+
+    # The tokenizer would split these tokens
+    assert len(nlp(" ".join(tokens))) > len(tokens)
+
+    doc = make_doc(nlp, tokens)
+
+    assert [token.text for token in doc] == tokens
+    assert doc.text == " ".join(tokens) + " "
+    assert [token.idx for token in doc] == [
+        len(" ".join(tokens[:i])) + (i > 0) for i in range(len(tokens))
+    ]
+
+    pos_tagger = postagger.PosTagger(True)
+
+    assert [tags[0] for tags in pos_tagger.get_tags(tokens)] == tokens
+
+    sentences = [tokens, tokens[2:], []]
+    tagged = pos_tagger.get_tags_batch(sentences)
+
+    assert [[tags[0] for tags in sentence] for sentence in tagged] == sentences